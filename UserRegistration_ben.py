@@ -1,61 +1,19 @@
-import sys
-import termios
-import tty
-import re
-
-shift_val = 7
-
-# Function to 'encrypt' a password using Caesar's Cipher
-def caesar_encrypt(password, shift=shift_val):
-    enc_pw = ''
-    for char in password:
-        if char.isalpha():
-            base_char = ord('A') if char.isupper() else ord('a')
-            enc_pw += chr((ord(char) - base_char + shift) % 26 + base_char)
-        elif char.isdigit():
-            enc_pw += chr((ord(char) - ord('0') + shift) % 10 + ord('0'))
-        else:
-            enc_pw += char
-    return enc_pw
-
+from password_hash import hash_password
+from registration_journal import register_player
+from term_render import read_password
+from validation import password_problem, username_problem
 
 # Function to show * while typing password
 def input_password(prompt="Password: "):
-    print(prompt, end="", flush=True)
-    password = ""
-    fd = sys.stdin.fileno()
-    old_settings = termios.tcgetattr(fd)
-    try:
-        tty.setraw(fd)
-        while True:
-            ch = sys.stdin.read(1)
-            if ch in ["\r", "\n"]:
-                print()
-                break
-            elif ch == "\x7f":  # backspace
-                if len(password) > 0:
-                    password = password[:-1]
-                    sys.stdout.write("\b \b")
-                    sys.stdout.flush()
-            else:
-                password += ch
-                sys.stdout.write("*")
-                sys.stdout.flush()
-    finally:
-        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-    return password
-
-
-# Function to validate password strength
+    # keys that arrive together (fast typing, a paste over SSH) are echoed in one write
+    return read_password(prompt)
+
+
+# Function to validate password strength (the rules live in validation.py)
 def validate_password(password):
-    if len(password) > 10:
-        print("❌ Password too long. Maximum length is 10 characters.")
-        return False
-    if not re.search(r"[A-Z]", password):
-        print("❌ Password must contain at least one uppercase letter.")
-        return False
-    if not re.search(r"[^A-Za-z0-9]", password):
-        print("❌ Password must contain at least one special character.")
+    problem = password_problem(password)
+    if problem:
+        print(f"❌ {problem.capitalize()}.")
         return False
     return True
 
@@ -64,6 +22,10 @@ def validate_password(password):
 def register_user():
     print("\n=== USER REGISTRATION ===")
     username = input("Create a username: ").strip().lower()
+    problem = username_problem(username)
+    if problem:
+        print(f"❌ {problem.capitalize()}.")
+        return
 
     # Check if username already exists
     try:
@@ -93,11 +55,12 @@ def register_user():
             continue
         break
 
-    encrypted_pw = caesar_encrypt(password)
+    encrypted_pw = hash_password(password)
 
-    # Save to file
-    with open("players.txt", "a", encoding="utf-8") as players:
-        players.write(f"{username},{encrypted_pw}\n")
+    # Save to file; the username is checked again under the file lock
+    if not register_player("players.txt", username, encrypted_pw):
+        print("❌ Username already exists. Please choose another one.")
+        return
 
     print(f"\n✅ Registration successful! You can now log in as '{username}'.")
     
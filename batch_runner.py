@@ -0,0 +1,313 @@
+"""
+Non-interactive game runner: games as JSONL in, feedback and results as JSONL out.
+
+Each input line is one game:
+
+    {"id": 1, "secret": "RGBY", "guesses": ["RRGG", "RGBY"]}
+    {"id": 2, "seed": 42, "guesses": ["RRGG", "BBYY", "WOWO"]}
+    {"id": 3, "seed": 7, "strategy": "knuth"}
+    {"id": 4, "colors": "RGBYWOPK", "length": 5, "max_attempts": 12}
+
+The secret is given, or drawn with generate_secret_code from a
+random.Random(seed) (from the line number without a seed). Guesses come from
+the "guesses" list, a built-in simulate.STRATEGIES name, or the bot process
+given with --bot; a strategy's random choices continue from the same
+generator, so seeded games replay exactly. Guesses are read with
+larongutak.parse_guess and scored with larongutak.score_guess, and as in
+play_game an invalid guess is reported but does not use up an attempt.
+
+For every turn a {"id", "turn", "guess", "black", "white"} line is written
+(unless --results-only), then one {"id", "result", "attempts", "secret"}
+line with result "win", "lose", "incomplete" (the guesses ran out) or
+"error". Lines are handled in chunks on a process pool with a bounded window
+of chunks in flight, so memory stays flat and output keeps input order.
+
+A bot is any command reading and writing lines, with the replies of
+game_server.py: it gets "OK game colors=... length=... attempts=...", answers
+"GUESS <code>" and gets "OK feedback <black> <white> <attempt>", "ERR ...",
+"OK win <attempts>" or "OK lose <secret>" back. Bots written for the server
+play here unchanged; each worker process starts one bot for all its games,
+and a new one after a game that ended in an error mid-way.
+"""
+import argparse
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List
+
+from codec import CodeSpace
+from game_core import larongutak
+
+CHUNK_LINES = 500  # input lines per pool task
+MAX_INVALID_GUESSES = 100  # a bot sending more invalid guesses in one game loses it with an error
+
+_spaces = {}  # (colors, length) -> CodeSpace
+_bot = None  # this worker's bot process, see _bot_process
+
+
+class GameError(ValueError):
+    pass
+
+
+def _space(game: Dict) -> CodeSpace:
+    colors = game.get("colors")
+    length = game.get("length")
+    if colors is None and length is None:
+        return larongutak.default_space()
+    key = ("".join(colors) if colors is not None else "".join(larongutak.COLORS),
+           int(length) if length is not None else larongutak.CODE_LENGTH)
+    space = _spaces.get(key)
+    if space is None:
+        space = _spaces[key] = CodeSpace(list(key[0]), key[1])
+    return space
+
+
+class _BotGuesser:
+    """
+    Guesses from a bot process speaking the game_server replies.
+    """
+
+    def __init__(self, process: subprocess.Popen, space: CodeSpace, max_attempts: int):
+        self.process = process
+        self._send(f"OK game colors={''.join(space.colors)} length={space.code_length} attempts={max_attempts}")
+
+    def _send(self, line: str) -> None:
+        try:
+            self.process.stdin.write(line + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            # BrokenPipeError once the bot has exited
+            raise GameError(f"bot exited ({e})") from e
+
+    def guess(self) -> str or None:
+        try:
+            line = self.process.stdout.readline()
+        except OSError as e:
+            raise GameError(f"bot exited ({e})") from e
+        if not line:
+            raise GameError("bot exited")
+        line = line.strip()
+        return line[6:] if line.upper().startswith("GUESS ") else line
+
+    def reply(self, line: str) -> None:
+        self._send(line)
+
+
+def _bot_process(command: str) -> subprocess.Popen:
+    global _bot
+    if _bot is None or _bot.poll() is not None:
+        _bot = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                text=True, bufsize=1)
+    return _bot
+
+
+def _reset_bot() -> None:
+    """
+    Kills this worker's bot; the next game starts a new one.
+    """
+    global _bot
+    if _bot is not None:
+        _bot.kill()
+        _bot.wait()
+        _bot = None
+
+
+def play(game: Dict, number: int, bot: str = None) -> Iterator[Dict]:
+    """
+    Plays one game description, yielding a record per turn and the result last.
+    number (the input line) seeds the secret when the game has neither secret nor seed.
+    """
+    game_id = game.get("id", number)
+    space = _space(game)
+    max_attempts = int(game.get("max_attempts", larongutak.MAX_ATTEMPTS))
+
+    # the secret and a strategy's choices both come from the game's seed
+    rng = random.Random(game.get("seed", number))
+    if "secret" in game:
+        secret = larongutak.parse_guess(str(game["secret"]), space)
+        if secret is None:
+            raise GameError(f"invalid secret {game['secret']!r}")
+    else:
+        secret = larongutak.generate_secret_code(space, rng)
+
+    guesser = None
+    strategy = None
+    guesses = None
+    use_bot = False
+    if "guesses" in game:
+        guesses = iter(game["guesses"])
+    elif "strategy" in game:
+        import simulate
+
+        if game["strategy"] not in simulate.STRATEGIES:
+            raise GameError(f"unknown strategy {game['strategy']!r}")
+        strategy = simulate.STRATEGIES[game["strategy"]](space, rng)
+    elif bot:
+        use_bot = True
+    else:
+        raise GameError("no guesses, strategy or --bot")
+
+    try:
+        if use_bot:
+            guesser = _BotGuesser(_bot_process(bot), space, max_attempts)
+        yield from _turns(game_id, space, secret, max_attempts, guesses, strategy, guesser)
+    except GameError:
+        if use_bot:
+            # the bot is mid-game (or gone) and would take the next game's first line as a reply
+            _reset_bot()
+        raise
+
+
+def _turns(game_id, space: CodeSpace, secret: List[str], max_attempts: int, guesses, strategy,
+           guesser) -> Iterator[Dict]:
+    """
+    The turns of one game, guesses coming from whichever of guesses, strategy and guesser is set.
+    """
+    history = []
+    attempt = 0
+    invalid = 0
+    while attempt < max_attempts:
+        if guesses is not None:
+            raw = next(guesses, None)
+            if raw is None:
+                yield {"id": game_id, "result": "incomplete", "attempts": attempt, "secret": "".join(secret)}
+                return
+            guess = larongutak.parse_guess(str(raw), space)
+        elif strategy is not None:
+            guess = strategy(history)
+            raw = "".join(guess)
+        else:
+            raw = guesser.guess()
+            guess = larongutak.parse_guess(raw, space)
+
+        if guess is None:
+            yield {"id": game_id, "turn": attempt + 1, "guess": raw, "error": "invalid guess"}
+            invalid += 1
+            if invalid >= MAX_INVALID_GUESSES:
+                raise GameError("too many invalid guesses")
+            if guesser is not None:
+                guesser.reply(f"ERR invalid guess, enter {space.code_length} colors from {''.join(space.colors)}")
+            continue
+
+        attempt += 1
+        black, white = larongutak.score_guess(secret, guess, space)
+        history.append((guess, black, white))
+        yield {"id": game_id, "turn": attempt, "guess": "".join(guess), "black": black, "white": white}
+        if black == space.code_length:
+            if guesser is not None:
+                guesser.reply(f"OK win {attempt}")
+            yield {"id": game_id, "result": "win", "attempts": attempt, "secret": "".join(secret)}
+            return
+        if guesser is not None and attempt < max_attempts:
+            guesser.reply(f"OK feedback {black} {white} {attempt}")
+
+    if guesser is not None:
+        guesser.reply("OK lose " + "".join(secret))
+    yield {"id": game_id, "result": "lose", "attempts": attempt, "secret": "".join(secret)}
+
+
+def run_lines(lines: List[str], first_number: int, bot: str = None, results_only: bool = False) -> str:
+    """
+    Plays the games of a chunk of input lines; returns the output lines as one string.
+    """
+    out = []
+    for number, line in enumerate(lines, first_number):
+        if not line.strip():
+            continue
+        game_id = number
+        try:
+            game = json.loads(line)
+            if not isinstance(game, dict):
+                raise GameError("a game must be a JSON object")
+            game_id = game.get("id", number)
+            for record in play(game, number, bot):
+                if not results_only or "result" in record:
+                    out.append(json.dumps(record))
+        except (ValueError, KeyError, TypeError) as e:
+            # ValueError covers bad JSON, GameError and a bad CodeSpace
+            out.append(json.dumps({"id": game_id, "result": "error", "error": str(e)}))
+    return "".join(line + "\n" for line in out)
+
+
+def _chunks(f, size: int) -> Iterator[List[str]]:
+    chunk = []
+    for line in f:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run(source, dest, workers: int = 1, bot: str = None, results_only: bool = False) -> int:
+    """
+    Streams the games of source (a file object) to dest. Returns the number of input lines.
+    """
+    number = 1
+    if workers <= 1:
+        for chunk in _chunks(source, CHUNK_LINES):
+            dest.write(run_lines(chunk, number, bot, results_only))
+            number += len(chunk)
+        return number - 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in _chunks(source, CHUNK_LINES):
+            pending.append(pool.submit(run_lines, chunk, number, bot, results_only))
+            number += len(chunk)
+            # bounded window: results are written in input order
+            while len(pending) > workers * 2:
+                dest.write(pending.pop(0).result())
+        for future in pending:
+            dest.write(future.result())
+    return number - 1
+
+
+def benchmark(games: int, workers: int) -> float:
+    """
+    Runs `games` seeded games of random guesses with per-turn output into
+    os.devnull. Returns games per second.
+    """
+    rng = random.Random(0)
+    colors = larongutak.COLORS
+    lines = [json.dumps({"seed": i, "guesses": ["".join(rng.choice(colors) for _ in range(larongutak.CODE_LENGTH))
+                                                for _ in range(larongutak.MAX_ATTEMPTS)]}) + "\n"
+             for i in range(games)]
+    larongutak.get_feedback_table()  # built or loaded once, outside the timing
+    start = time.perf_counter()
+    with open(os.devnull, "w") as dest:
+        run(iter(lines), dest, workers)
+    return games / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Mastermind games from JSONL without a terminal.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL games (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output (default: stdout)")
+    parser.add_argument("--bot", help="command of a bot playing games that have no guesses")
+    parser.add_argument("--workers", type=int, default=1, help="processes (default 1)")
+    parser.add_argument("--results-only", action="store_true", help="skip the per-turn lines")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="time N games of random guesses")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        rate = benchmark(args.benchmark, args.workers)
+        print(f"{args.benchmark} games in {args.workers} process(es): {rate:.0f} games/s ({rate * 60:.0f}/min)")
+        sys.exit(0)
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    dest = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", buffering=1 << 20)
+    try:
+        run(source, dest, args.workers, args.bot, args.results_only)
+    except BrokenPipeError:
+        pass
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if dest is not sys.stdout:
+            dest.close()
@@ -0,0 +1,179 @@
+"""
+NumPy-vectorized scoring: one guess, or a block of guesses, against many codes.
+
+Codes are stored as rows of color digits (see codec.CodeSpace), so a whole
+candidate set is a single (n, code_length) uint8 array. Every function takes
+an optional CodeSpace (default: larongutak.default_space()) and returns
+exactly what larongutak.score_guess would return for the same pairs; run this
+file, or tests/test_batch_scoring.py, to check that on random codes against
+score_guess and against the table-free reference larongutak._score_guess_direct.
+"""
+import random
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+from codec import CodeSpace
+from game_core import larongutak
+
+# Upper bound on temporary elements created per block (keeps memory ~16-32 MB).
+BLOCK_ELEMENTS = 1 << 24
+
+
+def codes_to_array(codes: List[List[str]], space: CodeSpace = None) -> np.ndarray:
+    """
+    Converts codes like [['R', 'G', 'B', 'Y'], ...] into an (n, code_length) digit array.
+    """
+    space = space or larongutak.default_space()
+    digits = space.digit_of
+    return np.array([[digits[color] for color in code] for code in codes], dtype=np.uint8).reshape(
+        len(codes), space.code_length
+    )
+
+
+def array_to_codes(array: np.ndarray, space: CodeSpace = None) -> List[List[str]]:
+    """
+    Converts a digit array back into lists of color letters.
+    """
+    colors = (space or larongutak.default_space()).colors
+    return [[colors[digit] for digit in row] for row in np.asarray(array).tolist()]
+
+
+def all_codes_array(space: CodeSpace = None) -> np.ndarray:
+    """
+    Returns every code of the space as digits, row i being the digits of integer code i.
+    """
+    space = space or larongutak.default_space()
+    table = space.digit_table()
+    if table is not None:
+        return np.frombuffer(table, dtype=np.uint8).reshape(space.size, space.code_length)
+    return indices_to_array(np.arange(space.size, dtype=np.int64), space)
+
+
+def indices_to_array(indices: np.ndarray, space: CodeSpace = None) -> np.ndarray:
+    """
+    Maps integer codes to their digit rows.
+    """
+    space = space or larongutak.default_space()
+    powers = np.array(space.powers, dtype=np.int64)
+    return ((np.asarray(indices, dtype=np.int64)[:, None] // powers) % space.base).astype(np.uint8)
+
+
+def array_to_indices(array: np.ndarray, space: CodeSpace = None) -> np.ndarray:
+    """
+    Maps digit rows to their integer codes.
+    """
+    space = space or larongutak.default_space()
+    return np.asarray(array, dtype=np.int64) @ np.array(space.powers, dtype=np.int64)
+
+
+def color_counts(array: np.ndarray, space: CodeSpace = None) -> np.ndarray:
+    """
+    Returns an (n, len(colors)) array with how often each color occurs in each code.
+    """
+    space = space or larongutak.default_space()
+    array = np.asarray(array)
+    colors = np.arange(space.base, dtype=array.dtype)
+    return (array[:, :, None] == colors).sum(axis=1, dtype=np.uint8)
+
+
+def _as_digit_block(guesses, space: CodeSpace) -> np.ndarray:
+    """
+    Accepts a single code, a list of codes or a digit array and returns a 2-D digit array.
+    """
+    if isinstance(guesses, np.ndarray):
+        return guesses.reshape(-1, guesses.shape[-1]).astype(np.uint8, copy=False)
+    if guesses and isinstance(guesses[0], str):
+        guesses = [guesses]
+    return codes_to_array(guesses, space)
+
+
+def score_block(guesses, secrets: np.ndarray, secret_counts: np.ndarray = None,
+                space: CodeSpace = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores every guess against every secret.
+    Returns (black, white) arrays of shape (len(guesses), len(secrets)).
+    Pass secret_counts (from color_counts) when scoring the same secrets repeatedly.
+    """
+    space = space or larongutak.default_space()
+    guesses = _as_digit_block(guesses, space)
+    secrets = np.asarray(secrets, dtype=np.uint8)
+    if secret_counts is None:
+        secret_counts = color_counts(secrets, space)
+    guess_counts = color_counts(guesses, space)
+
+    black = np.empty((len(guesses), len(secrets)), dtype=np.uint8)
+    white = np.empty_like(black)
+    width = max(secrets.shape[1], secret_counts.shape[1], 1)
+    step = max(1, BLOCK_ELEMENTS // max(1, len(secrets) * width))
+    for start in range(0, len(guesses), step):
+        g = guesses[start:start + step]
+        b = (g[:, None, :] == secrets[None, :, :]).sum(axis=2, dtype=np.uint8)
+        common = np.minimum(guess_counts[start:start + step, None, :], secret_counts[None, :, :]).sum(
+            axis=2, dtype=np.uint8
+        )
+        black[start:start + step] = b
+        white[start:start + step] = common - b
+    return black, white
+
+
+def score_batch(guess, secrets: np.ndarray, secret_counts: np.ndarray = None,
+                space: CodeSpace = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores one guess against an array of secrets. Returns 1-D (black, white) arrays.
+    """
+    black, white = score_block(guess, secrets, secret_counts, space)
+    return black[0], white[0]
+
+
+def feedback_block(guesses, secrets: np.ndarray, secret_counts: np.ndarray = None,
+                   space: CodeSpace = None) -> np.ndarray:
+    """
+    Like score_block but packs each result with CodeSpace.encode_feedback,
+    which is what partitioning and filtering work on.
+    """
+    space = space or larongutak.default_space()
+    black, white = score_block(guesses, secrets, secret_counts, space)
+    return black * np.uint8(space.code_length + 1) + white
+
+
+def filter_candidates(candidates: np.ndarray, guess, black: int, white: int, space: CodeSpace = None) -> np.ndarray:
+    """
+    Returns the rows of candidates that would have produced (black, white) for guess.
+    """
+    space = space or larongutak.default_space()
+    fb = feedback_block(guess, candidates, space=space)[0]
+    return candidates[fb == space.encode_feedback(black, white)]
+
+
+def check_against_score_guess(trials: int = 200, block: int = 50, seed: int = 0, space: CodeSpace = None) -> int:
+    """
+    Property check: score_block must agree with score_guess and with the
+    pure-Python _score_guess_direct (which uses neither the feedback table,
+    built by this module, nor CodeSpace.score) on random guesses and secrets.
+    Returns the number of pairs compared; raises AssertionError on the first mismatch.
+    """
+    space = space or larongutak.default_space()
+    rng = random.Random(seed)
+    compared = 0
+    for _ in range(trials):
+        guesses = [space.decode(space.random_code(rng)) for _ in range(rng.randint(1, block))]
+        secrets = [space.decode(space.random_code(rng)) for _ in range(rng.randint(1, block))]
+        black, white = score_block(guesses, codes_to_array(secrets, space), space=space)
+        for i, guess in enumerate(guesses):
+            for j, secret in enumerate(secrets):
+                expected = larongutak._score_guess_direct(secret, guess)
+                actual = (int(black[i, j]), int(white[i, j]))
+                if actual != expected:
+                    raise AssertionError(f"{''.join(guess)} vs {''.join(secret)}: {actual} != {expected}")
+                if larongutak.score_guess(secret, guess, space) != expected:
+                    raise AssertionError(f"score_guess({''.join(secret)}, {''.join(guess)}) != {expected}")
+                compared += 1
+    return compared
+
+
+if __name__ == "__main__":
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    pairs = check_against_score_guess(seed=seed)
+    print(f"score_block matches score_guess and _score_guess_direct on {pairs} random pairs (seed {seed}).")
@@ -0,0 +1,339 @@
+"""
+Streaming bulk import and export of players and highscores.
+
+Rows are read from CSV ("username,password" / "username,score", an optional
+header line) or JSONL ({"username": ..., "password": ...} per line) through
+generators, so memory does not grow with the input. Every row is validated
+the way interactive registration would (the validation rules, the password
+rules only for plaintext passwords, no already registered username) and a bad row
+goes to the reject file as one JSON line with its line number and reason.
+
+Good rows are written in batches of IMPORT_BATCH: players through
+registration_journal.register_many (one locked append and one fsync per
+batch, so terminals registering meanwhile are never duplicated), highscores
+through Leaderboard.record_many. Plaintext passwords are hashed on a process
+pool; rows exported from another store (--stored) keep their stored hash.
+
+    python bulk_io.py import players accounts.csv --rejects rejects.jsonl
+    python bulk_io.py export highscores - --format jsonl
+    python bulk_io.py --benchmark 1000000
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from leaderboard import get_leaderboard
+from password_hash import hash_password
+from player_directory import current_lines, get_directory
+from registration_journal import register_many
+from validation import password_problem, username_problem
+
+IMPORT_BATCH = 20000  # rows per locked append
+HASH_CHUNK = 64  # plaintext passwords per process pool task
+WRITE_BUFFER = 1 << 20  # export file buffer in bytes
+
+COLUMNS = {"players": ("username", "password"), "highscores": ("username", "score")}
+
+
+# --- Reading and writing rows ---
+def read_rows(f, fmt: str, columns: Tuple[str, ...]) -> Iterator[Tuple[int, list or None]]:
+    """
+    Yields (line number, values in column order) for every row of f; values
+    is None for a line that cannot be parsed at all. Blank lines and a CSV
+    header are skipped.
+    """
+    if fmt == "csv":
+        reader = csv.reader(f)
+        for row in reader:
+            if not row or (reader.line_num == 1 and [v.strip().lower() for v in row] == list(columns)):
+                continue
+            yield reader.line_num, row if len(row) == len(columns) else None
+        return
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            yield number, None
+            continue
+        yield number, [obj.get(c) for c in columns] if isinstance(obj, dict) else None
+
+
+def _open_source(path: str):
+    if path == "-":
+        return open(sys.stdin.fileno(), "r", encoding="utf-8", newline="", closefd=False)
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _open_dest(path: str):
+    if path == "-":
+        return open(sys.stdout.fileno(), "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER, closefd=False)
+    return open(path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER)
+
+
+class RejectLog:
+    """
+    Counts rejected rows and, given a path, writes each as a JSON line
+    {"line": ..., "reason": ..., "row": ...}.
+    """
+
+    def __init__(self, path: str = None):
+        self.count = 0
+        self.f = open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) if path else None
+
+    def add(self, line: int, reason: str, row) -> None:
+        self.count += 1
+        if self.f is not None:
+            self.f.write(json.dumps({"line": line, "reason": reason, "row": row}) + "\n")
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+
+
+def _batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _hash_chunk(passwords: List[str]) -> List[str]:
+    return [hash_password(pw) for pw in passwords]
+
+
+# --- Import ---
+def import_players(source: str, players_file: str, fmt: str = "csv", rejects_file: str = None,
+                   stored: bool = False, workers: int = None) -> Tuple[int, int]:
+    """
+    Registers the accounts of source ("-" for stdin). Plaintext passwords are
+    validated and hashed; with stored=True they are taken as stored hashes.
+    Returns (players added, rows rejected).
+    """
+    rejects = RejectLog(rejects_file)
+    added = 0
+    if not os.path.exists(players_file):
+        open(players_file, "a").close()
+    directory = get_directory(players_file)
+    directory.refresh()
+
+    def valid_rows(f):
+        for line, row in read_rows(f, fmt, COLUMNS["players"]):
+            if row is None or not all(isinstance(v, str) for v in row):
+                rejects.add(line, "malformed row", row)
+                continue
+            username, password = row[0].strip().lower(), row[1]
+            problem = username_problem(username)
+            if problem is None and not stored:
+                problem = password_problem(password)
+            if problem is None and (password == "" or any(ch in password for ch in "\r\n")):
+                problem = "stored password is empty or contains a line break"
+            if problem is None and directory.exists(username, refresh=False):
+                # checked again under the lock by register_many; this skips hashing it
+                problem = "username already taken"
+            if problem is not None:
+                rejects.add(line, problem, row)
+                continue
+            yield line, row, username, password
+
+    pool = None if stored else ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    try:
+        with _open_source(source) as f:
+            for batch in _batches(valid_rows(f), IMPORT_BATCH):
+                passwords = [pw for _, _, _, pw in batch]
+                if pool is not None:
+                    chunks = [passwords[i:i + HASH_CHUNK] for i in range(0, len(passwords), HASH_CHUNK)]
+                    passwords = [stored_pw for hashed in pool.map(_hash_chunk, chunks) for stored_pw in hashed]
+                results = register_many(players_file, [(u, pw) for (_, _, u, _), pw in zip(batch, passwords)])
+                for (line, row, _, _), ok in zip(batch, results):
+                    if not ok:
+                        rejects.add(line, "username already taken", row)
+                added += sum(results)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        rejects.close()
+    return added, rejects.count
+
+
+def import_highscores(source: str, highscores_file: str, players_file: str = None, fmt: str = "csv",
+                      rejects_file: str = None) -> Tuple[int, int]:
+    """
+    Records the scores of source ("-" for stdin); the lowest score per user
+    wins, as for played games. With players_file, scores of unregistered
+    users are rejected. Returns (new bests recorded, rows rejected).
+    """
+    rejects = RejectLog(rejects_file)
+    recorded = 0
+    directory = get_directory(players_file) if players_file else None
+    if directory is not None:
+        directory.refresh()
+
+    def valid_rows(f):
+        for line, row in read_rows(f, fmt, COLUMNS["highscores"]):
+            try:
+                username, score = row[0].strip().lower(), int(row[1])
+            except (TypeError, ValueError, AttributeError):
+                rejects.add(line, "malformed row", row)
+                continue
+            problem = username_problem(username)
+            if problem is None and score < 1:
+                problem = "score must be a positive number of attempts"
+            if problem is None and directory is not None and not directory.exists(username, refresh=False):
+                problem = "not a registered player"
+            if problem is not None:
+                rejects.add(line, problem, row)
+                continue
+            yield username, score
+
+    try:
+        with _open_source(source) as f:
+            board = get_leaderboard(highscores_file)
+            for batch in _batches(valid_rows(f), IMPORT_BATCH):
+                recorded += board.record_many(batch)
+                if directory is not None:
+                    directory.refresh()  # players registered meanwhile
+    finally:
+        rejects.close()
+    return recorded, rejects.count
+
+
+# --- Export ---
+def _player_rows(players_file: str) -> Iterator[Tuple[str, str]]:
+    with open(players_file, "rb") as f:
+        for line in current_lines(f):
+            line = line.decode("utf-8", errors="replace").strip()
+            try:
+                username, stored_pw = line.split(",", 1)
+            except ValueError:
+                # blank or malformed line, skip
+                continue
+            yield username, stored_pw
+
+
+def export_rows(rows, dest: str, fmt: str, columns: Tuple[str, ...]) -> int:
+    """
+    Streams rows to dest ("-" for stdout) as CSV with a header or as JSONL. Returns the row count.
+    """
+    count = 0
+    with _open_dest(dest) as f:
+        if fmt == "csv":
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row))) + "\n")
+                count += 1
+    return count
+
+
+def export_players(players_file: str, dest: str, fmt: str = "csv") -> int:
+    """
+    Writes every account with its stored password hash (import it with stored=True).
+    """
+    return export_rows(_player_rows(players_file), dest, fmt, COLUMNS["players"])
+
+
+def export_highscores(highscores_file: str, dest: str, fmt: str = "csv") -> int:
+    """
+    Writes the best score per user, best first.
+    """
+    scores = get_leaderboard(highscores_file).scores()
+    rows = sorted(scores.items(), key=lambda item: (item[1], item[0]))
+    return export_rows(rows, dest, fmt, COLUMNS["highscores"])
+
+
+# --- Benchmark ---
+def benchmark(rows: int) -> List[Tuple[str, float]]:
+    """
+    Imports `rows` stored-password accounts and as many highscores (with 1%
+    malformed rows and 1% duplicates) into an empty temporary store, then
+    exports both. Returns (operation, rows per second) pairs.
+    """
+    results = []
+    workdir = tempfile.mkdtemp(prefix="mastermind_bulk_")
+    try:
+        players_file = os.path.join(workdir, "players.txt")
+        highscores_file = os.path.join(workdir, "highscores.txt")
+        accounts = os.path.join(workdir, "accounts.csv")
+        scores = os.path.join(workdir, "scores.csv")
+        stored_pw = hash_password("Bench#1")
+        with open(accounts, "w", encoding="utf-8") as a, open(scores, "w", encoding="utf-8") as s:
+            a.write("username,password\n")
+            for i in range(rows):
+                name = f"user{i // 100 if i % 100 == 99 else i:07d}"  # every 100th row repeats a name
+                a.write(f"{name},{stored_pw}\n" if i % 100 != 42 else "broken row\n")
+                s.write(f"{name},{i % 10 + 1}\n" if i % 100 != 42 else f"{name},many\n")
+
+        for operation, run in (
+                ("import players", lambda: import_players(accounts, players_file, stored=True,
+                                                          rejects_file=os.path.join(workdir, "rejects.jsonl"))),
+                ("import highscores", lambda: import_highscores(scores, highscores_file, players_file)),
+                ("export players", lambda: export_players(players_file, os.path.join(workdir, "out.csv"))),
+                ("export highscores", lambda: export_highscores(highscores_file, os.path.join(workdir, "out.jsonl"),
+                                                                "jsonl"))):
+            start = time.perf_counter()
+            outcome = run()
+            results.append((f"{operation} {outcome}", rows / (time.perf_counter() - start)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import/export of Mastermind players and highscores.")
+    parser.add_argument("action", nargs="?", choices=("import", "export"))
+    parser.add_argument("kind", nargs="?", choices=("players", "highscores"))
+    parser.add_argument("path", nargs="?", help="CSV/JSONL file, - for stdin/stdout")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None, help="default: from the file extension")
+    parser.add_argument("--rejects", help="write rejected rows here as JSON lines")
+    parser.add_argument("--stored", action="store_true", help="passwords are stored hashes (an export), not plaintext")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: CPU count)")
+    parser.add_argument("--players-file", default="players.txt")
+    parser.add_argument("--highscores-file", default="highscores.txt")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="time importing and exporting N rows")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for operation, rate in benchmark(args.benchmark):
+            print(f"{operation:40s} {rate:12.0f} rows/s")
+    elif args.action and args.kind and args.path:
+        fmt = args.format or ("jsonl" if args.path.endswith((".jsonl", ".json")) else "csv")
+        try:
+            start = time.perf_counter()
+            if args.action == "import" and args.kind == "players":
+                added, rejected = import_players(args.path, args.players_file, fmt, args.rejects,
+                                                 args.stored, args.workers)
+                print(f"Imported {added} players, rejected {rejected} rows "
+                      f"in {time.perf_counter() - start:.1f} s.", file=sys.stderr)
+            elif args.action == "import":
+                recorded, rejected = import_highscores(args.path, args.highscores_file, args.players_file,
+                                                       fmt, args.rejects)
+                print(f"Recorded {recorded} new bests, rejected {rejected} rows "
+                      f"in {time.perf_counter() - start:.1f} s.", file=sys.stderr)
+            else:
+                if args.kind == "players":
+                    count = export_players(args.players_file, args.path, fmt)
+                else:
+                    count = export_highscores(args.highscores_file, args.path, fmt)
+                print(f"Exported {count} {args.kind} in {time.perf_counter() - start:.1f} s.", file=sys.stderr)
+        except IOError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        parser.print_help()
@@ -2,12 +2,14 @@
 # last edited by SHANNEN (1656H November 1, 2025)
 
 from getpass import getpass
+from player_directory import get_directory
+from password_hash import hash_password, needs_rehash, verify_password
+from registration_journal import register_player, update_password
 import sys
 
 # Start the Program
 # Show game mechanics
 
-shift_val = 7
 FILENAME = 'players.txt' # Define the database filename for easy reuse
 auth_username = ''
 
@@ -16,55 +18,19 @@ auth_username = ''
 #Function used to clear n previous lines
 def clear_lines(n=1):
     """Clears the previous n lines in the terminal."""
-    for _ in range(n):
-        # Move cursor up one line
-        sys.stdout.write('\033[F')
-        # Clear the entire line
-        sys.stdout.write('\033[K')
+    # Move cursor up one line and clear it, n times, sent as one write
+    sys.stdout.write('\033[F\033[K' * n)
     sys.stdout.flush()
 
-# Function to 'encrypt' a password using Caesar's Cipher
-def caesar_encrypt(password, shift=shift_val):
-    """Encrypts the password using Caesar's Cipher with a fixed shift value."""
-    enc_pw = ''
-
-    for char in password:
-        # Check if the current char is an alphabet
-        if char.isalpha():
-            # Set the order of the base character starting from 'A' (65) or 'a' (97)
-            base_char = ord('A') if char.isupper() else ord('a')
-
-            # Formula for character rotation (A-Z or a-z)
-            enc_pw += chr((ord(char) - base_char + shift) % 26 + base_char)
-
-        # Check if the current char is a digit
-        elif char.isdigit():
-            # Formula for digit rotation (0-9)
-            enc_pw += chr((ord(char) - ord('0') + shift) % 10 + ord('0'))
-
-        else:
-            # Special characters are skipped and not encrypted
-            enc_pw += char
-
-    return enc_pw
-
 #Function to check if a username already exists in the database
 def check_username_exists(username):
     """Checks if a username already exists in the database."""
     try:
-        with open(FILENAME, 'r', encoding='utf-8') as players:
-            for line in players:
-                user, _ = line.strip().split(',')
-                if user == username:
-                    return True
-        return False
+        # Look the username up in the in-memory index of the database file
+        return get_directory(FILENAME).exists(username)
     except FileNotFoundError:
         # If the file doesn't exist, no users exist yet.
         return False
-    except ValueError:
-        # Handle lines that might be improperly formatted
-        print("Warning: The database file contains an invalid entry.")
-        return False
     except IOError as e:
         print(f"An error occurred while reading the database: {e}")
         return False
@@ -127,21 +93,23 @@ def register_user():
         #---- End of unsuccessful password attempts -----
 
 
-        # Encrypt the password using the caesar_encrypt() function
-        encrypted_pw = caesar_encrypt(input_pw)
-
-        print(f"Registration successful! Welcome, {input_username}!")
-        registration_successful = True
+        # Hash the password using hash_password() (see password_hash.py)
+        encrypted_pw = hash_password(input_pw)
 
-        # Append the new user's details to the database
+        # Append the new user's details to the database (checked and written under a lock)
         try:
-            with open(FILENAME, 'a', encoding='utf-8') as players:
-                players.write(f'{input_username},{encrypted_pw}\n')
-            
+            if not register_player(FILENAME, input_username, encrypted_pw):
+                print(f"Username '{input_username}' is already taken.")
+                input_error = True
+                continue
+
         except IOError as e:
             print(f"An error occurred while writing to the database: {e}")
             break
 
+        print(f"Registration successful! Welcome, {input_username}!")
+        registration_successful = True
+
         if registration_successful == True:
             return input_username #Return value after a successful registration
 
@@ -161,31 +129,23 @@ def login_user():
         login_successful = False
 
         try:
-            # Open database for player details (username and password).
-            with open(FILENAME, 'r', encoding='utf-8') as players:
-                # Check every line in the opened players.txt file
-                for line in players:
-                    try:
-                        user, enc_pw = line.strip().split(',')
-                    except ValueError:
-                        # Skip lines that don't conform to 'user,password' format
-                        continue
-
-                    # Check if the user matches with the input_user
-                    if user == input_username:
-                        user_found = True
-
-                        # Check if the encrypted input_pw matches the stored enc_pw
-                        if caesar_encrypt(input_pw) == enc_pw:
-                            print(f'Login successful. Welcome back, {user}!')
-                            login_successful = True
-                            return user #Return value after a successful user login
-                        else:
-                            print('Incorrect password.')
-                            print()
-
-                        # Since the username has been found (or matched), break the inner loop
-                        break
+            # Look up the player's details (username and password) in the database index.
+            enc_pw = get_directory(FILENAME).get_password(input_username)
+
+            # Check if the input_username is registered
+            if enc_pw is not None:
+                user_found = True
+
+                # Check input_pw against the stored password hash, upgrading an outdated hash
+                if verify_password(input_pw, enc_pw):
+                    if needs_rehash(enc_pw):
+                        update_password(FILENAME, input_username, hash_password(input_pw))
+                    print(f'Login successful. Welcome back, {input_username}!')
+                    login_successful = True
+                    return input_username #Return value after a successful user login
+                else:
+                    print('Incorrect password.')
+                    print()
 
             if login_successful:
                 break # Exit the login loop on success
@@ -0,0 +1,195 @@
+"""
+Compact integer representation of Mastermind codes.
+
+A CodeSpace is the per-game setting for the color palette and code length.
+It maps codes like ['R', 'G', 'B', 'Y'] to base-len(colors) integers (first
+peg = most significant digit) and keeps per-code digit and color-count tables
+in flat array('B') buffers, so hot loops can store codes as plain integers
+and score them without building lists. The text shown to players is still
+the list of color letters; encode/decode convert at the edges.
+"""
+import itertools
+import random
+from array import array
+from typing import List, Tuple
+
+# Digit/count tables are only built for spaces up to this many codes (8x6 uses ~3.6 MB).
+TABLE_MAX_CODES = 1 << 20
+
+
+class CodeSpace:
+    """
+    The colors and code length of one game, plus the integer codec for its codes.
+    Two spaces with the same colors (in the same order) and length are equal.
+    """
+
+    def __init__(self, colors: List[str], code_length: int):
+        colors = list(colors)
+        if not colors or len(set(colors)) != len(colors) or any(len(c) != 1 for c in colors):
+            raise ValueError(f"Colors must be distinct single letters, got {colors}.")
+        if len(colors) > 255:
+            raise ValueError("At most 255 colors are supported.")
+        if code_length < 1:
+            raise ValueError(f"Code length must be at least 1, got {code_length}.")
+
+        self.colors = colors
+        self.code_length = code_length
+        self.base = len(colors)
+        self.size = self.base ** code_length
+        self.key = ("".join(colors), code_length)
+        self.digit_of = {color: digit for digit, color in enumerate(colors)}
+        self.powers = [self.base ** (code_length - 1 - i) for i in range(code_length)]
+        self.feedback_slots = (code_length + 1) ** 2
+        self._digit_table = None
+        self._count_table = None
+
+    def __eq__(self, other):
+        return isinstance(other, CodeSpace) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"CodeSpace({self.colors!r}, {self.code_length})"
+
+    def __getstate__(self):
+        # the lazily built tables are rebuilt where needed instead of being pickled
+        state = self.__dict__.copy()
+        state["_digit_table"] = None
+        state["_count_table"] = None
+        return state
+
+    # --- codes <-> integers ---
+
+    def encode(self, code: List[str]) -> int:
+        """
+        Maps a code to its integer. Raises KeyError for a color outside the palette
+        and ValueError for a code of the wrong length.
+        """
+        if len(code) != self.code_length:
+            raise ValueError(f"Expected {self.code_length} colors, got {len(code)}.")
+        index = 0
+        for color in code:
+            index = index * self.base + self.digit_of[color]
+        return index
+
+    def decode(self, index: int) -> List[str]:
+        """
+        Rebuilds the list of color letters for an integer code.
+        """
+        return [self.colors[digit] for digit in self.digits(index)]
+
+    def format(self, index: int) -> str:
+        """
+        The text players see for an integer code, e.g. "RGBY".
+        """
+        return "".join(self.decode(index))
+
+    def random_code(self, rng=random) -> int:
+        return rng.randrange(self.size)
+
+    # --- digit and count tables ---
+
+    def digit_table(self) -> array or None:
+        """
+        Flat array with code_length digits per code (row i = digits of code i),
+        or None when the space is larger than TABLE_MAX_CODES.
+        """
+        if self._digit_table is None and self.size <= TABLE_MAX_CODES:
+            # product() counts in base-len(colors) with the first digit most significant
+            rows = itertools.product(range(self.base), repeat=self.code_length)
+            self._digit_table = array("B", itertools.chain.from_iterable(rows))
+        return self._digit_table
+
+    def count_table(self) -> array or None:
+        """
+        Flat array with len(colors) counts per code (how often each color occurs),
+        or None when the space is larger than TABLE_MAX_CODES.
+        """
+        if self._count_table is None and self.size <= TABLE_MAX_CODES:
+            digits = self.digit_table()
+            table = array("B", bytes(self.size * self.base))
+            length = self.code_length
+            for index in range(self.size):
+                offset = index * self.base
+                for digit in digits[index * length:(index + 1) * length]:
+                    table[offset + digit] += 1
+            self._count_table = table
+        return self._count_table
+
+    def digits(self, index: int) -> List[int]:
+        """
+        The color digits of an integer code, most significant first.
+        """
+        table = self.digit_table()
+        if table is not None:
+            return table[index * self.code_length:(index + 1) * self.code_length].tolist()
+        digits = []
+        for _ in range(self.code_length):
+            index, digit = divmod(index, self.base)
+            digits.append(digit)
+        digits.reverse()
+        return digits
+
+    def counts(self, index: int) -> List[int]:
+        """
+        How often each color occurs in an integer code, in palette order.
+        """
+        table = self.count_table()
+        if table is not None:
+            return table[index * self.base:(index + 1) * self.base].tolist()
+        counts = [0] * self.base
+        for digit in self.digits(index):
+            counts[digit] += 1
+        return counts
+
+    # --- scoring ---
+
+    def encode_feedback(self, black: int, white: int) -> int:
+        """
+        Packs a (black, white) result into one small integer (< feedback_slots).
+        """
+        return black * (self.code_length + 1) + white
+
+    def decode_feedback(self, value: int) -> Tuple[int, int]:
+        return divmod(value, self.code_length + 1)
+
+    def score(self, secret: int, guess: int) -> Tuple[int, int]:
+        """
+        Black and white pegs for two integer codes, without building any lists.
+        """
+        digits = self.digit_table()
+        if digits is None:
+            return self._score_unindexed(secret, guess)
+        counts = self.count_table()
+
+        length = self.code_length
+        s = secret * length
+        g = guess * length
+        black = 0
+        for i in range(length):
+            if digits[s + i] == digits[g + i]:
+                black += 1
+
+        base = self.base
+        s = secret * base
+        g = guess * base
+        common = 0
+        for i in range(base):
+            a = counts[s + i]
+            b = counts[g + i]
+            common += a if a < b else b
+        return black, common - black
+
+    def _score_unindexed(self, secret: int, guess: int) -> Tuple[int, int]:
+        """
+        score() for spaces too large for the digit/count tables.
+        """
+        black = 0
+        for a, b in zip(self.digits(secret), self.digits(guess)):
+            if a == b:
+                black += 1
+        common = 0
+        for a, b in zip(self.counts(secret), self.counts(guess)):
+            common += a if a < b else b
+        return black, common - black
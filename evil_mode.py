@@ -0,0 +1,85 @@
+"""
+Hard mode: an adversarial "evil codemaker" that never commits to a secret.
+
+After each guess the live candidate set is partitioned by the feedback every
+candidate would give, and the codemaker answers with the feedback of the
+largest group, so the player always faces the worst case. Candidates are a
+digit array scored with batch_scoring, which keeps a move well under 20 ms on
+the 6x4 space and usable on 8x5.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+import batch_scoring
+from codec import CodeSpace
+from game_core import larongutak
+
+
+class EvilCodemaker:
+    """
+    Keeps every code that is still consistent with the answers given so far.
+    """
+
+    def __init__(self, space: CodeSpace = None):
+        self.space = space or larongutak.default_space()
+        self.candidates = batch_scoring.all_codes_array(self.space)
+        self.candidate_counts = batch_scoring.color_counts(self.candidates, self.space)
+
+    def respond(self, guess: List[str]) -> Tuple[int, int]:
+        """
+        Returns the feedback that leaves the most candidates, and keeps only those.
+        Among equally large groups the one with the fewest black pegs wins, so
+        the player is only told they won when a single code is left.
+        """
+        feedback = batch_scoring.feedback_block(guess, self.candidates, self.candidate_counts, self.space)[0]
+        sizes = np.bincount(feedback, minlength=self.space.feedback_slots)
+        value = int(np.argmax(sizes))  # first maximum = lowest packed feedback
+
+        keep = feedback == value
+        self.candidates = self.candidates[keep]
+        self.candidate_counts = self.candidate_counts[keep]
+        return self.space.decode_feedback(value)
+
+    def remaining(self) -> int:
+        return len(self.candidates)
+
+    def reveal(self) -> List[str]:
+        """
+        A code consistent with every answer, shown when the player runs out of attempts.
+        """
+        return batch_scoring.array_to_codes(self.candidates[:1], self.space)[0]
+
+
+def play_evil_game(username: str, space: CodeSpace = None) -> Tuple[int, bool]:
+    """
+    Executes one round against the evil codemaker. Returns attempts used and win status.
+    """
+    space = space or larongutak.default_space()
+    codemaker = EvilCodemaker(space)
+
+    print("\n=== Mastermind Hard Mode: the codemaker is watching your guesses ===")
+    print(f"Colors: {', '.join(space.colors)} (use letters). Code length: {space.code_length}.")
+    print(f"You have {larongutak.MAX_ATTEMPTS} attempts. Repeats allowed. No secret is chosen in advance.")
+
+    attempts_used = 0
+
+    for attempt in range(1, larongutak.MAX_ATTEMPTS + 1):
+        attempts_used = attempt
+        while True:
+            raw = input(f"Attempt {attempt}/{larongutak.MAX_ATTEMPTS} - Enter your guess: ")
+            guess = larongutak.parse_guess(raw, space)
+            if guess is None:
+                print(f"Invalid guess. Enter {space.code_length} colors using letters from {space.colors}.")
+                continue
+            break
+
+        black, white = codemaker.respond(guess)
+        print(f"Feedback -> Black pegs (correct color+pos): {black}, White pegs (correct color wrong pos): {white}")
+
+        if black == space.code_length:
+            print(f"You beat the evil codemaker, {username}! 🎉")
+            return attempts_used, True
+
+    print("Game Over! Code was: " + "".join(codemaker.reveal()))
+    return attempts_used, False
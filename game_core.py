@@ -0,0 +1,33 @@
+"""
+Loads the extension-less ``larongutak`` script as an importable module so the
+helper modules (solver, hints, simulation, ...) share its rules and constants.
+"""
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+LARONGUTAK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "larongutak")
+
+
+def load_larongutak():
+    """
+    Returns the larongutak module, loading it from LARONGUTAK_PATH on first use.
+    When larongutak is the running script it registers itself, so the same
+    module object (and the same settings) is shared with every helper module.
+    """
+    module = sys.modules.get("larongutak")
+    if module is None:
+        loader = importlib.machinery.SourceFileLoader("larongutak", LARONGUTAK_PATH)
+        spec = importlib.util.spec_from_loader("larongutak", loader)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["larongutak"] = module
+        try:
+            loader.exec_module(module)
+        except BaseException:
+            del sys.modules["larongutak"]
+            raise
+    return module
+
+
+larongutak = load_larongutak()
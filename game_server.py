@@ -0,0 +1,253 @@
+"""
+Asyncio TCP server for Mastermind, one process for many concurrent players.
+
+Each connection is a small state machine driven by one command per line, so
+thousands of players share a single event loop instead of one blocking
+input() loop per process. The game rules come from larongutak
+(generate_secret_code, parse_guess, score_guess, update_leaderboard) and the
+player/highscore files are read and written, and passwords hashed, on a
+thread pool, never on the event loop.
+
+Protocol (one request line, one response line starting with OK or ERR):
+
+    REGISTER <username> <password>   OK registered <username>
+                                     ERR invalid username|password: <reason>
+    LOGIN <username> <password>      OK welcome <username>
+    PLAY                             OK game colors=RGBYWO length=4 attempts=10
+    GUESS <code>                     OK feedback <black> <white> <attempt>
+                                     OK win <attempts>  /  OK lose <secret>
+    TOP                              OK top <user>:<score> ...
+    STATS                            OK stats rank=<r> players=<n> games=<g> win_rate=<w> average=<a>
+    QUIT                             OK bye
+
+Run "python game_server.py" to serve, or with "--client" for an interactive
+client. tests/test_game_server.py plays scripted clients against a private server.
+"""
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+import storage
+from game_core import larongutak
+from password_hash import hash_password
+from validation import password_problem, username_problem
+
+HOST = "127.0.0.1"
+PORT = 7227
+STORAGE_THREADS = 8  # threads doing player/highscore file I/O
+IDLE_TIMEOUT = 300  # seconds before an idle connection is closed
+MAX_LINE = 1024  # longest accepted request line in bytes
+
+
+class Session:
+    """
+    State of one connection: the logged-in user and the game in progress.
+    """
+
+    def __init__(self):
+        self.username = None
+        self.space = larongutak.default_space()
+        self.secret = None
+        self.attempts = 0
+
+
+class GameServer:
+    """
+    Dispatches protocol commands; blocking storage calls go to a thread pool.
+    """
+
+    def __init__(self, storage_threads: int = STORAGE_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=storage_threads, thread_name_prefix="storage")
+        self.connections = 0
+        self.games = 0
+
+    async def _io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def warm_up(self) -> None:
+        """
+        Builds (or loads) the feedback table before connections are accepted;
+        the first score_guess would otherwise build it on the event loop.
+        """
+        await self._io(larongutak.get_feedback_table)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        session = Session()
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not raw:
+                    break
+                reply = await self.dispatch(session, raw.decode("utf-8", errors="replace").strip())
+                writer.write(reply.encode("utf-8") + b"\n")
+                await writer.drain()
+                if reply == "OK bye":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def dispatch(self, session: Session, line: str) -> str:
+        parts = line.split(maxsplit=2)
+        if not parts:
+            return "ERR empty command"
+        command = parts[0].upper()
+        args = parts[1:]
+        try:
+            if command in ("REGISTER", "LOGIN"):
+                if len(args) != 2:
+                    return f"ERR usage: {command} <username> <password>"
+                return await (self.register if command == "REGISTER" else self.login)(session, *args)
+            if command == "QUIT":
+                return "OK bye"
+            if command == "TOP":
+                top = await self._io(larongutak.get_storage().top_highscores, 5, larongutak.HIGHSCORES_FILE)
+                return "OK top " + " ".join(f"{user}:{s}" for user, s in top)
+            if session.username is None:
+                return "ERR login first"
+            if command == "PLAY":
+                return self.play(session)
+            if command == "GUESS":
+                return await self.guess(session, args[0] if args else "")
+            if command == "STATS":
+                return await self.stats(session)
+        except IOError as e:
+            return f"ERR storage: {e}"
+        return f"ERR unknown command {command}"
+
+    async def register(self, session: Session, username: str, password: str) -> str:
+        username = username.strip().lower()
+        # the rules of terminal registration, and nothing that would corrupt players.txt
+        problem = username_problem(username)
+        if problem:
+            return f"ERR invalid username: {problem}"
+        problem = password_problem(password)
+        if problem:
+            return f"ERR invalid password: {problem}"
+        stored_pw = await self._io(hash_password, password)  # deliberately slow, keep it off the loop
+        if not await self._io(larongutak.get_storage().add_player, username, stored_pw):
+            return "ERR username already taken"
+        return f"OK registered {username}"
+
+    async def login(self, session: Session, username: str, password: str) -> str:
+        username = username.strip().lower()
+        if not await self._io(storage.check_password, larongutak.get_storage(), username, password):
+            return "ERR access denied"
+        session.username = username
+        return f"OK welcome {username}"
+
+    def play(self, session: Session) -> str:
+        space = session.space
+        session.secret = larongutak.generate_secret_code(space)
+        session.attempts = 0
+        self.games += 1
+        return (f"OK game colors={''.join(space.colors)} length={space.code_length} "
+                f"attempts={larongutak.MAX_ATTEMPTS}")
+
+    async def guess(self, session: Session, raw: str) -> str:
+        if session.secret is None:
+            return "ERR no game, send PLAY"
+        space = session.space
+        guess = larongutak.parse_guess(raw, space)
+        if guess is None:
+            return f"ERR invalid guess, enter {space.code_length} colors from {''.join(space.colors)}"
+
+        session.attempts += 1
+        black, white = larongutak.score_guess(session.secret, guess, space)
+        if black == space.code_length:
+            return await self._finish(session, True, f"OK win {session.attempts}")
+        if session.attempts >= larongutak.MAX_ATTEMPTS:
+            return await self._finish(session, False, "OK lose " + "".join(session.secret))
+        return f"OK feedback {black} {white} {session.attempts}"
+
+    async def _finish(self, session: Session, won: bool, reply: str) -> str:
+        attempts, session.secret = session.attempts, None
+        # lower score (fewer guesses) is better, as in main_menu; nobody reads this process's stdout
+        await self._io(larongutak.update_leaderboard, session.username, attempts, None, won, True)
+        return reply
+
+    async def stats(self, session: Session) -> str:
+        backend = larongutak.get_storage()
+        standing = await self._io(backend.player_standing, session.username, 0, larongutak.HIGHSCORES_FILE)
+        stats = await self._io(backend.player_stats, session.username, larongutak.HIGHSCORES_FILE)
+        fields = []
+        if standing is not None:
+            fields += [f"rank={standing['rank']}", f"players={standing['players']}"]
+        if stats is not None:
+            fields += [f"games={stats['games']}", f"win_rate={stats['win_rate']:.2f}",
+                       f"average={stats['average_attempts']:.2f}"]
+        return "OK stats " + " ".join(fields)
+
+
+async def serve(host: str = HOST, port: int = PORT) -> None:
+    game_server = GameServer()
+    await game_server.warm_up()
+    server = await asyncio.start_server(game_server.handle, host, port, limit=MAX_LINE)
+    print(f"Mastermind server listening on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+    async with server:
+        await server.serve_forever()
+
+
+# --- Client stand-in ---
+class Client:
+    """
+    Minimal protocol client: send() one command, get the response line back.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = HOST, port: int = PORT) -> "Client":
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def send(self, line: str) -> str:
+        self.writer.write(line.encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return (await self.reader.readline()).decode("utf-8").rstrip("\n")
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def interactive_client(host: str, port: int) -> None:
+    client = await Client.connect(host, port)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            reply = await client.send(line.strip())
+            print(reply)
+            if reply == "OK bye":
+                break
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mastermind line-protocol game server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--client", action="store_true", help="connect as an interactive client")
+    args = parser.parse_args()
+
+    instrumentation.install()  # metrics dump on exit/SIGUSR1 when MASTERMIND_METRICS is set
+    try:
+        if args.client:
+            asyncio.run(interactive_client(args.host, args.port))
+        else:
+            asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
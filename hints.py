@@ -0,0 +1,103 @@
+"""
+Incremental hint engine for play_game.
+
+The consistent secrets are tracked as one boolean mask over the code space.
+Each (guess, black, white) result narrows the mask in place, and the most
+informative guess for a given mask is cached, so repeated states (the opening
+above all) are answered without recomputing. Hints do not follow the opening
+book: its moves are Knuth's minimax choices, which keep the worst case small
+but are not always the guess with the most expected information.
+"""
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+import batch_scoring
+import solver
+from codec import CodeSpace
+from game_core import larongutak
+
+# Most (guess, candidate) pairs a hint scores; larger spaces sample their guesses.
+HINT_MAX_PAIRS = 1 << 22
+
+
+@lru_cache(maxsize=4096)
+def _best_guess_for_state(packed_mask: bytes, space: CodeSpace) -> Tuple[int, float]:
+    """
+    Returns (guess index, expected information in bits) for a candidate mask.
+    """
+    mask = np.unpackbits(np.frombuffer(packed_mask, dtype=np.uint8), count=space.size).astype(bool)
+    candidates = np.flatnonzero(mask)
+    if len(candidates) == 1:
+        return int(candidates[0]), 0.0
+
+    # every code is a possible guess unless that would score too many pairs;
+    # then an evenly spread sample of the candidates is tried instead
+    guesses = np.arange(space.size, dtype=np.int64)
+    if space.size * len(candidates) > HINT_MAX_PAIRS:
+        sample = max(1, min(len(candidates), HINT_MAX_PAIRS // len(candidates)))
+        guesses = candidates[np.linspace(0, len(candidates) - 1, sample).astype(np.int64)]
+
+    matrix = solver.feedback_matrix(space)
+    if matrix is not None:
+        feedback = matrix[guesses][:, candidates]
+    else:
+        codes = batch_scoring.all_codes_array(space)
+        feedback = batch_scoring.feedback_block(codes[guesses], codes[candidates], space=space)
+    counts = solver.partition_sizes(feedback, space)
+    p = counts / float(len(candidates))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+    # prefer a code that could still be the secret when it is as informative
+    best = entropy.max()
+    tied = np.flatnonzero(entropy >= best - 1e-9)
+    consistent = tied[mask[guesses[tied]]]
+    choice = int(consistent[0] if len(consistent) else tied[0])
+    return int(guesses[choice]), float(entropy[choice])
+
+
+class HintEngine:
+    """
+    Tracks which secrets are still possible during one game.
+    """
+
+    def __init__(self, space: CodeSpace = None):
+        self.space = space or larongutak.default_space()
+        self.matrix = solver.feedback_matrix(self.space)
+        self.codes = None if self.matrix is not None else batch_scoring.all_codes_array(self.space)
+        self.mask = np.ones(self.space.size, dtype=bool)
+        self.remaining = self.space.size
+
+    def record(self, guess: List[str], black: int, white: int) -> int:
+        """
+        Narrows the mask with one turn's feedback. Returns the number of codes left.
+        """
+        index = self.space.encode(guess)
+        if self.matrix is not None:
+            row = self.matrix[index]
+        else:
+            row = batch_scoring.feedback_block(self.codes[index], self.codes, space=self.space)[0]
+        np.logical_and(self.mask, row == self.space.encode_feedback(black, white), out=self.mask)
+        self.remaining = int(np.count_nonzero(self.mask))
+        return self.remaining
+
+    def best_guess(self) -> Tuple[List[str], float]:
+        """
+        Returns the guess with the highest expected information and that information in bits.
+        """
+        if self.remaining == 0:
+            raise ValueError("No code is consistent with the feedback given.")
+        index, bits = _best_guess_for_state(np.packbits(self.mask).tobytes(), self.space)
+        return self.space.decode(index), bits
+
+    def hint_text(self) -> str:
+        """
+        The message play_game shows for the "hint" command.
+        """
+        guess, bits = self.best_guess()
+        if self.remaining == 1:
+            return f"Hint: only one code fits the feedback so far. Try {''.join(guess)}."
+        return (f"Hint: {self.remaining} possible codes remain. "
+                f"Try {''.join(guess)} (expected information {bits:.2f} bits).")
@@ -0,0 +1,336 @@
+"""
+Call counts and latency histograms for the hot paths.
+
+Set MASTERMIND_METRICS to a file name to turn it on ("-" for stdout); the
+collected metrics are written there on exit and on SIGUSR1, as JSON for a
+.json name and in the Prometheus text format otherwise. Without it, @timed
+returns the function itself and timer() is a shared no-op, so disabled
+instrumentation costs nothing on the decorated paths.
+
+Latencies go into log-linear buckets (8 per power of two of nanoseconds,
+at most 12.5% wide), so recording is one dict increment and p50/p99 come out of
+the buckets without keeping samples.
+
+MASTERMIND_PROFILE names a file for a cProfile capture of one session (see
+profiled()), readable with "python -m pstats".
+"""
+import atexit
+import contextlib
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+METRICS_FILE = os.environ.get("MASTERMIND_METRICS", "")  # "" disables metrics
+PROFILE_FILE = os.environ.get("MASTERMIND_PROFILE", "")  # "" disables profiling
+ENABLED = bool(METRICS_FILE)
+QUANTILES = (0.5, 0.9, 0.99)
+
+SUB_BUCKET_BITS = 3  # 2**3 buckets per power of two
+
+_histograms = {}  # type: Dict[str, Histogram]
+_histograms_lock = threading.Lock()
+
+
+def _bucket(ns: int) -> int:
+    if ns < 2 << SUB_BUCKET_BITS:
+        return ns
+    shift = ns.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (ns >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    if index < 2 << SUB_BUCKET_BITS:
+        return index, index + 1
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = (index & ((1 << SUB_BUCKET_BITS) - 1)) | (1 << SUB_BUCKET_BITS)
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Histogram:
+    """
+    Count, total, min, max and bucketed latencies (in nanoseconds) of one operation.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self.buckets = {}  # type: Dict[int, int]
+        self._lock = threading.Lock()
+
+    def record(self, ns: int) -> None:
+        # _bucket() inlined, this runs on every instrumented call
+        if ns < 2 << SUB_BUCKET_BITS:
+            bucket = ns
+        else:
+            shift = ns.bit_length() - SUB_BUCKET_BITS - 1
+            bucket = (shift << SUB_BUCKET_BITS) + (ns >> shift)
+        buckets = self.buckets
+        with self._lock:
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+            self.total += ns
+            if ns > self.max:
+                self.max = ns
+            if ns < self.min or not self.count:
+                self.min = ns
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimated latency in nanoseconds below which a share q of the calls fell.
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for bucket in sorted(self.buckets):
+                seen += self.buckets[bucket]
+                if seen >= rank:
+                    low, high = _bucket_bounds(bucket)
+                    return float(min(max((low + high) / 2, self.min), self.max))
+            return float(self.max)
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Adds the calls of other, e.g. a histogram sent back by a worker process.
+        """
+        with self._lock:
+            for bucket, count in other.buckets.items():
+                self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+            if other.count:
+                self.max = max(self.max, other.max)
+                self.min = other.min if not self.count else min(self.min, other.min)
+            self.total += other.total
+            self.count += other.count
+
+    def reset(self) -> None:
+        with self._lock:
+            self.buckets = {}
+            self.count = self.total = self.min = self.max = 0
+
+    def __getstate__(self):
+        # picklable for worker processes; the lock is not
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def summary(self) -> Dict[str, float]:
+        summary = {"count": self.count, "total_ms": self.total / 1e6,
+                   "min_us": self.min / 1e3, "max_us": self.max / 1e3}
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}_us"] = self.quantile(q) / 1e3
+        return summary
+
+
+def histogram(name: str) -> Histogram:
+    """
+    Returns the histogram for name, creating it on first use.
+    """
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, Histogram(name))
+    return hist
+
+
+def timed(name: str = None):
+    """
+    Decorator recording the latency of every call under name (default:
+    module.function). Returns the function unchanged when metrics are off.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        hist = histogram(name or f"{fn.__module__}.{fn.__qualname__}")
+        clock = time.perf_counter_ns
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.record(clock() - start)
+
+        return wrapper
+
+    return decorate
+
+
+class _Timer:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.hist.record(time.perf_counter_ns() - self.start)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timer(name: str):
+    """
+    Context manager recording the latency of a block under name.
+    """
+    if not ENABLED:
+        return _NO_TIMER
+    return _Timer(histogram(name))
+
+
+def histograms() -> Dict[str, Histogram]:
+    """
+    {name: histogram} for every histogram with at least one call.
+    """
+    return {name: hist for name, hist in sorted(_histograms.items()) if hist.count}
+
+
+def reset() -> None:
+    """
+    Empties every histogram, e.g. after a warm-up that should not be counted.
+    """
+    for hist in list(_histograms.values()):
+        hist.reset()
+
+
+# --- Output ---
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """
+    {name: summary} for every histogram with at least one call.
+    """
+    return {name: hist.summary() for name, hist in histograms().items()}
+
+
+def to_json() -> str:
+    import json
+
+    return json.dumps(snapshot(), indent=2, sort_keys=True)
+
+
+def to_prometheus() -> str:
+    """
+    The histograms as one Prometheus summary, labelled by operation.
+    """
+    lines = ["# HELP mastermind_call_seconds Latency of instrumented calls.",
+             "# TYPE mastermind_call_seconds summary"]
+    for name, hist in sorted(_histograms.items()):
+        if not hist.count:
+            continue
+        for q in QUANTILES:
+            lines.append(f'mastermind_call_seconds{{op="{name}",quantile="{q:g}"}} {hist.quantile(q) / 1e9:.9f}')
+        lines.append(f'mastermind_call_seconds_sum{{op="{name}"}} {hist.total / 1e9:.9f}')
+        lines.append(f'mastermind_call_seconds_count{{op="{name}"}} {hist.count}')
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: str = None) -> None:
+    """
+    Writes the metrics to path (default METRICS_FILE): JSON for a .json name,
+    Prometheus text otherwise, "-" for stdout.
+    """
+    path = path or METRICS_FILE
+    text = to_json() + "\n" if path.endswith(".json") else to_prometheus()
+    if path == "-":
+        sys.stdout.write(text)
+        return
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except IOError as e:
+        print(f"Error writing metrics: {e}")
+
+
+def install() -> None:
+    """
+    Dumps the metrics on exit and on SIGUSR1 when metrics are on. Call from the main thread.
+    """
+    if not ENABLED:
+        return
+    atexit.register(dump)
+    if hasattr(signal, "SIGUSR1"):
+        # the handler runs in the main thread, possibly inside Histogram.record
+        # holding a histogram lock, so the dump is left to another thread
+        signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=dump, daemon=True).start())
+
+
+@contextlib.contextmanager
+def profiled(path: str = None):
+    """
+    Runs the block under cProfile and saves the stats to path (default
+    PROFILE_FILE); does nothing when neither is set.
+    """
+    path = path or PROFILE_FILE
+    if not path:
+        yield
+        return
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        print(f"Profile written to {path} (python -m pstats {path})")
+
+
+def overhead(calls: int = 200000) -> List[tuple]:
+    """
+    Per-call cost in nanoseconds of a trivial function, plain, under @timed
+    with a histogram, and under the disabled decorator.
+    """
+    global ENABLED
+
+    def work():
+        return None
+
+    rows = []
+    saved = ENABLED
+    try:
+        for label, enabled in (("plain", None), ("timed, enabled", True), ("timed, disabled", False)):
+            fn = work
+            if enabled is not None:
+                ENABLED = enabled
+                fn = timed("overhead")(work)
+            start = time.perf_counter_ns()
+            for _ in range(calls):
+                fn()
+            rows.append((label, (time.perf_counter_ns() - start) / calls))
+    finally:
+        ENABLED = saved
+        _histograms.pop("overhead", None)
+    return rows
+
+
+if __name__ == "__main__":
+    for label, ns in overhead():
+        print(f"{label:16s} {ns:8.1f} ns/call")
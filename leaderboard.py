@@ -0,0 +1,363 @@
+"""
+Append-only highscore log with an incrementally maintained leaderboard.
+
+A highscores file keeps the "username,score" line format, but a new best is
+appended as one more line instead of rewriting the file, and the lowest score
+per username wins. A Leaderboard indexes one file in memory: a best-per-user
+dict plus the TOP_K best (score, username) entries in sorted order. Like
+player_directory it only stat()s the file afterwards and parses just the
+lines other terminals appended. Once the log holds many superseded lines it
+is compacted to one line per user with an atomic replace.
+
+For rank queries the best scores are also counted in a Fenwick tree over
+score buckets (scores are small attempt counts), with the usernames of each
+bucket kept sorted. Rank and percentile are O(log s) in the number of
+distinct scores s, and "players around me" adds a bisect in one bucket. A
+new best is not O(log n): moving the username between the sorted bucket
+lists shifts them, O(b) in the bucket size b (a memmove, cheap next to
+parsing the line, but it grows with the players sharing a score).
+"""
+import bisect
+import heapq
+import os
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks on Windows, single-terminal use only
+    fcntl = None
+
+TOP_K = 5  # entries kept sorted in memory, enough for display_top5
+COMPACT_MIN_LINES = 1000  # never compact logs shorter than this
+COMPACT_RATIO = 2  # compact once the log has this many lines per player
+
+# One leaderboard per highscores file path, see get_leaderboard.
+_leaderboards = {}
+
+
+class ScoreRanks:
+    """
+    Order statistics over (score, username) pairs with non-negative integer scores:
+    a Fenwick tree of player counts per score plus the sorted usernames per score.
+    """
+
+    def __init__(self, size: int = 16):
+        self._tree = [0] * (size + 1)
+        self._buckets = {}  # type: Dict[int, List[str]]
+        self.players = 0
+
+    def _grow(self, score: int) -> None:
+        size = len(self._tree) - 1
+        while size <= score:
+            size *= 2
+        self._tree = [0] * (size + 1)
+        for bucket, users in self._buckets.items():
+            self._add(bucket, len(users))
+
+    def _add(self, score: int, delta: int) -> None:
+        i = score + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def count_below(self, score: int) -> int:
+        """
+        Number of players whose score is lower (better) than score.
+        """
+        i = min(score, len(self._tree) - 1)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def insert(self, score: int, user: str) -> None:
+        """
+        Adds (score, user); O(log s) in the tree plus an O(b) insort into the bucket.
+        """
+        if score >= len(self._tree) - 1:
+            self._grow(score)
+        bisect.insort(self._buckets.setdefault(score, []), user)
+        self._add(score, 1)
+        self.players += 1
+
+    def remove(self, score: int, user: str) -> None:
+        """
+        Removes (score, user); like insert, O(b) in the size of the bucket.
+        """
+        users = self._buckets[score]
+        del users[bisect.bisect_left(users, user)]
+        if not users:
+            del self._buckets[score]
+        self._add(score, -1)
+        self.players -= 1
+
+    def position(self, score: int, user: str) -> int:
+        """
+        0-based position of (score, user) in (score, username) order.
+        """
+        return self.count_below(score) + bisect.bisect_left(self._buckets[score], user)
+
+    def at(self, position: int) -> Tuple[int, str]:
+        """
+        The (score, username) pair at a 0-based position.
+        """
+        # Fenwick descent: the largest prefix of buckets holding <= position players
+        i, remaining = 0, position
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            j = i + step
+            if j < len(self._tree) and self._tree[j] <= remaining:
+                i = j
+                remaining -= self._tree[j]
+            step >>= 1
+        return i, self._buckets[i][remaining]
+
+
+class Leaderboard:
+    """
+    Best score per user and the top TOP_K for one highscores log.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.best = {}  # type: Dict[str, int]
+        self._top = []  # type: List[Tuple[int, str]]  sorted, at most TOP_K entries
+        self._ranks = ScoreRanks()
+        self._lock = threading.RLock()  # the game server queries from several threads
+        self._lines = 0  # records in the log, superseded ones included
+        self._signature = None  # (device, inode, size, mtime) of the indexed file
+        self._offset = 0  # bytes of the file already indexed (always at a line end)
+
+    def _apply(self, user: str, score: int) -> bool:
+        """
+        Takes one record into the index. Returns True if it was a new best for user.
+        """
+        prev = self.best.get(user)
+        if prev is not None and score >= prev:
+            return False
+        self.best[user] = score
+        if prev is not None:
+            self._ranks.remove(max(prev, 0), user)
+        self._ranks.insert(max(score, 0), user)
+        # scores only ever improve, so an entry leaves the top only when pushed out
+        if prev is not None and (prev, user) in self._top:
+            self._top.remove((prev, user))
+        if len(self._top) < TOP_K or (score, user) < self._top[-1]:
+            bisect.insort(self._top, (score, user))
+            del self._top[TOP_K:]
+        return True
+
+    def _parse(self, data: bytes) -> None:
+        for raw in data.decode("utf-8", errors="replace").splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                user, s = line.split(",", 1)
+                score = int(s)
+            except ValueError:
+                # malformed line, skip
+                continue
+            self._lines += 1
+            self._apply(user, score)
+
+    def refresh(self) -> None:
+        """
+        Brings the index up to date with the file if its size or mtime changed.
+        A missing file is an empty leaderboard.
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self.best, self._top, self._lines = {}, [], 0
+                self._ranks = ScoreRanks()
+                self._signature, self._offset = None, 0
+                return
+            signature = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            if signature == self._signature:
+                return
+
+            appended = (self._signature is not None and self._signature[:2] == signature[:2]
+                        and st.st_size > self._signature[2])
+            if not appended:
+                self.best, self._top, self._lines, self._offset = {}, [], 0, 0
+                self._ranks = ScoreRanks()
+
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            self._parse(data[:end])
+            self._offset += end
+            self._signature = signature
+
+    def record(self, user: str, score: int) -> int or None:
+        """
+        Appends score for user to the log if it beats their best.
+        Returns the previous best (None for a new player); it is unchanged
+        when the score was not an improvement.
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with _locked_log(self.path) as f:
+                self.refresh()
+                prev = self.best.get(user)
+                if prev is None or score < prev:
+                    f.write(f"{user},{score}\n".encode("utf-8"))
+                    f.flush()
+                    self.refresh()
+                if self._lines >= max(COMPACT_MIN_LINES, COMPACT_RATIO * len(self.best)):
+                    self._compact()
+            return prev
+
+    def record_many(self, rows: List[Tuple[str, int]]) -> int:
+        """
+        Appends every (user, score) that beats the user's best, in one write
+        under one lock. Returns the number of records appended.
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with _locked_log(self.path) as f:
+                self.refresh()
+                batch = {}
+                for user, score in rows:
+                    best = batch.get(user, self.best.get(user))
+                    if best is None or score < best:
+                        batch[user] = score
+                if batch:
+                    f.write("".join(f"{user},{s}\n" for user, s in batch.items()).encode("utf-8"))
+                    f.flush()
+                    self.refresh()
+                if self._lines >= max(COMPACT_MIN_LINES, COMPACT_RATIO * len(self.best)):
+                    self._compact()
+            return len(batch)
+
+    def top(self, k: int = TOP_K) -> List[Tuple[str, int]]:
+        """
+        The k best (username, score) pairs, lowest score first, ties by username.
+        """
+        with self._lock:
+            self.refresh()
+            if k <= TOP_K:
+                entries = self._top[:k]
+            else:
+                entries = heapq.nsmallest(k, ((s, user) for user, s in self.best.items()))
+            return [(user, s) for s, user in entries]
+
+    def rank(self, user: str) -> Tuple[int, int] or None:
+        """
+        (rank, players) for user, or None if they have no score. Players with
+        the same score share a rank: rank is 1 + the number of better players.
+        """
+        with self._lock:
+            self.refresh()
+            score = self.best.get(user)
+            if score is None:
+                return None
+            return self._ranks.count_below(max(score, 0)) + 1, self._ranks.players
+
+    def percentile(self, user: str) -> float or None:
+        """
+        Percentage of players with a worse score than user, or None if they have no score.
+        """
+        with self._lock:
+            self.refresh()
+            score = self.best.get(user)
+            if score is None:
+                return None
+            worse = self._ranks.players - self._ranks.count_below(max(score, 0) + 1)
+            return 100.0 * worse / self._ranks.players
+
+    def around(self, user: str, k: int = 2) -> List[Tuple[int, str, int]]:
+        """
+        Up to k players on each side of user in leaderboard order, user included,
+        as (position, username, score) with 1-based positions. Empty if user has no score.
+        """
+        with self._lock:
+            self.refresh()
+            score = self.best.get(user)
+            if score is None:
+                return []
+            here = self._ranks.position(max(score, 0), user)
+            rows = []
+            for position in range(max(0, here - k), min(self._ranks.players, here + k + 1)):
+                _, name = self._ranks.at(position)
+                rows.append((position + 1, name, self.best[name]))
+            return rows
+
+    def scores(self) -> Dict[str, int]:
+        with self._lock:
+            self.refresh()
+            return dict(self.best)
+
+    def replace(self, scores: Dict[str, int]) -> None:
+        """
+        Replaces the whole log with one line per (user, score) in scores.
+        The new file is written aside and swapped in under the log lock, so
+        other terminals see a new inode and reindex instead of mistaking the
+        rewrite for an append.
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with _locked_log(self.path):
+                self._write(scores)
+
+    def _compact(self) -> None:
+        """
+        Rewrites the log with one line per user. Called with the log locked.
+        """
+        self._write(self.best)
+
+    def _write(self, scores: Dict[str, int]) -> None:
+        # called with the log locked, so one temp name is enough
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for user, s in scores.items():
+                f.write(f"{user},{s}\n")
+        os.replace(tmp_path, self.path)
+        self._signature = None
+        self.refresh()
+
+
+class _locked_log:
+    """
+    Opens the log for appending under an exclusive lock. If another terminal
+    compacted (replaced) the file while we waited, the new file is opened instead.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.f = None
+
+    def __enter__(self):
+        while True:
+            f = open(self.path, "ab")
+            if fcntl is None:
+                break
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(self.path).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+        self.f = f
+        return f
+
+    def __exit__(self, *exc_info):
+        # closing the file releases the lock
+        self.f.close()
+
+
+def get_leaderboard(path: str) -> Leaderboard:
+    """
+    Returns the shared Leaderboard for a highscores file path.
+    """
+    key = os.path.abspath(path)
+    board = _leaderboards.get(key)
+    if board is None:
+        board = _leaderboards[key] = Leaderboard(path)
+    return board
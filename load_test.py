@@ -0,0 +1,228 @@
+"""
+Load generator for the login and registration path of the text-file store.
+
+Each run builds a players.txt with N existing players in a temporary
+directory, then `processes` worker processes with `threads` threads each
+(every process is one game terminal) log in and sign up as fast as they can.
+An operation does what login_user and register_user do, minus the prompts:
+
+    login     storage.check_password on the TextFileBackend
+    register  username and password validation (validation.username_problem
+              and password_problem), the check_username_exists lookup,
+              hash_password, then add_player through the registration journal
+
+Some sign-ups pick a taken username and are turned away by the lookup, like
+a player trying a name that is gone. Per store size the report has
+throughput, p50/p99 latency of both operations and the lock contention on
+players.txt: the p99 wait for the registration lock, the share of wall time
+the lock was held (near 100% means registrations queue behind it), and the
+mean group commit batch. Timings come from the instrumentation histograms
+the store records itself, merged across the worker processes.
+
+Hashes use a cheap scrypt cost (--log2n, default 10) so the store is
+measured rather than the key derivation; pass --log2n 14 for real logins.
+
+    python load_test.py                            1k to 1M players
+    python load_test.py --users 1000,10000 --processes 8 --json
+    python load_test.py --max-p99-ms 50            exit 1 if p99 goes over budget
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import instrumentation
+
+DEFAULT_USERS = "1000,10000,100000,1000000"
+LOGIN_SHARE = 0.8  # share of operations that are logins, the rest are sign-ups
+TAKEN_SHARE = 0.1  # share of sign-ups that try an existing username
+PASSWORD = "Secret#1"  # valid by the validation rules, used by every test player
+POPULATE_CHUNK = 50000  # players.txt lines per write when building the store
+
+_barrier = None  # start line shared by the worker processes, see _init_worker
+
+
+def _player(i: int) -> str:
+    return f"player{i:07d}"
+
+
+def populate(path: str, users: int, stored_pw: str) -> None:
+    """
+    Writes a players file of users players who all share stored_pw.
+    """
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        for start in range(0, users, POPULATE_CHUNK):
+            f.write("".join(f"{_player(i)},{stored_pw}\n" for i in range(start, min(start + POPULATE_CHUNK, users))))
+
+
+def _init_worker(barrier) -> None:
+    global _barrier
+    _barrier = barrier
+    # Metrics are switched on in the workers only, never in the calling process.
+    # The store's own @timed functions are wrapped when their modules are
+    # imported, so this runs before the worker imports them (run() leaves the
+    # store unimported so that forked workers do not inherit unwrapped copies).
+    instrumentation.ENABLED = True
+
+
+def _populate(path: str, users: int, log2_n: int) -> None:
+    import password_hash
+
+    password_hash.SCRYPT_LOG2_N = log2_n
+    populate(path, users, password_hash.hash_password(PASSWORD))
+
+
+def _worker(path: str, users: int, ops: int, threads: int, log2_n: int, seed: int) -> Tuple[float, float, Dict, Dict, int]:
+    """
+    One terminal: indexes the store, waits for the others, then runs ops
+    operations on threads threads. Returns (start, end, histograms, outcome counts, commit batches).
+    """
+    import password_hash
+    import storage
+    from player_directory import get_directory
+    from registration_journal import get_journal
+    from validation import password_problem, username_problem
+
+    password_hash.SCRYPT_LOG2_N = log2_n
+    backend = storage.TextFileBackend(path)
+    get_directory(path).refresh()  # a running terminal already has its index
+    instrumentation.reset()
+    outcomes = {}
+    outcomes_lock = threading.Lock()
+    login_hist = instrumentation.histogram("load.login")
+    register_hist = instrumentation.histogram("load.register")
+
+    def count(outcome: str) -> None:
+        with outcomes_lock:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def register(username: str, pw: str) -> str:
+        # register_user without the prompts
+        if username_problem(username) or password_problem(pw):
+            return "register.invalid"
+        if backend.player_exists(username):
+            return "register.taken"
+        if not backend.add_player(username, password_hash.hash_password(pw)):
+            return "register.lost_race"
+        return "register.added"
+
+    def work(thread: int, n: int) -> None:
+        rng = random.Random(seed * 1000 + thread)
+        clock = time.perf_counter_ns
+        for i in range(n):
+            if rng.random() < LOGIN_SHARE:
+                started = clock()
+                verified = storage.check_password(backend, _player(rng.randrange(users)), PASSWORD)
+                login_hist.record(clock() - started)
+                count("login.ok" if verified else "login.failed")
+            else:
+                taken = rng.random() < TAKEN_SHARE
+                username = _player(rng.randrange(users)) if taken else f"load{seed}t{thread}n{i}"
+                started = clock()
+                outcome = register(username, PASSWORD)
+                register_hist.record(clock() - started)
+                count(outcome)
+
+    workers = [threading.Thread(target=work, args=(t, ops // threads + (t < ops % threads)))
+               for t in range(threads)]
+    _barrier.wait()
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    end = time.time()
+    return start, end, instrumentation.histograms(), outcomes, get_journal(path).batches
+
+
+def run(users: int, ops: int, processes: int = 4, threads: int = 4, log2_n: int = 10) -> Dict[str, float]:
+    """
+    Runs ops operations in total against a fresh store of users players.
+    Returns the report row for that store size.
+    """
+    workdir = tempfile.mkdtemp(prefix="mastermind_load_")
+    path = os.path.join(workdir, "players.txt")
+    try:
+        barrier = multiprocessing.Barrier(processes)
+        # one task per process: each blocks at the barrier until all have indexed the store
+        shares = [ops // processes + (p < ops % processes) for p in range(processes)]
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(barrier,)) as pool:
+            pool.apply(_populate, (path, users, log2_n))
+            results = pool.starmap(_worker, [(path, users, share, threads, log2_n, p)
+                                             for p, share in enumerate(shares)])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed = max(r[1] for r in results) - min(r[0] for r in results)
+    merged = {}
+    outcomes = {}
+    batches = 0
+    for _, _, hists, counts, process_batches in results:
+        for name, hist in hists.items():
+            merged.setdefault(name, instrumentation.Histogram(name)).merge(hist)
+        for outcome, n in counts.items():
+            outcomes[outcome] = outcomes.get(outcome, 0) + n
+        batches += process_batches
+
+    def ms(name: str, q: float) -> float:
+        hist = merged.get(name)
+        return hist.quantile(q) / 1e6 if hist else 0.0
+
+    lock_held = merged.get("players_file.lock_held")
+    added = outcomes.get("register.added", 0)
+    return {
+        "users": users,
+        "ops": ops,
+        "ops_per_s": ops / elapsed,
+        "login_p50_ms": ms("load.login", 0.5),
+        "login_p99_ms": ms("load.login", 0.99),
+        "register_p50_ms": ms("load.register", 0.5),
+        "register_p99_ms": ms("load.register", 0.99),
+        "lock_wait_p99_ms": ms("players_file.lock_wait", 0.99),
+        "lock_busy": lock_held.total / 1e9 / elapsed if lock_held else 0.0,
+        "commit_batch": added / batches if batches else 0.0,
+        "outcomes": outcomes,
+    }
+
+
+def print_report(rows: List[Dict[str, float]]) -> None:
+    print(f"{'players':>9s} {'ops/s':>8s} {'login p50/p99 ms':>17s} {'register p50/p99 ms':>20s} "
+          f"{'lock wait p99':>13s} {'lock busy':>9s} {'batch':>6s}")
+    for row in rows:
+        print(f"{row['users']:9d} {row['ops_per_s']:8.0f} "
+              f"{row['login_p50_ms']:8.2f}/{row['login_p99_ms']:<8.2f} "
+              f"{row['register_p50_ms']:9.2f}/{row['register_p99_ms']:<10.2f} "
+              f"{row['lock_wait_p99_ms']:10.2f} ms {row['lock_busy']:8.0%} {row['commit_batch']:6.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test login and registration on the text-file store.")
+    parser.add_argument("--users", default=DEFAULT_USERS, help=f"comma separated store sizes (default {DEFAULT_USERS})")
+    parser.add_argument("--ops", type=int, default=4000, help="operations per store size (default 4000)")
+    parser.add_argument("--processes", type=int, default=4, help="terminals, i.e. worker processes (default 4)")
+    parser.add_argument("--threads", type=int, default=4, help="threads per process (default 4)")
+    parser.add_argument("--log2n", type=int, default=10, help="scrypt cost of the test hashes (default 10)")
+    parser.add_argument("--json", action="store_true", help="one JSON line per store size")
+    parser.add_argument("--max-p99-ms", type=float, help="exit 1 if a login or register p99 exceeds this")
+    args = parser.parse_args()
+
+    rows = []
+    for size in (int(n) for n in args.users.split(",")):
+        row = run(size, args.ops, args.processes, args.threads, args.log2n)
+        rows.append(row)
+        if args.json:
+            print(json.dumps(row), flush=True)
+    if not args.json:
+        print_report(rows)
+    if args.max_p99_ms is not None:
+        worst = max(max(row["login_p99_ms"], row["register_p99_ms"]) for row in rows)
+        if worst > args.max_p99_ms:
+            print(f"FAILED: p99 {worst:.2f} ms over the {args.max_p99_ms:g} ms budget")
+            sys.exit(1)
@@ -1,10 +1,10 @@
 # logout.py
+from session_manager import get_session_manager
 
-def logout():
-    try:
-        # Clear the session (remove logged-in user)
-        with open("session.txt", "w") as session_file:
-            session_file.write("")
+
+def logout(token=None):
+    # End the session (default: this terminal's logged-in user), no file is touched
+    if get_session_manager().end(token):
         print("\n✅ You have been successfully logged out.\n")
-    except FileNotFoundError:
+    else:
         print("\n⚠️ No session found. You are not logged in.\n")
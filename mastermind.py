@@ -0,0 +1,127 @@
+"""
+Single entry point for the Mastermind game and its tools.
+
+    mastermind                      the game menu (larongutak)
+    mastermind <tool> [args...]     one of the TOOLS below, e.g. "mastermind server --port 7300"
+    mastermind --check-startup      cold start regression check (see check_startup)
+
+Installed as the "mastermind" console script (pip install -e .). Nothing but
+this module is imported until a command is chosen, and the game menu itself
+only loads storage, password hashing, the solver and the other subsystems
+when a menu option first needs them.
+"""
+import sys
+from typing import List, Tuple
+
+# tool name -> (module run as __main__, description)
+TOOLS = {
+    "server": ("game_server", "asyncio game server and client"),
+    "bulk": ("bulk_io", "import/export players and highscores"),
+    "replays": ("replay_log", "game replay aggregates"),
+    "storage": ("storage", "migrate to SQLite, compare backends"),
+    "passwords": ("password_hash", "rehash players.txt, calibrate hashing cost"),
+    "loadtest": ("load_test", "login/registration load test of the player store"),
+    "simulate": ("simulate", "headless strategy simulation"),
+    "solve": ("solver", "watch the computer solve a code"),
+    "openings": ("opening_book", "build opening books"),
+}
+
+STARTUP_BUDGET_MS = 40.0  # import time of the game menu, measured by check_startup
+# must not be imported before the menu is shown
+STARTUP_FORBIDDEN = ("storage", "password_hash", "registration_journal", "leaderboard", "session_manager",
+                     "username_suggestions", "solver", "hints", "evil_mode", "numpy", "sqlite3",
+                     "concurrent.futures", "multiprocessing", "asyncio")
+
+
+def load_game():
+    """
+    The larongutak module, imported the way the game menu starts.
+    """
+    from game_core import load_larongutak
+
+    return load_larongutak()
+
+
+def _startup_profile() -> Tuple[float, List[str]]:
+    """
+    Imports the game in a fresh interpreter under -X importtime. Returns
+    (milliseconds spent importing, modules imported).
+    """
+    import os
+    import subprocess
+
+    code = "import mastermind; mastermind.load_game()"
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, cwd=here,
+                            stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True)
+    total_us = 0
+    modules = []
+    started = False
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] |  cumulative | <indent>module"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        module = name.strip()
+        top_level = not name[1:].startswith(" ")
+        started = started or (top_level and module == "mastermind")
+        if started:
+            modules.append(module)
+            if top_level:
+                total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def check_startup(budget_ms: float = STARTUP_BUDGET_MS, runs: int = 5) -> bool:
+    """
+    Fails if starting the game imports a STARTUP_FORBIDDEN module or its
+    imports take longer than budget_ms (best of runs, after a warm-up run
+    that fills the bytecode cache).
+    """
+    _startup_profile()
+    best, modules = min(_startup_profile() for _ in range(runs))
+    forbidden = sorted(m for m in modules if m.split(".")[0] in STARTUP_FORBIDDEN or m in STARTUP_FORBIDDEN)
+    print(f"Game startup imports {len(modules)} modules in {best:.1f} ms (budget {budget_ms:.0f} ms).")
+    if forbidden:
+        print(f"Imported eagerly, should be lazy: {', '.join(forbidden)}")
+    ok = best <= budget_ms and not forbidden
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+def usage() -> str:
+    lines = ["usage: mastermind [--check-startup [BUDGET_MS]] [<tool> [args...]]", "", "tools:"]
+    lines += [f"  {name:10s} {description}" for name, (_, description) in TOOLS.items()]
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        larongutak = load_game()
+        larongutak.instrumentation.install()
+        try:
+            larongutak.main_menu()
+        except KeyboardInterrupt:
+            print("\nInterrupted. Goodbye! 👋")
+        return 0
+    command = argv[0]
+    if command == "--check-startup":
+        return 0 if check_startup(float(argv[1]) if len(argv) > 1 else STARTUP_BUDGET_MS) else 1
+    if command not in TOOLS:
+        print(usage())
+        return 0 if command in ("-h", "--help") else 2
+    import runpy
+
+    module = TOOLS[command][0]
+    sys.argv = [f"mastermind {command}"] + argv[1:]
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 0 if e.code is None else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
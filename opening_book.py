@@ -0,0 +1,200 @@
+"""
+Persisted opening book: the whole Knuth minimax decision tree for the
+configured code space (colors and code length), stored as a compact binary file.
+
+File layout (little-endian):
+  header  magic "MMOB", version (u16), code length (u8), number of colors (u8),
+          color letters padded to 32 bytes, node count (u32), slots (u32)
+  nodes   node count rows of (1 + slots) u32 values: the guess index, then
+          the child node for each packed feedback value (NO_CHILD if none)
+
+slots is (code_length + 1) ** 2, so a feedback value from
+CodeSpace.encode_feedback is a direct column index. Node 0 is the root.
+The loader memory-maps the file, so following the tree is one array lookup
+per move. The header and the file name both carry the configuration, so a
+book built for other settings is rebuilt rather than reused.
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+import batch_scoring
+import solver
+from codec import CodeSpace
+from game_core import larongutak
+
+BOOK_DIR = "."
+MAGIC = b"MMOB"
+VERSION = 1
+NO_CHILD = 0xFFFFFFFF
+_HEADER = struct.Struct("<4sHBB32sII")
+
+# Loaded books per CodeSpace, see get_book.
+_books = {}
+
+
+def book_path(space: CodeSpace = None) -> str:
+    """
+    File name of the book for the space (default: COLORS and CODE_LENGTH).
+    """
+    space = space or larongutak.default_space()
+    return os.path.join(BOOK_DIR, f"opening_book_{''.join(space.colors)}_{space.code_length}.bin")
+
+
+def _config_header(node_count: int, space: CodeSpace) -> bytes:
+    colors = "".join(space.colors).encode("ascii")
+    return _HEADER.pack(MAGIC, VERSION, space.code_length, len(colors), colors, node_count, space.feedback_slots)
+
+
+def build_tree(space: CodeSpace = None) -> np.ndarray:
+    """
+    Expands the Knuth decision tree from the full code space.
+    Returns the (nodes, 1 + slots) uint32 array written to the book.
+    """
+    space = space or larongutak.default_space()
+    matrix = solver.feedback_matrix(space)
+    codes = batch_scoring.all_codes_array(space) if matrix is None else None
+    slots = space.feedback_slots
+    win = space.encode_feedback(space.code_length, 0)
+
+    rows = []
+    # (candidates, parent row, feedback slot) still to expand; breadth first keeps the root at 0
+    pending = [(np.arange(space.size, dtype=np.int64), None, None)]
+    while pending:
+        next_pending = []
+        for candidates, parent, slot in pending:
+            node = len(rows)
+            if parent is not None:
+                rows[parent][1 + slot] = node
+            guess = solver.minimax_guess(candidates, matrix, codes, space)
+            row = [guess] + [NO_CHILD] * slots
+            rows.append(row)
+
+            if matrix is not None:
+                feedback = matrix[guess, candidates]
+            else:
+                feedback = batch_scoring.feedback_block(codes[guess], codes[candidates], space=space)[0]
+            for value in np.unique(feedback):
+                if value != win:
+                    next_pending.append((candidates[feedback == value], node, int(value)))
+        pending = next_pending
+    return np.array(rows, dtype="<u4")
+
+
+def save_book(tree: np.ndarray, path: str = None, space: CodeSpace = None) -> str:
+    """
+    Writes a tree built for space to path (book_path(space) by default) atomically.
+    Several processes may build the same book at once (simulate's workers do on
+    a cold cache); each writes its own temp file and the last replace wins,
+    which is fine as the books are identical.
+    """
+    space = space or larongutak.default_space()
+    path = path or book_path(space)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_config_header(len(tree), space))
+            f.write(tree.astype("<u4").tobytes())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped view of a saved book.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{path} is not an opening book.")
+        magic, version, code_length, n_colors, colors, node_count, slots = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an opening book (version {VERSION}).")
+        if len(self._mmap) != _HEADER.size + node_count * (1 + slots) * 4:
+            raise ValueError(f"{path} is truncated.")
+        self.space = CodeSpace(colors[:n_colors].decode("ascii"), code_length)
+        self.slots = slots
+        self.nodes = np.frombuffer(self._mmap, dtype="<u4", count=node_count * (1 + slots),
+                                   offset=_HEADER.size).reshape(node_count, 1 + slots)
+        self.root = 0
+
+    def matches_config(self, space: CodeSpace = None) -> bool:
+        """
+        True if the book was built for space (default: COLORS and CODE_LENGTH).
+        """
+        return self.space == (space or larongutak.default_space())
+
+    def guess_index(self, node: int) -> int:
+        return int(self.nodes[node, 0])
+
+    def guess(self, node: int) -> List[str]:
+        return self.space.decode(self.guess_index(node))
+
+    def child(self, node: int, black: int, white: int) -> int or None:
+        """
+        Node reached after the node's guess got (black, white), or None if that
+        feedback cannot happen (or solved the game).
+        """
+        child = int(self.nodes[node, 1 + self.space.encode_feedback(black, white)])
+        return None if child == NO_CHILD else child
+
+
+def get_book(build: bool = True, space: CodeSpace = None) -> OpeningBook or None:
+    """
+    Returns the book for the space (default: COLORS and CODE_LENGTH), loading it
+    from book_path(space) or (re)building it when it is missing or was built for
+    other settings. Returns None when build is False and no valid book exists,
+    or when the space is too large for a feedback table.
+    """
+    space = space or larongutak.default_space()
+    if space in _books:
+        return _books[space]
+    if larongutak.get_feedback_table(space) is None:
+        return None
+
+    path = book_path(space)
+    book = None
+    try:
+        book = OpeningBook(path)
+        if not book.matches_config(space):
+            book = None
+    except (OSError, ValueError):
+        book = None
+
+    if book is None:
+        if not build:
+            return None
+        save_book(build_tree(space), path, space)
+        book = OpeningBook(path)
+
+    _books[space] = book
+    return book
+
+
+if __name__ == "__main__":
+    colors = sys.argv[1] if len(sys.argv) > 1 else larongutak.COLORS
+    code_length = int(sys.argv[2]) if len(sys.argv) > 2 else larongutak.CODE_LENGTH
+    space = CodeSpace(colors, code_length)
+
+    start = time.perf_counter()
+    tree = build_tree(space)
+    path = save_book(tree, space=space)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {len(tree)} nodes ({os.path.getsize(path)} bytes) to {path} in {elapsed:.2f} s.")
@@ -0,0 +1,204 @@
+"""
+Process-pool partition scoring for large color/length configurations.
+
+For spaces like 8 colors x 6 positions (262,144 codes) the feedback table is
+far too big, and scoring every guess against every candidate on one core is
+too slow. PartitionPool splits the guesses across a concurrent.futures process
+pool. The full code array and the current candidate rows live in
+multiprocessing.shared_memory blocks that every worker attaches to once, so
+a move only sends (start, stop, candidate count) to each worker.
+
+A worker scores its guesses in tiles of at most TILE_PAIRS (guess, candidate)
+pairs, CANDIDATE_BLOCK candidates wide, and adds up the per-guess feedback
+group counts of every tile. Its memory stays around 50 MB however many
+candidates are left, so the opening moves (every code still a candidate)
+fit as well as the endgame.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+
+import batch_scoring
+import solver
+from codec import CodeSpace
+from game_core import larongutak
+
+METRICS = ("minimax", "entropy")
+CANDIDATE_BLOCK = 1 << 16  # candidates per tile
+TILE_PAIRS = 1 << 22  # guess x candidate pairs per tile: 4 MB of uint8 feedback, 32 MB of int64 bincount keys
+
+# Per-process state of a pool worker, filled in by _init_worker.
+_worker = {}
+
+
+def _init_worker(space: CodeSpace, codes_name: str, candidates_name: str) -> None:
+    codes_shm = shared_memory.SharedMemory(name=codes_name)
+    candidates_shm = shared_memory.SharedMemory(name=candidates_name)
+    shape = (space.size, space.code_length)
+    _worker["space"] = space
+    _worker["shm"] = (codes_shm, candidates_shm)
+    _worker["codes"] = np.ndarray(shape, dtype=np.uint8, buffer=codes_shm.buf)
+    _worker["candidates"] = np.ndarray(shape, dtype=np.uint8, buffer=candidates_shm.buf)
+
+
+def partition_counts(guesses: np.ndarray, candidates: np.ndarray, space: CodeSpace = None) -> np.ndarray:
+    """
+    The (guesses, feedback_slots) group sizes of solver.partition_sizes, scored
+    tile by tile (see TILE_PAIRS) instead of as one guesses x candidates array.
+    """
+    space = space or larongutak.default_space()
+    counts = np.zeros((len(guesses), space.feedback_slots), dtype=np.int64)
+    block = max(1, min(len(candidates), CANDIDATE_BLOCK))
+    rows = max(1, TILE_PAIRS // block)
+    for c_start in range(0, len(candidates), block):
+        tile_candidates = candidates[c_start:c_start + block]
+        candidate_counts = batch_scoring.color_counts(tile_candidates, space)
+        for g_start in range(0, len(guesses), rows):
+            feedback = batch_scoring.feedback_block(guesses[g_start:g_start + rows], tile_candidates,
+                                                    candidate_counts, space)
+            counts[g_start:g_start + rows] += solver.partition_sizes(feedback, space)
+    return counts
+
+
+def score_partitions(guesses: np.ndarray, candidates: np.ndarray, metric: str = "minimax",
+                     space: CodeSpace = None) -> np.ndarray:
+    """
+    Scores each guess by how it splits candidates: the largest group size for
+    "minimax" (lower is better) or the expected information in bits for
+    "entropy" (higher is better).
+    """
+    counts = partition_counts(guesses, candidates, space)
+    if metric == "minimax":
+        return counts.max(axis=1).astype(np.float64)
+    p = counts / float(len(candidates))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.nansum(np.where(p > 0, p * np.log2(p), 0.0), axis=1)
+
+
+def _score_chunk(start: int, stop: int, k: int, metric: str) -> np.ndarray:
+    return score_partitions(_worker["codes"][start:stop], _worker["candidates"][:k], metric, _worker["space"])
+
+
+class PartitionPool:
+    """
+    Owns the shared-memory code/candidate arrays and the worker pool.
+    Use as a context manager so the shared memory is always released.
+    """
+
+    def __init__(self, workers: int = None, chunks_per_worker: int = 4, space: CodeSpace = None):
+        self.space = space or larongutak.default_space()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        codes = batch_scoring.all_codes_array(self.space)
+        self.n = len(codes)
+        self._codes_shm = shared_memory.SharedMemory(create=True, size=max(1, codes.nbytes))
+        self._candidates_shm = shared_memory.SharedMemory(create=True, size=max(1, codes.nbytes))
+        self.codes = np.ndarray(codes.shape, dtype=np.uint8, buffer=self._codes_shm.buf)
+        self.codes[:] = codes
+        self._candidates = np.ndarray(codes.shape, dtype=np.uint8, buffer=self._candidates_shm.buf)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.space, self._codes_shm.name, self._candidates_shm.name),
+        )
+
+    def score_all_guesses(self, candidate_indices: np.ndarray, metric: str = "minimax") -> np.ndarray:
+        """
+        Returns the metric score of every code of the space as a guess against the candidates.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}.")
+        k = len(candidate_indices)
+        self._candidates[:k] = self.codes[candidate_indices]
+
+        step = max(1, math.ceil(self.n / (self.workers * self.chunks_per_worker)))
+        bounds = [(start, min(start + step, self.n)) for start in range(0, self.n, step)]
+        futures = [self._executor.submit(_score_chunk, start, stop, k, metric) for start, stop in bounds]
+        return np.concatenate([future.result() for future in futures])
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for shm in (self._codes_shm, self._candidates_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParallelSolver(solver.KnuthSolver):
+    """
+    KnuthSolver whose guess search runs on a PartitionPool.
+    With metric="entropy" it plays the most informative guess instead of the minimax one.
+    """
+
+    def __init__(self, pool: PartitionPool, metric: str = "minimax"):
+        super().__init__(space=pool.space)
+        self.pool = pool
+        self.metric = metric
+        self.codes = pool.codes
+
+    def next_guess_index(self) -> int:
+        if len(self.candidates) == 0:
+            raise ValueError("No code is consistent with the feedback given.")
+        if len(self.candidates) <= 2:
+            return int(self.candidates[0])
+
+        scores = self.pool.score_all_guesses(self.candidates, self.metric)
+        if self.metric == "entropy":
+            scores = -scores
+        return solver.pick_minimax(scores, self.candidates)
+
+
+def measure_scaling(worker_counts: List[int], candidates: int = None, metric: str = "minimax", seed: int = 0,
+                    space: CodeSpace = None) -> List[tuple]:
+    """
+    Times one full guess search against a random sample of candidates codes
+    (default: every code, the opening move) for each worker count.
+    Returns (workers, seconds, speedup vs the first entry, million pairs per second) rows.
+    """
+    space = space or larongutak.default_space()
+    rng = np.random.default_rng(seed)
+    n = space.size
+    sample = np.sort(rng.choice(n, size=min(candidates or n, n), replace=False))
+    rows = []
+    for workers in worker_counts:
+        with PartitionPool(workers, space=space) as pool:
+            pool.score_all_guesses(sample[:8], metric)  # start the workers before timing
+            start = time.perf_counter()
+            pool.score_all_guesses(sample, metric)
+            elapsed = time.perf_counter() - start
+        base = rows[0][1] if rows else elapsed
+        rows.append((workers, elapsed, base / elapsed, n * len(sample) / elapsed / 1e6))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure parallel partition scoring scaling.")
+    parser.add_argument("--colors", default="RGBYWOPC", help="color letters, e.g. RGBYWOPC")
+    parser.add_argument("--length", type=int, default=6, help="code length")
+    parser.add_argument("--candidates", default="4096,32768",
+                        help="comma-separated candidate set sizes, 0 for every code (default 4096,32768; "
+                             "8x6 has 262144 codes, a few thousand to tens of thousands remain after the opening)")
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts, e.g. 1,2,4")
+    parser.add_argument("--metric", choices=METRICS, default="minimax")
+    args = parser.parse_args()
+
+    space = CodeSpace(args.colors, args.length)
+    cpus = os.cpu_count() or 1
+    counts = [int(w) for w in args.workers.split(",")] if args.workers else sorted({1, 2, 4, cpus} - {0})
+
+    for candidates in (int(c) or space.size for c in args.candidates.split(",")):
+        print(f"{space.base} colors x {space.code_length} positions = {space.size} codes, "
+              f"{min(candidates, space.size)} candidates, metric {args.metric}")
+        for workers, elapsed, speedup, rate in measure_scaling(counts, candidates, args.metric, space=space):
+            print(f"{workers:3d} workers: {elapsed:8.3f} s  speedup {speedup:5.2f}x  {rate:8.1f} M pairs/s")
@@ -0,0 +1,253 @@
+"""
+Versioned password hashing for players.txt.
+
+Stored passwords carry their scheme and cost, and never contain a comma so
+the "username,password" line format is unchanged:
+
+    scrypt$<log2 n>$<r>$<p>$<salt hex>$<hash hex>        current default
+    pbkdf2$<iterations>$<salt hex>$<hash hex>             PBKDF2-HMAC-SHA256
+    sha256+scrypt$<log2 n>$<r>$<p>$<salt hex>$<hash hex>  scrypt over a legacy SHA-256 hex digest
+    64 hex digits                                         legacy unsalted SHA-256
+    anything else                                         legacy Caesar cipher (shift 7)
+
+verify_password understands all of them; needs_rehash tells the login code
+to store hash_password() of the password it just verified, so records are
+upgraded on the next successful login (an appended record, see
+registration_journal.update_password). Run this file with --rehash to
+migrate a whole players file offline on a process pool (Caesar records are
+reversible and get a full hash, SHA-256 records are wrapped, superseded
+records are dropped), or with
+--calibrate MS to pick the scrypt cost for a login latency budget.
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import time
+from typing import List
+
+from instrumentation import timed
+
+HASH_SCHEME = "scrypt"  # or "pbkdf2"
+SCRYPT_LOG2_N = 14  # cost: 2**14 x r x 128 bytes = 16 MB and ~50 ms per hash with r=8
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+HASH_BYTES = 32
+LEGACY_CAESAR_SHIFT = 7
+
+REHASH_CHUNK = 256  # records per process pool task
+
+
+# --- Legacy Caesar cipher, kept for verifying and migrating old records ---
+def caesar_encrypt(password: str, shift: int = LEGACY_CAESAR_SHIFT) -> str:
+    """
+    Implements a Caesar cipher for letters (A-Z, a-z) and digits (0-9).
+    """
+    enc = []
+    for ch in password:
+        if ch.isalpha():
+            base = ord("A") if ch.isupper() else ord("a")
+            enc.append(chr((ord(ch) - base + shift) % 26 + base))
+        elif ch.isdigit():
+            enc.append(chr((ord(ch) - ord("0") + shift) % 10 + ord("0")))
+        else:
+            enc.append(ch)
+    return "".join(enc)
+
+
+def caesar_decrypt(enc_pw: str, shift: int = LEGACY_CAESAR_SHIFT) -> str:
+    """
+    Inverse of caesar_encrypt for ASCII passwords.
+    """
+    return caesar_encrypt(enc_pw, -shift)
+
+
+def _is_sha256_hex(stored: str) -> bool:
+    return len(stored) == 64 and all(c in "0123456789abcdef" for c in stored.lower())
+
+
+def _scheme(stored: str) -> str or None:
+    # a Caesar record may contain "$" too, so only known scheme names count
+    scheme = stored.split("$", 1)[0]
+    return scheme if scheme in ("scrypt", "pbkdf2", "sha256+scrypt") and "$" in stored else None
+
+
+def _scrypt(secret: str, salt: bytes, log2_n: int, r: int, p: int) -> bytes:
+    n = 1 << log2_n
+    return hashlib.scrypt(secret.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * r * n + (1 << 20), dklen=HASH_BYTES)
+
+
+def _pbkdf2(secret: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", secret.encode("utf-8"), salt, iterations, HASH_BYTES)
+
+
+def _hash_with_scheme(secret: str, scheme: str) -> str:
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "pbkdf2":
+        return f"pbkdf2${PBKDF2_ITERATIONS}${salt.hex()}${_pbkdf2(secret, salt, PBKDF2_ITERATIONS).hex()}"
+    digest = _scrypt(secret, salt, SCRYPT_LOG2_N, SCRYPT_R, SCRYPT_P)
+    return f"{scheme}${SCRYPT_LOG2_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+
+@timed("hash_password")
+def hash_password(password: str) -> str:
+    """
+    Hashes password with the current HASH_SCHEME and cost settings.
+    """
+    return _hash_with_scheme(password, "pbkdf2" if HASH_SCHEME == "pbkdf2" else "scrypt")
+
+
+@timed("verify_password")
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Checks password against a stored value of any supported scheme.
+    """
+    fields = stored.split("$")
+    try:
+        if fields[0] in ("scrypt", "sha256+scrypt") and len(fields) == 6:
+            secret = password
+            if fields[0] == "sha256+scrypt":
+                secret = hashlib.sha256(password.encode("utf-8")).hexdigest()
+            log2_n, r, p = int(fields[1]), int(fields[2]), int(fields[3])
+            digest = _scrypt(secret, bytes.fromhex(fields[4]), log2_n, r, p)
+            return hmac.compare_digest(digest, bytes.fromhex(fields[5]))
+        if fields[0] == "pbkdf2" and len(fields) == 4:
+            digest = _pbkdf2(password, bytes.fromhex(fields[2]), int(fields[1]))
+            return hmac.compare_digest(digest, bytes.fromhex(fields[3]))
+    except ValueError:
+        # corrupt record, never matches
+        return False
+    if _is_sha256_hex(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode("utf-8")).hexdigest(), stored.lower())
+    return hmac.compare_digest(caesar_encrypt(password), stored)
+
+
+def needs_rehash(stored: str) -> bool:
+    """
+    True if stored is not a hash with the current scheme and cost.
+    """
+    fields = stored.split("$")
+    if HASH_SCHEME == "pbkdf2":
+        return not (fields[0] == "pbkdf2" and len(fields) == 4 and fields[1] == str(PBKDF2_ITERATIONS))
+    return not (fields[0] == "scrypt" and len(fields) == 6
+                and fields[1:4] == [str(SCRYPT_LOG2_N), str(SCRYPT_R), str(SCRYPT_P)])
+
+
+def upgrade_offline(stored: str) -> str:
+    """
+    Best hash reachable without the plaintext: Caesar records are decrypted
+    and hashed, SHA-256 records are wrapped in scrypt, others are kept.
+    """
+    if _scheme(stored) is not None:
+        return stored
+    if _is_sha256_hex(stored):
+        return _hash_with_scheme(stored.lower(), "sha256+scrypt")
+    return hash_password(caesar_decrypt(stored))
+
+
+def calibrate(budget_ms: float, r: int = SCRYPT_R, p: int = SCRYPT_P) -> int:
+    """
+    Largest scrypt log2 n whose hash takes at most budget_ms on this machine (at least 10).
+    """
+    log2_n = 10
+    while log2_n < 24:
+        start = time.perf_counter()
+        _scrypt("calibration", b"\0" * SALT_BYTES, log2_n + 1, r, p)
+        if (time.perf_counter() - start) * 1000 > budget_ms:
+            break
+        log2_n += 1
+    return log2_n
+
+
+# --- Bulk offline migration ---
+def _rehash_chunk(lines: List[str]) -> List[str]:
+    out = []
+    for line in lines:
+        stripped = line.strip()
+        try:
+            user, stored_pw = stripped.split(",", 1)
+        except ValueError:
+            out.append(line)  # blank or malformed, kept as is
+            continue
+        out.append(f"{user},{upgrade_offline(stored_pw)}\n")
+    return out
+
+
+def _chunks(lines, size: int):
+    chunk = []
+    for line in lines:
+        chunk.append(line.decode("utf-8", errors="replace"))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rehash_players_file(path: str, workers: int = None, chunk: int = REHASH_CHUNK) -> int:
+    """
+    Streams path through a process pool with upgrade_offline and replaces it
+    atomically, keeping only the last record per username. Lines registered
+    while the pool runs are picked up under the registration lock before the
+    swap. Returns the number of records written.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # only the bulk rehash needs a process pool
+
+    from player_directory import current_lines
+    from registration_journal import locked_players_file
+
+    workers = workers or os.cpu_count() or 1
+    tmp_path = f"{path}.rehash"
+    written = 0
+    with open(path, "rb") as src, \
+            open(tmp_path, "w", encoding="utf-8", newline="\n") as dst, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        inode = os.fstat(src.fileno()).st_ino
+        pending = []
+        for lines in _chunks(current_lines(src), chunk):
+            pending.append(pool.submit(_rehash_chunk, lines))
+            # bounded window: results are written in order as they complete
+            while len(pending) > workers * 2:
+                written += _write(dst, pending.pop(0).result())
+        for future in pending:
+            written += _write(dst, future.result())
+        offset = src.tell()
+
+        with locked_players_file(path) as f:
+            if os.fstat(f.fileno()).st_ino != inode:
+                raise IOError(f"{path} was replaced during the rehash, run it again")
+            with open(path, "rb") as tail:
+                tail.seek(offset)
+                written += _write(dst, _rehash_chunk([line.decode("utf-8", errors="replace") for line in tail]))
+            dst.flush()
+            os.fsync(dst.fileno())
+            os.replace(tmp_path, path)
+    return written
+
+
+def _write(dst, lines: List[str]) -> int:
+    dst.writelines(lines)
+    return len(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password hash tools for players.txt.")
+    parser.add_argument("--rehash", metavar="PLAYERS_FILE", help="upgrade every record of a players file")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--calibrate", type=float, metavar="MS", help="scrypt cost for a per-login budget")
+    args = parser.parse_args()
+
+    if args.calibrate:
+        log2_n = calibrate(args.calibrate)
+        start = time.perf_counter()
+        _scrypt("calibration", b"\0" * SALT_BYTES, log2_n, SCRYPT_R, SCRYPT_P)
+        print(f"SCRYPT_LOG2_N = {log2_n}  ({(time.perf_counter() - start) * 1000:.0f} ms per hash)")
+    if args.rehash:
+        start = time.perf_counter()
+        count = rehash_players_file(args.rehash, args.workers)
+        print(f"Rehashed {count} records in {time.perf_counter() - start:.1f} s.")
+    if not args.calibrate and not args.rehash:
+        parser.print_help()
@@ -0,0 +1,161 @@
+"""
+In-memory index of players.txt so username checks and logins are O(1).
+
+players.txt stays the plain-text source of truth ("username,password" per
+line). A PlayerDirectory loads it once into a dict and afterwards only
+stat()s the file: if the file grew (registrations append to it) just the new
+tail is parsed, and if it was replaced or truncated it is reloaded in full.
+
+A password change is appended as a new line for the username, so the last
+line per username wins; password_hash.py --rehash drops the superseded lines.
+"""
+import itertools
+import os
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+from instrumentation import timed
+
+# One directory per players file path, see get_directory.
+_directories = {}
+
+
+class PlayerDirectory:
+    """
+    Username -> stored password index for one players file.
+    Lookups raise FileNotFoundError/IOError like reading the file would.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._players = {}  # type: Dict[str, str]
+        self._lock = threading.Lock()  # the game server looks players up from several threads
+        self._tail = {}  # last line when the file does not end with a newline
+        self._signature = None  # (device, inode, size, mtime) of the indexed file
+        self._offset = 0  # bytes of the file already indexed (always at a line end)
+        self._generation = 0  # bumped on every full reload, see new_usernames
+
+    @staticmethod
+    def _parse(data: bytes, players: Dict[str, str]) -> None:
+        for raw in data.decode("utf-8", errors="replace").splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                user, stored_pw = line.split(",", 1)
+            except ValueError:
+                # malformed line, skip
+                continue
+            # a later line for a username supersedes it (see update_password);
+            # the username keeps its place in the dict, see new_usernames
+            players[user] = stored_pw
+
+    @timed("player_directory.refresh")
+    def refresh(self) -> None:
+        """
+        Brings the index up to date with the file if its size or mtime changed.
+        """
+        with self._lock:
+            st = os.stat(self.path)
+            signature = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            if signature == self._signature:
+                return
+
+            # a grown file was appended to; anything else (replaced, truncated,
+            # rewritten in place) is indexed again from the start
+            appended = (self._signature is not None and self._signature[:2] == signature[:2]
+                        and st.st_size > self._signature[2])
+            # a full reload is built aside so lookups never see a half-filled index
+            players = self._players if appended else {}
+            if not appended:
+                self._offset = 0
+                self._generation += 1
+
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            self._parse(data[:end], players)
+            self._players = players
+            self._offset += end
+            # an unterminated last line may still be being written: it is indexed
+            # on the side and parsed again once the line is complete
+            tail = {}
+            self._parse(data[end:], tail)
+            self._tail = tail
+            self._signature = signature
+
+    def exists(self, username: str, refresh: bool = True) -> bool:
+        """
+        True if username is registered. Bulk callers holding the registration
+        lock refresh once and pass refresh=False to skip the per-call stat().
+        """
+        if refresh:
+            self.refresh()
+        return username in self._players or username in self._tail
+
+    def get_password(self, username: str) -> str or None:
+        """
+        Returns the stored (encrypted) password of username, or None if not registered.
+        """
+        self.refresh()
+        stored_pw = self._players.get(username)
+        return self._tail.get(username) if stored_pw is None else stored_pw
+
+    def new_usernames(self, mark: Tuple[int, int] = None) -> Tuple[List[str], Tuple[int, int]]:
+        """
+        Usernames indexed since mark, the value returned by a previous call
+        (None, or a full reload of the file in between, lists everyone).
+        Returns (usernames, new mark). Relies on dicts keeping insertion order.
+        """
+        self.refresh()
+        with self._lock:
+            players, generation = self._players, self._generation
+            count = mark[1] if mark is not None and mark[0] == generation else 0
+            if count:
+                names = list(itertools.islice(reversed(players), len(players) - count))
+            else:
+                names = list(players)
+            return names, (generation, len(players))
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._players) + sum(1 for user in self._tail if user not in self._players)
+
+    def stats(self) -> Tuple[int, int]:
+        """
+        (players indexed, bytes indexed), without touching the file.
+        """
+        return len(self._players), self._offset
+
+
+def current_lines(f) -> Iterator[bytes]:
+    """
+    The lines of a players file opened in binary mode, from its position to
+    its end at the time of the call, without the records superseded by a
+    later line for the same username. Blank and malformed lines are kept.
+    """
+    start = f.tell()
+    last = {}
+    count = 0
+    for count, line in enumerate(iter(f.readline, b""), 1):
+        user, comma, _ = line.strip().partition(b",")
+        if comma:
+            last[user] = count
+    f.seek(start)
+    for number in range(1, count + 1):
+        line = f.readline()
+        user, comma, _ = line.strip().partition(b",")
+        if not comma or last.get(user) == number:
+            yield line
+
+
+def get_directory(path: str) -> PlayerDirectory:
+    """
+    Returns the shared PlayerDirectory for a players file path.
+    """
+    key = os.path.abspath(path)
+    directory = _directories.get(key)
+    if directory is None:
+        directory = _directories[key] = PlayerDirectory(path)
+    return directory
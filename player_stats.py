@@ -0,0 +1,123 @@
+"""
+Per-player game statistics: games played, win rate and average attempts.
+
+The highscores log only keeps each player's best, so every finished game is
+also appended to a games log next to it ("highscores_games.txt" for
+"highscores.txt"), one "username,attempts,won" line per game. A GameLog
+keeps running totals per player and, like player_directory and leaderboard,
+only parses lines appended since its last look at the file.
+"""
+import os
+import threading
+from typing import Dict, List, Tuple
+
+# One game log per file path, see get_game_log.
+_game_logs = {}
+
+
+def games_file(highscores_file: str) -> str:
+    """
+    Path of the games log kept next to a highscores file.
+    """
+    root, ext = os.path.splitext(highscores_file)
+    return f"{root}_games{ext or '.txt'}"
+
+
+class GameLog:
+    """
+    Running [games, wins, attempts] totals per username for one games log.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._totals = {}  # type: Dict[str, List[int]]
+        self._lock = threading.RLock()  # the game server queries from several threads
+        self._signature = None  # (device, inode, size, mtime) of the indexed file
+        self._offset = 0  # bytes of the file already indexed (always at a line end)
+
+    def _parse(self, data: bytes) -> None:
+        for raw in data.decode("utf-8", errors="replace").splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                user, attempts, won = line.split(",")
+                attempts, won = int(attempts), int(won)
+            except ValueError:
+                # malformed line, skip
+                continue
+            totals = self._totals.setdefault(user, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += 1 if won else 0
+            totals[2] += attempts
+
+    def refresh(self) -> None:
+        """
+        Brings the totals up to date with the file if its size or mtime changed.
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._totals, self._signature, self._offset = {}, None, 0
+                return
+            signature = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            if signature == self._signature:
+                return
+
+            appended = (self._signature is not None and self._signature[:2] == signature[:2]
+                        and st.st_size > self._signature[2])
+            if not appended:
+                self._totals, self._offset = {}, 0
+
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            self._parse(data[:end])
+            self._offset += end
+            self._signature = signature
+
+    def record(self, user: str, attempts: int, won: bool) -> None:
+        """
+        Appends one finished game. A single short append, so terminals need no lock.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"{user},{attempts},{int(won)}\n")
+
+    def totals(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        {username: (games, wins, attempts)} for every player in the log.
+        """
+        with self._lock:
+            self.refresh()
+            return {user: tuple(totals) for user, totals in self._totals.items()}
+
+    def stats(self, user: str) -> Dict[str, float] or None:
+        """
+        {"games", "wins", "win_rate", "average_attempts"} for user, or None if they never played.
+        """
+        with self._lock:
+            self.refresh()
+            totals = self._totals.get(user)
+            if totals is None:
+                return None
+            games, wins, attempts = totals
+            return {
+                "games": games,
+                "wins": wins,
+                "win_rate": wins / games,
+                "average_attempts": attempts / games,
+            }
+
+
+def get_game_log(path: str) -> GameLog:
+    """
+    Returns the shared GameLog for a games log path.
+    """
+    key = os.path.abspath(path)
+    log = _game_logs.get(key)
+    if log is None:
+        log = _game_logs[key] = GameLog(path)
+    return log
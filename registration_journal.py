@@ -0,0 +1,288 @@
+"""
+Journaled, race-free writes to players.txt.
+
+Registration used to check the username and append the line as two separate
+steps, so two terminals signing up the same name at once could both succeed,
+and unlocked appends from several processes could interleave. Here:
+
+- the check and the append happen together under an exclusive fcntl lock on
+  players.txt, so a username can only be taken once;
+- records are group committed: registrations queued while a commit is in
+  progress are written together in one append, and fsync runs once per
+  batch. Across processes the fsync is shared too: a sync lock and a small
+  "<players file>.sync" note of how far the file is known durable let one
+  process flush the lines every waiting process has appended.
+
+Run this file with --benchmark to measure throughput with N parallel registrants.
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+from instrumentation import timer
+from player_directory import get_directory
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks on Windows, single-terminal use only
+    fcntl = None
+
+# One journal per players file path, see get_journal.
+_journals = {}
+
+
+def _lock(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+
+@contextlib.contextmanager
+def locked_players_file(path: str):
+    """
+    Opens path for appending under the exclusive registration lock. If the
+    file was replaced (rehashed, password updated) while we waited for the
+    lock, the new file is opened and locked instead.
+    """
+    while True:
+        f = open(path, "ab")
+        with timer("players_file.lock_wait"):
+            _lock(f)
+        try:
+            if fcntl is None or os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+    try:
+        with timer("players_file.lock_held"):
+            yield f
+    finally:
+        # closing the file releases the lock
+        f.close()
+
+
+def _synced_offset(sync_file, inode: int) -> int:
+    """
+    Reads the "<inode> <offset>" note; 0 if it is missing or about another file.
+    """
+    sync_file.seek(0)
+    try:
+        noted_inode, offset = sync_file.read().split()
+        return int(offset) if int(noted_inode) == inode else 0
+    except ValueError:
+        return 0
+
+
+def register_many(path: str, entries: List[Tuple[str, str]]) -> List[bool]:
+    """
+    Atomically registers a batch of (username, stored password) pairs with a
+    single append and a single (shared) fsync. A username that already exists,
+    or appears earlier in the batch, is not written. Returns one flag per entry.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with locked_players_file(path) as f:
+        directory = get_directory(path)
+        directory.refresh()  # nobody else can append while we hold the lock
+        taken = set()
+        results = []
+        lines = []
+        for username, stored_pw in entries:
+            ok = username not in taken and not directory.exists(username, refresh=False)
+            if ok:
+                taken.add(username)
+                lines.append(f"{username},{stored_pw}\n")
+            results.append(ok)
+        if lines:
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+        end = os.fstat(f.fileno()).st_size
+        inode = os.fstat(f.fileno()).st_ino
+        # the lock is released here, other registrants can append while we sync
+
+    if lines:
+        _sync(path, inode, end)
+    return results
+
+
+def _sync(path: str, inode: int, end: int) -> None:
+    """
+    Makes sure players file bytes up to end are on disk. Whoever holds the
+    sync lock flushes everything appended so far, so writers queued behind
+    it usually find their lines already durable and skip their own fsync.
+    """
+    with open(f"{path}.sync", "a+") as sync_file:
+        with timer("players_file.sync_wait"):
+            _lock(sync_file)
+        if _synced_offset(sync_file, inode) >= end:
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            with timer("players_file.fsync"):
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        sync_file.seek(0)
+        sync_file.truncate()
+        sync_file.write(f"{inode} {size}\n")
+
+
+def update_password(path: str, username: str, stored_pw: str) -> bool:
+    """
+    Sets username's stored password by appending a superseding record under
+    the registration lock; the player directory keeps the last record per
+    username, so lookups pick it up from the tail like a registration.
+    Returns False if the username is not registered.
+    """
+    with locked_players_file(path) as f:
+        directory = get_directory(path)
+        directory.refresh()
+        if not directory.exists(username, refresh=False):
+            return False
+        f.write(f"{username},{stored_pw}\n".encode("utf-8"))
+        f.flush()
+        end = os.fstat(f.fileno()).st_size
+        inode = os.fstat(f.fileno()).st_ino
+    _sync(path, inode, end)
+    return True
+
+
+class RegistrationJournal:
+    """
+    Group commit for the threads of one process: the first registrant to find
+    no commit running becomes the leader and commits every queued entry in
+    one batch, the others wait for their result.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cond = threading.Condition()
+        self._pending = []  # [username, stored password, result] entries
+        self._committing = False
+        self.batches = 0
+
+    def register(self, username: str, stored_pw: str) -> bool:
+        """
+        Adds username unless it is already taken. Returns True if it was added.
+        """
+        entry = [username, stored_pw, None]
+        with self._cond:
+            self._pending.append(entry)
+            while entry[2] is None:
+                if self._committing:
+                    self._cond.wait()
+                    continue
+                batch, self._pending = self._pending, []
+                self._committing = True
+                self._cond.release()
+                try:
+                    results = register_many(self.path, [(u, pw) for u, pw, _ in batch])
+                except BaseException as e:
+                    results = [e] * len(batch)
+                finally:
+                    self._cond.acquire()
+                    self._committing = False
+                for pending_entry, result in zip(batch, results):
+                    pending_entry[2] = result
+                self.batches += 1
+                self._cond.notify_all()
+        if isinstance(entry[2], BaseException):
+            raise entry[2]
+        return entry[2]
+
+
+def get_journal(path: str) -> RegistrationJournal:
+    """
+    Returns the shared RegistrationJournal for a players file path.
+    """
+    key = os.path.abspath(path)
+    journal = _journals.get(key)
+    if journal is None:
+        journal = _journals[key] = RegistrationJournal(path)
+    return journal
+
+
+def register_player(path: str, username: str, stored_pw: str) -> bool:
+    """
+    Registers username with its stored (encrypted) password in the players
+    file at path. Returns False if the username is already taken.
+    """
+    return get_journal(path).register(username, stored_pw)
+
+
+# --- Benchmark ---
+def _naive_register(path: str, username: str, stored_pw: str) -> bool:
+    # the old write path plus an fsync per user, as a durable baseline
+    if os.path.exists(path) and get_directory(path).exists(username):
+        return False
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{username},{stored_pw}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return True
+
+
+def _registrant(mode: str, path: str, names: List[str], threads: int) -> int:
+    register = register_player if mode == "journal" else _naive_register
+    added = [0]
+
+    def work(part):
+        count = sum(1 for name in part if register(path, name, "encrypted"))
+        with lock:
+            added[0] += count
+
+    lock = threading.Lock()
+    workers = [threading.Thread(target=work, args=(names[i::threads],)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return added[0]
+
+
+def benchmark(registrants: int, users: int, threads: int = 4) -> List[Tuple[str, float, int, int]]:
+    """
+    Runs `registrants` processes (each with `threads` threads) signing up
+    `users` names in total, every name attempted by two registrants. Returns
+    (mode, registrations per second, users added, duplicate lines) rows.
+    """
+    rows = []
+    names = [f"user{i:07d}" for i in range(users)]
+    for mode in ("naive", "journal"):
+        workdir = tempfile.mkdtemp(prefix="mastermind_journal_")
+        path = os.path.join(workdir, "players.txt")
+        open(path, "w").close()
+        # each name goes to two different registrants to provoke races
+        shares = [names[i::registrants] + names[(i + 1) % registrants::registrants] for i in range(registrants)]
+        try:
+            start = time.perf_counter()
+            with multiprocessing.Pool(registrants) as pool:
+                added = sum(pool.starmap(_registrant, [(mode, path, share, threads) for share in shares]))
+            elapsed = time.perf_counter() - start
+            with open(path, encoding="utf-8") as f:
+                lines = [line.split(",", 1)[0] for line in f]
+            rows.append((mode, users / elapsed, added, len(lines) - len(set(lines))))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark journaled registration.")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--registrants", type=int, default=4, help="parallel registrant processes")
+    parser.add_argument("--threads", type=int, default=4, help="threads per registrant process")
+    parser.add_argument("--users", type=int, default=2000, help="distinct usernames to register")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for mode, rate, added, duplicates in benchmark(args.registrants, args.users, args.threads):
+            print(f"{mode:8s} {rate:10.1f} registrations/s  {added} added  {duplicates} duplicate lines")
+    else:
+        parser.print_help()
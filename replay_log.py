@@ -0,0 +1,309 @@
+"""
+Compact append-only binary log of played games, and a memory-mapped reader.
+
+play_game appends one record per finished game to REPLAY_FILE (see
+larongutak). A record is a 10-byte header, the palette letters, the
+username, the secret and one packed move per turn, then a CRC-32 of all that:
+
+    <B magic> <B flags> <B code length> <B colors> <B turns> <I unix time> <B name length>
+    palette (colors bytes)  username (name length bytes, UTF-8)
+    secret, then per turn guess * feedback_slots + encode_feedback(black, white)
+    <I crc32>
+
+Codes are codec.CodeSpace integers. The secret and the moves are stored in
+2 bytes when code * feedback_slots fits in 16 bits (6 colors x 4 pegs: 1296
+codes x 25 feedbacks), else in 4 or 8 bytes, so a default game of six
+guesses takes about 40 bytes. A record goes to the file in one O_APPEND
+write, so terminals can log to the same file without a lock. A record torn
+by a crash or a failed write, at the end or in the middle of the file, is
+skipped: the reader resynchronizes on the next record whose checksum holds
+and reports how many bytes it skipped.
+
+ReplayReader maps the file and walks the records with struct.unpack_from,
+decoding only the fields an aggregate needs. Run this file to print the
+aggregates of a log, or with --benchmark N to time writing and scanning N
+synthetic games.
+"""
+import argparse
+import mmap
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from codec import CodeSpace
+
+MAGIC = 0xA7
+FLAG_WON = 1
+
+_HEADER = struct.Struct("<BBBBBIB")
+_CRC = struct.Struct("<I")
+_WIDTH_FORMATS = {2: "H", 4: "I", 8: "Q"}
+
+
+class ReplayGame(NamedTuple):
+    username: str
+    colors: str
+    code_length: int
+    timestamp: int
+    won: bool
+    secret: int
+    moves: List[Tuple[int, int, int]]  # (guess code, black, white) per turn
+
+
+def move_width(space: CodeSpace) -> int:
+    """
+    Bytes per stored code or move for a code space: 2, 4 or 8.
+    """
+    return _width(space.base, space.code_length)
+
+
+def _width(base: int, code_length: int) -> int:
+    largest = base ** code_length * (code_length + 1) ** 2
+    return 2 if largest <= 1 << 16 else 4 if largest <= 1 << 32 else 8
+
+
+def encode_game(username: str, space: CodeSpace, secret: int, moves: List[Tuple[int, int, int]],
+                won: bool, timestamp: int = None) -> bytes:
+    """
+    One record for a game; moves are (guess code, black, white) with codec integers.
+    """
+    name = username.encode("utf-8")[:255]
+    width = move_width(space)
+    slots = space.feedback_slots
+    values = [secret] + [guess * slots + space.encode_feedback(black, white) for guess, black, white in moves]
+    header = _HEADER.pack(MAGIC, FLAG_WON if won else 0, space.code_length, space.base, len(moves),
+                          int(time.time() if timestamp is None else timestamp), len(name))
+    record = (header + "".join(space.colors).encode("ascii") + name
+              + struct.pack(f"<{len(values)}{_WIDTH_FORMATS[width]}", *values))
+    return record + _CRC.pack(zlib.crc32(record))
+
+
+def record_game(path: str, username: str, space: CodeSpace, secret: List[str],
+                history: List[Tuple[List[str], int, int]], won: bool) -> None:
+    """
+    Appends a game played with play_game's history of (guess, black, white) to the log at path.
+    """
+    moves = [(space.encode(guess), black, white) for guess, black, white in history]
+    record = encode_game(username, space, space.encode(secret), moves, won)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, record)
+    finally:
+        os.close(fd)
+
+
+class ReplayReader:
+    """
+    Read-only memory map of a replay log. Use as a context manager.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.skipped_bytes = 0  # damaged bytes passed over by the last records() scan
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def records(self) -> Iterator[Tuple[int, tuple, int]]:
+        """
+        Yields (offset, header fields, move width) for every intact record.
+        Damaged bytes are skipped up to the next record whose checksum holds
+        and counted in skipped_bytes.
+        """
+        data = self.data
+        end = len(data)
+        offset = 0
+        widths = {}
+        unpack_header = _HEADER.unpack_from
+        unpack_crc = _CRC.unpack_from
+        crc32 = zlib.crc32
+        size = _HEADER.size
+        marker = bytes([MAGIC])
+        self.skipped_bytes = 0
+        while offset + size <= end:
+            header = unpack_header(data, offset)
+            magic, _, length, base, turns, _, name_len = header
+            intact = False
+            if magic == MAGIC:
+                width = widths.get((base, length))
+                if width is None:
+                    width = widths[base, length] = _width(base, length)
+                body_end = offset + size + base + name_len + (turns + 1) * width
+                intact = (body_end + _CRC.size <= end
+                          and unpack_crc(data, body_end)[0] == crc32(data[offset:body_end]))
+            if not intact:
+                next_offset = data.find(marker, offset + 1)
+                next_offset = end if next_offset < 0 else next_offset
+                self.skipped_bytes += next_offset - offset
+                offset = next_offset
+                continue
+            yield offset, header, width
+            offset = body_end + _CRC.size
+        self.skipped_bytes += end - offset
+
+    def games(self) -> Iterator[ReplayGame]:
+        """
+        Fully decoded games, for reports and tools; aggregate() is faster for statistics.
+        """
+        data = self.data
+        for offset, (_, flags, length, base, turns, timestamp, name_len), width in self.records():
+            start = offset + _HEADER.size
+            colors = bytes(data[start:start + base]).decode("ascii")
+            name = bytes(data[start + base:start + base + name_len]).decode("utf-8", errors="replace")
+            values = struct.unpack_from(f"<{turns + 1}{_WIDTH_FORMATS[width]}", data, start + base + name_len)
+            slots = (length + 1) ** 2
+            moves = []
+            for value in values[1:]:
+                guess, feedback = divmod(value, slots)
+                moves.append((guess, *divmod(feedback, length + 1)))
+            yield ReplayGame(name, colors, length, timestamp, bool(flags & FLAG_WON), values[0], moves)
+
+    def aggregate(self) -> Dict[str, object]:
+        """
+        Scans every game once. Returns
+            "games", "wins",
+            "guess_histogram": Counter of attempts needed, over won games,
+            "openings": Counter of (colors, code length, first guess code),
+            "players": {username: {"games", "wins", "guess_histogram", "first_guess_wins"}},
+            "skipped_bytes": damaged bytes passed over.
+        A first-guess win rate far above 1 / codes is worth a closer look.
+        """
+        data = self.data
+        size = _HEADER.size
+        histogram = Counter()
+        openings = Counter()
+        players = {}
+        games = wins = 0
+        names = {}  # raw username bytes -> the player's entry
+        first_formats = {width: struct.Struct("<" + _WIDTH_FORMATS[width] * 2) for width in _WIDTH_FORMATS}
+        for offset, (_, flags, length, base, turns, _, name_len), width in self.records():
+            start = offset + size
+            raw_name = data[start + base:start + base + name_len]
+            player = names.get(raw_name)
+            if player is None:
+                username = bytes(raw_name).decode("utf-8", errors="replace")
+                player = players.get(username)
+                if player is None:
+                    player = players[username] = {"games": 0, "wins": 0, "guess_histogram": Counter(),
+                                                  "first_guess_wins": 0}
+                names[raw_name] = player
+            games += 1
+            player["games"] += 1
+            if turns:
+                _, first = first_formats[width].unpack_from(data, start + base + name_len)
+                openings[bytes(data[start:start + base]), length, first // ((length + 1) ** 2)] += 1
+            if flags & FLAG_WON:
+                wins += 1
+                player["wins"] += 1
+                histogram[turns] += 1
+                player["guess_histogram"][turns] += 1
+                if turns == 1:
+                    player["first_guess_wins"] += 1
+        openings = Counter({(colors.decode("ascii"), length, code): count
+                            for (colors, length, code), count in openings.items()})
+        return {"games": games, "wins": wins, "guess_histogram": histogram, "openings": openings,
+                "players": players, "skipped_bytes": self.skipped_bytes}
+
+
+# --- Synthetic games for the benchmark ---
+def _synthetic_records(count: int, players: int, seed: int = 0) -> Iterator[bytes]:
+    rng = random.Random(seed)
+    space = CodeSpace(["R", "G", "B", "Y", "W", "O"], 4)
+    for _ in range(count):
+        secret = space.random_code(rng)
+        turns = rng.randint(1, 10)
+        won = rng.random() < 0.7
+        moves = []
+        for turn in range(turns):
+            guess = secret if won and turn == turns - 1 else space.random_code(rng)
+            moves.append((guess, *space.score(secret, guess)))
+        yield encode_game(f"player{rng.randrange(players)}", space, secret, moves, won)
+
+
+def benchmark(count: int, players: int = 1000) -> List[Tuple[str, float]]:
+    """
+    Writes `count` synthetic games to a temporary log, then maps and aggregates it.
+    Returns (operation, games per second) pairs.
+    """
+    workdir = tempfile.mkdtemp(prefix="mastermind_replays_")
+    path = os.path.join(workdir, "replays.bin")
+    rows = []
+    try:
+        records = list(_synthetic_records(count, players))
+        start = time.perf_counter()
+        with open(path, "wb") as f:
+            f.write(b"".join(records))
+        rows.append((f"write ({os.path.getsize(path) / count:.1f} bytes/game)", count / (time.perf_counter() - start)))
+        del records
+
+        start = time.perf_counter()
+        with ReplayReader(path) as reader:
+            result = reader.aggregate()
+        assert result["games"] == count
+        rows.append(("aggregate", count / (time.perf_counter() - start)))
+
+        start = time.perf_counter()
+        with ReplayReader(path) as reader:
+            decoded = sum(1 for _ in reader.games())
+        rows.append(("decode every move", decoded / (time.perf_counter() - start)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+def print_report(result: Dict[str, object], username: str = None, top: int = 5) -> None:
+    games, wins = result["games"], result["wins"]
+    if result["skipped_bytes"]:
+        print(f"Warning: skipped {result['skipped_bytes']} bytes of damaged records.")
+    if username is not None:
+        result = result["players"].get(username)
+        if result is None:
+            print(f"No games recorded for {username}.")
+            return
+        games, wins = result["games"], result["wins"]
+        print(f"{username}: {games} games, {wins} won, {result['first_guess_wins']} won on the first guess")
+    else:
+        print(f"{games} games, {wins} won, {len(result['players'])} players")
+        print("Most common openings:")
+        for (colors, length, code), count in result["openings"].most_common(top):
+            print(f"  {CodeSpace(list(colors), length).format(code)}  {count} ({100.0 * count / games:.1f}%)")
+    print("Guesses needed to win:")
+    for turns in sorted(result["guess_histogram"]):
+        count = result["guess_histogram"][turns]
+        print(f"  {turns:2d} {count:10d} {'#' * round(40 * count / max(wins, 1))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate Mastermind replay logs.")
+    parser.add_argument("path", nargs="?", default="replays.bin")
+    parser.add_argument("--player", help="report a single player")
+    parser.add_argument("--top", type=int, default=5, help="openings to list")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="time writing and scanning N synthetic games")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for operation, rate in benchmark(args.benchmark):
+            print(f"{operation:32s} {rate:12.0f} games/s")
+    else:
+        try:
+            with ReplayReader(args.path) as reader:
+                print_report(reader.aggregate(), args.player, args.top)
+        except FileNotFoundError:
+            print(f"No replay log at {args.path}.")
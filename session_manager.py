@@ -0,0 +1,170 @@
+"""
+In-memory login sessions, replacing the single shared session.txt.
+
+Every login gets a random token mapped to (username, expiry) in a dict, so
+any number of players can be logged in at once and validating a token is a
+dict lookup with no file I/O. Expired sessions are dropped lazily: when a
+token is looked up, and in small steps from a min-heap of expiry times on
+each new login. Snapshots to disk are optional (SNAPSHOT_INTERVAL) and run
+on a background thread, so sessions can survive a restart.
+"""
+import heapq
+import os
+import secrets
+import threading
+import time
+from typing import Dict, Tuple
+
+SESSION_TTL = 30 * 60  # seconds a session stays valid after login or last use
+SNAPSHOT_FILE = "session.txt"  # "token,username,expires" lines
+SNAPSHOT_INTERVAL = 0  # seconds between snapshots, 0 keeps sessions in memory only
+
+_manager = None
+
+
+class SessionManager:
+    """
+    Token -> (username, expiry) map with lazy expiry.
+    current is the token of this terminal's logged-in player, if any.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self.current = None
+        self._sessions = {}  # type: Dict[str, Tuple[str, float]]
+        self._expiries = []  # (expiry, token) heap, entries go stale when a session is touched or ended
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: float, limit: int = 8) -> None:
+        # drops up to limit sessions whose expiry has passed, called with the lock held
+        while self._expiries and limit and self._expiries[0][0] <= now:
+            expiry, token = heapq.heappop(self._expiries)
+            session = self._sessions.get(token)
+            if session is not None and session[1] <= now:
+                del self._sessions[token]
+            limit -= 1
+
+    def create(self, username: str) -> str:
+        """
+        Starts a session for username and returns its token.
+        """
+        token = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            self._sessions[token] = (username, now + self.ttl)
+            heapq.heappush(self._expiries, (now + self.ttl, token))
+        return token
+
+    def login(self, username: str) -> str:
+        """
+        Starts a session and makes it this terminal's current one, ending the previous one.
+        """
+        if self.current is not None:
+            self.end(self.current)
+        self.current = self.create(username)
+        return self.current
+
+    def validate(self, token: str, touch: bool = True) -> str or None:
+        """
+        Returns the username of a live session, or None. With touch the
+        session's expiry is pushed back to ttl from now (once less than half
+        of it is left, so busy sessions do not grow the expiry heap).
+        """
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        now = time.time()
+        if session[1] <= now:
+            with self._lock:
+                self._sessions.pop(token, None)
+            return None
+        if touch and session[1] - now < self.ttl / 2:
+            with self._lock:
+                self._sessions[token] = (session[0], now + self.ttl)
+                heapq.heappush(self._expiries, (now + self.ttl, token))
+        return session[0]
+
+    def end(self, token: str = None) -> bool:
+        """
+        Ends a session (default: the current one). Returns False if there was no live session.
+        """
+        token = token or self.current
+        if token is None:
+            return False
+        if token == self.current:
+            self.current = None
+        with self._lock:
+            session = self._sessions.pop(token, None)
+        return session is not None and session[1] > time.time()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def snapshot(self, path: str = None) -> None:
+        """
+        Writes the live sessions to path (default SNAPSHOT_FILE) with an atomic replace.
+        """
+        path = path or SNAPSHOT_FILE
+        now = time.time()
+        with self._lock:
+            live = [(token, user, expiry) for token, (user, expiry) in self._sessions.items() if expiry > now]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for token, user, expiry in live:
+                f.write(f"{token},{user},{expiry:.3f}\n")
+        os.replace(tmp_path, path)
+
+    def restore(self, path: str = None) -> int:
+        """
+        Loads the unexpired sessions of a snapshot. Returns how many were restored.
+        """
+        now = time.time()
+        restored = 0
+        try:
+            with open(path or SNAPSHOT_FILE, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        token, user, expiry = line.strip().split(",")
+                        expiry = float(expiry)
+                    except ValueError:
+                        # malformed line (or an old single-user session.txt), skip
+                        continue
+                    if expiry > now:
+                        with self._lock:
+                            self._sessions[token] = (user, expiry)
+                            heapq.heappush(self._expiries, (expiry, token))
+                        restored += 1
+        except FileNotFoundError:
+            pass
+        return restored
+
+    def start_snapshots(self, interval: float, path: str = None) -> threading.Thread:
+        """
+        Snapshots every interval seconds on a daemon thread.
+        """
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.snapshot(path)
+                except IOError as e:
+                    print(f"Error writing session snapshot: {e}")
+
+        thread = threading.Thread(target=run, name="session-snapshots", daemon=True)
+        thread.start()
+        return thread
+
+
+def get_session_manager() -> SessionManager:
+    """
+    Returns the process-wide SessionManager, restoring the snapshot and
+    starting periodic snapshots on first use when SNAPSHOT_INTERVAL is set.
+    """
+    global _manager
+    if _manager is None:
+        _manager = SessionManager()
+        if SNAPSHOT_INTERVAL:
+            _manager.restore()
+            _manager.start_snapshots(SNAPSHOT_INTERVAL)
+    return _manager
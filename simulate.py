@@ -0,0 +1,189 @@
+"""
+Headless simulation harness for tuning MAX_ATTEMPTS and palette size.
+
+A strategy is any picklable callable taking the game history so far, a list
+of (guess, black, white) tuples, and returning the next guess as a list of
+color letters. Strategy classes are instantiated per chunk with the game's
+codec.CodeSpace, so one instance can keep state across a game. Games are
+split into fixed chunks, each seeded from the run seed and its chunk number,
+so results do not depend on how many workers the process pool has. Secrets
+come from larongutak.generate_secret_code and feedback from
+larongutak.score_guess, so the real rules are measured.
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from codec import CodeSpace
+from game_core import larongutak
+
+History = List[Tuple[List[str], int, int]]
+Strategy = Callable[[History], List[str]]
+
+CHUNK_SIZE = 500
+
+
+class RandomConsistentStrategy:
+    """
+    Plays a random code that agrees with every feedback so far. The consistent
+    codes are kept per game and narrowed by the latest feedback only. rng
+    (default: the random module) makes the choices reproducible from a seed.
+    """
+
+    def __init__(self, space: CodeSpace = None, rng: random.Random = None):
+        self.space = space or larongutak.default_space()
+        self.rng = rng or random
+        self._candidates = None
+
+    def __call__(self, history: History) -> List[str]:
+        if not history or self._candidates is None:
+            self._candidates = range(self.space.size)
+        else:
+            past, black, white = history[-1]
+            past = self.space.encode(past)
+            self._candidates = [code for code in self._candidates
+                                if larongutak.score_indices(code, past, self.space) == (black, white)]
+        return self.space.decode(self.rng.choice(self._candidates))
+
+
+class KnuthStrategy:
+    """
+    Strategy wrapper around solver.KnuthSolver. It keeps one solver per game
+    and starts a new one whenever it is called with an empty history. It is
+    deterministic, rng is accepted like RandomConsistentStrategy's and unused.
+    """
+
+    def __init__(self, space: CodeSpace = None, rng: random.Random = None):
+        self.space = space or larongutak.default_space()
+        self._solver = None
+
+    def __call__(self, history: History) -> List[str]:
+        import solver  # imported in the worker, it needs NumPy
+
+        if not history or self._solver is None:
+            self._solver = solver.KnuthSolver(solver.opening_book.get_book(space=self.space), self.space)
+        else:
+            self._solver.update(*history[-1])
+        return self._solver.next_guess()
+
+
+STRATEGIES = {
+    "random": RandomConsistentStrategy,
+    "knuth": KnuthStrategy,
+}
+
+
+def play_headless(strategy: Strategy, secret: List[str], max_attempts: int,
+                  space: CodeSpace = None) -> Tuple[int, bool]:
+    """
+    Plays one game without any terminal I/O. Returns attempts used and win status.
+    """
+    space = space or larongutak.default_space()
+    history = []
+    for attempt in range(1, max_attempts + 1):
+        guess = strategy(history)
+        black, white = larongutak.score_guess(secret, guess, space)
+        if black == space.code_length:
+            return attempt, True
+        history.append((guess, black, white))
+    return max_attempts, False
+
+
+def _run_chunk(strategy: Strategy, space: CodeSpace, max_attempts: int,
+               seed: int, chunk: int, count: int, first_index: int = None) -> Tuple[Counter, int]:
+    """
+    Plays count games in a worker. Secrets are random (seeded from seed and chunk),
+    or the codes first_index.. of the space when first_index is given.
+    Returns (attempts of each won game, number of lost games).
+    """
+    random.seed(seed * 1_000_003 + chunk)
+    if isinstance(strategy, type):
+        strategy = strategy(space)
+
+    wins = Counter()
+    losses = 0
+    for i in range(count):
+        if first_index is None:
+            secret = larongutak.generate_secret_code(space)
+        else:
+            secret = space.decode(first_index + i)
+        attempts, won = play_headless(strategy, secret, max_attempts, space)
+        if won:
+            wins[attempts] += 1
+        else:
+            losses += 1
+    return wins, losses
+
+
+def simulate(strategy: Strategy, games: int = None, max_attempts: int = None, workers: int = None,
+             seed: int = 0, space: CodeSpace = None) -> Dict[str, object]:
+    """
+    Plays games random secrets, or every code of the space when games is None,
+    across a process pool. strategy may be a callable or a class to instantiate
+    once per chunk with the space (for stateful strategies such as KnuthStrategy).
+    """
+    space = space or larongutak.default_space()
+    max_attempts = max_attempts or larongutak.MAX_ATTEMPTS
+    total = space.size if games is None else games
+    workers = workers or os.cpu_count() or 1
+
+    chunks = []
+    for chunk, start in enumerate(range(0, total, CHUNK_SIZE)):
+        count = min(CHUNK_SIZE, total - start)
+        chunks.append((chunk, count, start if games is None else None))
+
+    wins = Counter()
+    losses = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_chunk, strategy, space, max_attempts, seed, chunk, count, first_index)
+            for chunk, count, first_index in chunks
+        ]
+        for future in futures:
+            chunk_wins, chunk_losses = future.result()
+            wins.update(chunk_wins)
+            losses += chunk_losses
+    elapsed = time.perf_counter() - started
+
+    won = sum(wins.values())
+    return {
+        "games": total,
+        "max_attempts": max_attempts,
+        "distribution": dict(sorted(wins.items())),
+        "losses": losses,
+        "win_rate": won / total if total else 0.0,
+        "average_attempts": sum(k * v for k, v in wins.items()) / won if won else 0.0,
+        "seconds": elapsed,
+        "games_per_second": total / elapsed if elapsed else 0.0,
+    }
+
+
+def format_report(report: Dict[str, object]) -> str:
+    lines = [f"Games: {report['games']}  (max attempts {report['max_attempts']})"]
+    for attempts, count in report["distribution"].items():
+        lines.append(f"  won in {attempts:2d}: {count}")
+    lines.append(f"  lost     : {report['losses']}")
+    lines.append(f"Win rate: {report['win_rate']:.2%}  average attempts (wins): {report['average_attempts']:.3f}")
+    lines.append(f"Speed: {report['games_per_second']:.0f} games/s ({report['seconds']:.2f} s)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many Mastermind games headlessly.")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="knuth")
+    parser.add_argument("--games", type=int, default=None, help="random games to play (default: every secret)")
+    parser.add_argument("--max-attempts", type=int, default=larongutak.MAX_ATTEMPTS)
+    parser.add_argument("--colors", default="".join(larongutak.COLORS), help="color letters, e.g. RGBYWO")
+    parser.add_argument("--length", type=int, default=larongutak.CODE_LENGTH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    space = CodeSpace(args.colors, args.length)
+    report = simulate(STRATEGIES[args.strategy], args.games, args.max_attempts, args.workers, args.seed, space)
+    print(format_report(report))
@@ -0,0 +1,185 @@
+"""
+Knuth's minimax auto-solver for the larongutak Mastermind game.
+
+Each move scores every code of the space against the codes still consistent
+with the feedback so far, and plays the guess whose worst-case feedback group
+is smallest (ties go to a consistent code, then to the lowest code index).
+For 6 colors x 4 positions this solves every secret in at most 5 guesses.
+"""
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+import batch_scoring
+import opening_book
+from codec import CodeSpace
+from game_core import larongutak
+
+# First guess per CodeSpace, it is the same for every game.
+_opening_cache = {}
+
+
+def feedback_matrix(space: CodeSpace = None) -> np.ndarray or None:
+    """
+    Returns larongutak's feedback table as an (n, n) array view, or None if it is disabled.
+    """
+    space = space or larongutak.default_space()
+    table = larongutak.get_feedback_table(space)
+    if table is None:
+        return None
+    return np.frombuffer(table, dtype=np.uint8).reshape(space.size, space.size)
+
+
+def partition_sizes(feedback: np.ndarray, space: CodeSpace = None) -> np.ndarray:
+    """
+    Given a (guesses, candidates) array of packed feedback, returns a
+    (guesses, feedback_slots) array counting the candidates in each feedback group.
+    """
+    slots = (space or larongutak.default_space()).feedback_slots
+    rows = feedback.shape[0]
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * slots
+    counts = np.bincount((feedback + offsets).ravel(), minlength=rows * slots)
+    return counts.reshape(rows, slots)
+
+
+def pick_minimax(worst: np.ndarray, candidates: np.ndarray) -> int:
+    """
+    Chooses the guess index with the smallest worst case, preferring consistent codes.
+    """
+    best = worst.min()
+    tied = np.flatnonzero(worst == best)
+    consistent = tied[np.isin(tied, candidates)]
+    return int(consistent[0] if len(consistent) else tied[0])
+
+
+def minimax_guess(candidates: np.ndarray, matrix: np.ndarray = None, codes: np.ndarray = None,
+                  space: CodeSpace = None) -> int:
+    """
+    Knuth's rule for one position: the code index whose largest feedback group
+    over candidates is smallest. Pass the feedback matrix, or the full code
+    array when the space has no table.
+    """
+    if len(candidates) <= 2:
+        return int(candidates[0])
+    if matrix is not None:
+        feedback = matrix[:, candidates]
+    else:
+        feedback = batch_scoring.feedback_block(codes, codes[candidates], space=space)
+    worst = partition_sizes(feedback, space).max(axis=1)
+    return pick_minimax(worst, candidates)
+
+
+class KnuthSolver:
+    """
+    Plays one game: ask next_guess(), then report the feedback with update().
+    Codes are handled as codec.CodeSpace integers internally.
+    With an opening book the moves are read from the stored tree instead.
+    """
+
+    def __init__(self, book: "opening_book.OpeningBook" = None, space: CodeSpace = None):
+        self.space = space or larongutak.default_space()
+        self.matrix = feedback_matrix(self.space)
+        self.codes = batch_scoring.all_codes_array(self.space)
+        self.candidates = np.arange(self.space.size, dtype=np.int64)
+        self.guesses_made = 0
+        self.book = book if book is not None and book.matches_config(self.space) else None
+        self.node = None if self.book is None else self.book.root
+
+    def next_guess_index(self) -> int:
+        """
+        Returns the integer code of the next guess to play.
+        """
+        if len(self.candidates) == 0:
+            raise ValueError("No code is consistent with the feedback given.")
+        if self.node is not None:
+            return self.book.guess_index(self.node)
+        if len(self.candidates) <= 2:
+            return int(self.candidates[0])
+
+        opening = self.guesses_made == 0 and len(self.candidates) == self.space.size
+        if opening and self.space in _opening_cache:
+            return _opening_cache[self.space]
+
+        guess = minimax_guess(self.candidates, self.matrix, self.codes, self.space)
+        if opening:
+            _opening_cache[self.space] = guess
+        return guess
+
+    def next_guess(self) -> List[str]:
+        """
+        Returns the next guess as a list of color letters.
+        """
+        return self.space.decode(self.next_guess_index())
+
+    def update(self, guess: List[str], black: int, white: int) -> int:
+        """
+        Keeps only the candidates consistent with (black, white) for guess.
+        Returns how many candidates remain.
+        """
+        guess_index = self.space.encode(guess)
+        if self.node is not None:
+            if guess_index == self.book.guess_index(self.node):
+                self.node = self.book.child(self.node, black, white)
+            else:
+                self.node = None
+        if self.matrix is not None:
+            feedback = self.matrix[guess_index, self.candidates]
+        else:
+            feedback = batch_scoring.feedback_block(self.codes[guess_index], self.codes[self.candidates],
+                                                    space=self.space)[0]
+        self.candidates = self.candidates[feedback == self.space.encode_feedback(black, white)]
+        self.guesses_made += 1
+        return len(self.candidates)
+
+
+def solve(secret: List[str] = None, max_attempts: int = None,
+          space: CodeSpace = None) -> List[Tuple[List[str], int, int]]:
+    """
+    Lets the computer play against secret (a random one if omitted).
+    Returns the (guess, black, white) sequence; the last guess is the secret
+    unless max_attempts ran out first.
+    """
+    space = space or larongutak.default_space()
+    if secret is None:
+        secret = larongutak.generate_secret_code(space)
+    solver = KnuthSolver(opening_book.get_book(space=space), space)
+    turns = []
+    while max_attempts is None or len(turns) < max_attempts:
+        guess = solver.next_guess()
+        black, white = larongutak.score_guess(secret, guess, space)
+        turns.append((guess, black, white))
+        if black == space.code_length:
+            break
+        solver.update(guess, black, white)
+    return turns
+
+
+def watch_solve(space: CodeSpace = None) -> None:
+    """
+    Menu option: shows the computer solving a random secret move by move.
+    """
+    space = space or larongutak.default_space()
+    secret = larongutak.generate_secret_code(space)
+    print("\n=== Watch the computer solve it ===")
+    print(f"Secret code: {''.join(secret)}")
+
+    solver = KnuthSolver(opening_book.get_book(space=space), space)
+    for attempt in range(1, larongutak.MAX_ATTEMPTS + 1):
+        start = time.perf_counter()
+        guess = solver.next_guess()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        black, white = larongutak.score_guess(secret, guess, space)
+        print(f"Attempt {attempt}/{larongutak.MAX_ATTEMPTS} - Computer guesses {''.join(guess)} "
+              f"({len(solver.candidates)} codes left, {elapsed_ms:.1f} ms)")
+        print(f"Feedback -> Black pegs (correct color+pos): {black}, White pegs (correct color wrong pos): {white}")
+        if black == space.code_length:
+            print(f"The computer cracked the code in {attempt} attempts.")
+            return
+        solver.update(guess, black, white)
+
+    print("The computer ran out of attempts.")
+
+
+if __name__ == "__main__":
+    watch_solve()
@@ -0,0 +1,470 @@
+"""
+Storage backends for players and highscores.
+
+TextFileBackend is the original behaviour: players.txt ("username,password"
+lines, indexed by player_directory) and one "username,score" log per
+leaderboard (indexed by leaderboard). SQLiteBackend keeps the same data in
+one SQLite database shared by many game terminals: WAL journal, one reused
+connection per process and thread, parameterised statements (sqlite3 caches
+the prepared statements) and primary-key indexes on the username columns.
+
+Both backends raise IOError (FileNotFoundError for a missing players file)
+so callers keep a single error path. A leaderboard is named after its text
+file, e.g. "highscores" for highscores.txt, so the highscore functions take
+the same highscores_file argument whichever backend is active.
+
+Run this file to migrate the text files into a database (--migrate) or to
+compare the two backends (--benchmark N).
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from leaderboard import get_leaderboard
+from player_directory import current_lines, get_directory
+from player_stats import games_file, get_game_log
+from password_hash import needs_rehash, hash_password, verify_password
+from registration_journal import register_player, update_password
+
+# One connection per (process, thread, database path), see SQLiteBackend.connection.
+_connections = {}
+
+# Rows per transaction during migration.
+MIGRATION_BATCH = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS highscores (
+    board TEXT NOT NULL,
+    username TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (board, username)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS highscores_by_score ON highscores (board, score, username);
+CREATE TABLE IF NOT EXISTS games (
+    board TEXT NOT NULL,
+    username TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    PRIMARY KEY (board, username)
+) WITHOUT ROWID;
+"""
+
+_SELECT_PASSWORD = "SELECT password FROM players WHERE username = ?"
+_INSERT_PLAYER = "INSERT INTO players (username, password) VALUES (?, ?)"
+_UPDATE_PASSWORD = "UPDATE players SET password = ? WHERE username = ?"
+_INSERT_PLAYER_IF_NEW = "INSERT OR IGNORE INTO players (username, password) VALUES (?, ?)"
+_SELECT_SCORES = "SELECT username, score FROM highscores WHERE board = ?"
+_SELECT_SCORE = "SELECT score FROM highscores WHERE board = ? AND username = ?"
+_SELECT_TOP = "SELECT username, score FROM highscores WHERE board = ? ORDER BY score, username LIMIT ?"
+_COUNT_PLAYERS = "SELECT COUNT(*) FROM highscores WHERE board = ?"
+_COUNT_BETTER = "SELECT COUNT(*) FROM highscores WHERE board = ? AND score < ?"
+_COUNT_WORSE = "SELECT COUNT(*) FROM highscores WHERE board = ? AND score > ?"
+_COUNT_TIED_BEFORE = "SELECT COUNT(*) FROM highscores WHERE board = ? AND score = ? AND username < ?"
+_SELECT_BEFORE = ("SELECT username, score FROM highscores WHERE board = ? AND (score, username) < (?, ?) "
+                  "ORDER BY score DESC, username DESC LIMIT ?")
+_SELECT_FROM = ("SELECT username, score FROM highscores WHERE board = ? AND (score, username) >= (?, ?) "
+                "ORDER BY score, username LIMIT ?")
+_RECORD_GAME = ("INSERT INTO games (board, username, games, wins, attempts) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (board, username) DO UPDATE SET games = games + 1, "
+                "wins = wins + excluded.wins, attempts = attempts + excluded.attempts")
+_SELECT_GAMES = "SELECT games, wins, attempts FROM games WHERE board = ? AND username = ?"
+_DELETE_BOARD = "DELETE FROM highscores WHERE board = ?"
+_DELETE_GAMES = "DELETE FROM games WHERE board = ?"
+_INSERT_GAMES = "INSERT INTO games (board, username, games, wins, attempts) VALUES (?, ?, ?, ?, ?)"
+_UPSERT_SCORE = ("INSERT INTO highscores (board, username, score) VALUES (?, ?, ?) "
+                 "ON CONFLICT (board, username) DO UPDATE SET score = excluded.score")
+
+
+def board_name(highscores_file: str) -> str:
+    """
+    Leaderboard name for a highscores file path: "highscores_evil.txt" -> "highscores_evil".
+    """
+    return os.path.splitext(os.path.basename(highscores_file))[0]
+
+
+class TextFileBackend:
+    """
+    players.txt plus one text file per leaderboard.
+    """
+
+    name = "text"
+
+    def __init__(self, players_file: str):
+        self.players_file = players_file
+
+    def player_exists(self, username: str) -> bool:
+        return get_directory(self.players_file).exists(username)
+
+    def get_password(self, username: str) -> str or None:
+        return get_directory(self.players_file).get_password(username)
+
+    def add_player(self, username: str, stored_pw: str) -> bool:
+        """
+        Appends a player through the registration journal; returns False if the username was taken meanwhile.
+        """
+        return register_player(self.players_file, username, stored_pw)
+
+    def update_password(self, username: str, stored_pw: str) -> bool:
+        return update_password(self.players_file, username, stored_pw)
+
+    def load_highscores(self, highscores_file: str) -> Dict[str, int]:
+        return get_leaderboard(highscores_file).scores()
+
+    def save_highscores(self, scores: Dict[str, int], highscores_file: str) -> None:
+        get_leaderboard(highscores_file).replace(scores)
+
+    def record_highscore(self, username: str, score: int, highscores_file: str) -> int or None:
+        """
+        Stores score if it beats username's best. Returns the previous best or None.
+        """
+        return get_leaderboard(highscores_file).record(username, score)
+
+    def top_highscores(self, k: int, highscores_file: str) -> List[Tuple[str, int]]:
+        return get_leaderboard(highscores_file).top(k)
+
+    def player_standing(self, username: str, k: int, highscores_file: str) -> Dict[str, object] or None:
+        """
+        {"rank", "players", "percentile", "around"} for username, or None without a score.
+        around lists up to k neighbours per side as (position, username, score).
+        """
+        board = get_leaderboard(highscores_file)
+        standing = board.rank(username)
+        if standing is None:
+            return None
+        return {
+            "rank": standing[0],
+            "players": standing[1],
+            "percentile": board.percentile(username),
+            "around": board.around(username, k),
+        }
+
+    def record_game(self, username: str, attempts: int, won: bool, highscores_file: str) -> None:
+        get_game_log(games_file(highscores_file)).record(username, attempts, won)
+
+    def player_stats(self, username: str, highscores_file: str) -> Dict[str, float] or None:
+        return get_game_log(games_file(highscores_file)).stats(username)
+
+
+class SQLiteBackend:
+    """
+    Players and every leaderboard in one SQLite database.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns this process's connection, opening and configuring it on first use.
+        A forked child opens its own connection instead of sharing the parent's,
+        and so does each thread (sqlite3 connections are bound to their thread).
+        """
+        key = (os.getpid(), threading.get_ident(), os.path.abspath(self.db_path))
+        conn = _connections.get(key)
+        if conn is None:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, cached_statements=64)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+            except sqlite3.Error as e:
+                raise IOError(f"Cannot open database {self.db_path}: {e}") from e
+            _connections[key] = conn
+        return conn
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[tuple]:
+        try:
+            return self.connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+
+    def player_exists(self, username: str) -> bool:
+        return bool(self._query(_SELECT_PASSWORD, (username,)))
+
+    def get_password(self, username: str) -> str or None:
+        rows = self._query(_SELECT_PASSWORD, (username,))
+        return rows[0][0] if rows else None
+
+    def add_player(self, username: str, stored_pw: str) -> bool:
+        """
+        Inserts a player; returns False if the username was taken meanwhile.
+        """
+        try:
+            self.connection().execute(_INSERT_PLAYER, (username, stored_pw))
+        except sqlite3.IntegrityError:
+            return False
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+        return True
+
+    def update_password(self, username: str, stored_pw: str) -> bool:
+        try:
+            return self.connection().execute(_UPDATE_PASSWORD, (stored_pw, username)).rowcount > 0
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+
+    def load_highscores(self, highscores_file: str) -> Dict[str, int]:
+        return dict(self._query(_SELECT_SCORES, (board_name(highscores_file),)))
+
+    def save_highscores(self, scores: Dict[str, int], highscores_file: str) -> None:
+        board = board_name(highscores_file)
+        conn = self.connection()
+        try:
+            with _transaction(conn):
+                conn.execute(_DELETE_BOARD, (board,))
+                conn.executemany(_UPSERT_SCORE, ((board, user, s) for user, s in scores.items()))
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+
+    def record_highscore(self, username: str, score: int, highscores_file: str) -> int or None:
+        """
+        Stores score if it beats username's best. Returns the previous best or None.
+        """
+        board = board_name(highscores_file)
+        conn = self.connection()
+        try:
+            with _transaction(conn):
+                row = conn.execute(_SELECT_SCORE, (board, username)).fetchone()
+                prev = None if row is None else row[0]
+                if prev is None or score < prev:
+                    conn.execute(_UPSERT_SCORE, (board, username, score))
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+        return prev
+
+    def top_highscores(self, k: int, highscores_file: str) -> List[Tuple[str, int]]:
+        return self._query(_SELECT_TOP, (board_name(highscores_file), k))
+
+    def player_standing(self, username: str, k: int, highscores_file: str) -> Dict[str, object] or None:
+        """
+        Same result as TextFileBackend.player_standing, from range scans of the score index.
+        """
+        board = board_name(highscores_file)
+        rows = self._query(_SELECT_SCORE, (board, username))
+        if not rows:
+            return None
+        score = rows[0][0]
+        players = self._query(_COUNT_PLAYERS, (board,))[0][0]
+        better = self._query(_COUNT_BETTER, (board, score))[0][0]
+        worse = self._query(_COUNT_WORSE, (board, score))[0][0]
+        before = self._query(_SELECT_BEFORE, (board, score, username, k))[::-1]
+        after = self._query(_SELECT_FROM, (board, score, username, k + 1))
+        position = better + self._query(_COUNT_TIED_BEFORE, (board, score, username))[0][0]
+        first = position - len(before) + 1
+        return {
+            "rank": better + 1,
+            "players": players,
+            "percentile": 100.0 * worse / players,
+            "around": [(first + i, name, s) for i, (name, s) in enumerate(before + after)],
+        }
+
+    def record_game(self, username: str, attempts: int, won: bool, highscores_file: str) -> None:
+        try:
+            self.connection().execute(_RECORD_GAME, (board_name(highscores_file), username, int(won), attempts))
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+
+    def player_stats(self, username: str, highscores_file: str) -> Dict[str, float] or None:
+        rows = self._query(_SELECT_GAMES, (board_name(highscores_file), username))
+        if not rows:
+            return None
+        games, wins, attempts = rows[0]
+        return {
+            "games": games,
+            "wins": wins,
+            "win_rate": wins / games,
+            "average_attempts": attempts / games,
+        }
+
+
+class _transaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT/ROLLBACK on an autocommit connection.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def check_password(backend, username: str, password: str) -> bool or None:
+    """
+    Verifies a login against the stored password hash. Returns None if the
+    username is not registered. A correct password stored with an old scheme
+    or cost is rehashed and saved on the spot.
+    """
+    stored_pw = backend.get_password(username)
+    if stored_pw is None:
+        return None
+    if not verify_password(password, stored_pw):
+        return False
+    if needs_rehash(stored_pw):
+        backend.update_password(username, hash_password(password))
+    return True
+
+
+def open_backend(kind: str, players_file: str, db_path: str):
+    """
+    Returns the backend named kind ("text" or "sqlite").
+    """
+    if kind == "text":
+        return TextFileBackend(players_file)
+    if kind == "sqlite":
+        return SQLiteBackend(db_path)
+    raise ValueError(f"Unknown storage backend {kind!r}, expected 'text' or 'sqlite'.")
+
+
+def default_highscores_files() -> List[str]:
+    """
+    Every leaderboard the game writes: the normal and the hard mode highscores file.
+    """
+    from game_core import larongutak
+
+    return [larongutak.HIGHSCORES_FILE, larongutak.EVIL_HIGHSCORES_FILE]
+
+
+def migrate_text_to_sqlite(players_file: str, highscores_files: List[str], db_path: str) -> Tuple[int, int, int]:
+    """
+    One-shot copy of the text files into db_path. Existing players are kept
+    (from the file, the last line per username, as in the text backend); each
+    leaderboard and its games log (see player_stats) replace what the
+    database had for that board.
+    Returns (players inserted, highscores copied, players with game statistics copied).
+    """
+    backend = SQLiteBackend(db_path)
+    conn = backend.connection()
+
+    def player_rows():
+        with open(players_file, "rb") as f:
+            for line in current_lines(f):
+                line = line.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                try:
+                    user, stored_pw = line.split(",", 1)
+                except ValueError:
+                    continue
+                yield user, stored_pw
+
+    players = 0
+    if os.path.exists(players_file):
+        batch = []
+        for row in player_rows():
+            batch.append(row)
+            if len(batch) >= MIGRATION_BATCH:
+                players += _insert_players(conn, batch)
+                batch = []
+        players += _insert_players(conn, batch)
+
+    scores = 0
+    stats = 0
+    for highscores_file in highscores_files:
+        board = get_leaderboard(highscores_file).scores()
+        backend.save_highscores(board, highscores_file)
+        scores += len(board)
+        name = board_name(highscores_file)
+        totals = get_game_log(games_file(highscores_file)).totals()
+        try:
+            with _transaction(conn):
+                conn.execute(_DELETE_GAMES, (name,))
+                conn.executemany(_INSERT_GAMES, ((name, user, *row) for user, row in totals.items()))
+        except sqlite3.Error as e:
+            raise IOError(str(e)) from e
+        stats += len(totals)
+    return players, scores, stats
+
+
+def _insert_players(conn: sqlite3.Connection, rows: List[Tuple[str, str]]) -> int:
+    if not rows:
+        return 0
+    with _transaction(conn):
+        before = conn.total_changes
+        conn.executemany(_INSERT_PLAYER_IF_NEW, rows)
+        return conn.total_changes - before
+
+
+def benchmark(players: int) -> List[Tuple[str, str, float]]:
+    """
+    Times registration, lookups and a highscore save/load for both backends
+    in a temporary directory. Returns (backend, operation, ops per second) rows.
+    """
+    rows = []
+    workdir = tempfile.mkdtemp(prefix="mastermind_storage_")
+    try:
+        open(os.path.join(workdir, "players.txt"), "w").close()
+        for kind in ("text", "sqlite"):
+            backend = open_backend(kind, os.path.join(workdir, "players.txt"), os.path.join(workdir, "mastermind.db"))
+            highscores_file = os.path.join(workdir, "highscores.txt")
+            names = [f"user{i:07d}" for i in range(players)]
+
+            start = time.perf_counter()
+            for name in names:
+                if not backend.player_exists(name):
+                    backend.add_player(name, "encrypted")
+            rows.append((kind, "register", players / (time.perf_counter() - start)))
+
+            start = time.perf_counter()
+            for name in names:
+                backend.get_password(name)
+            rows.append((kind, "login lookup", players / (time.perf_counter() - start)))
+
+            start = time.perf_counter()
+            for i, name in enumerate(names):
+                backend.record_highscore(name, i % 10 + 1, highscores_file)
+            rows.append((kind, "record highscore", players / (time.perf_counter() - start)))
+
+            start = time.perf_counter()
+            for _ in range(100):
+                backend.top_highscores(5, highscores_file)
+            rows.append((kind, "top 5", 100 / (time.perf_counter() - start)))
+
+            scores = {name: i % 10 + 1 for i, name in enumerate(names)}
+            start = time.perf_counter()
+            backend.save_highscores(scores, highscores_file)
+            backend.load_highscores(highscores_file)
+            rows.append((kind, "highscores save+load", 1 / (time.perf_counter() - start)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate or benchmark Mastermind storage.")
+    parser.add_argument("--migrate", action="store_true", help="copy the text files into the database")
+    parser.add_argument("--players-file", default="players.txt")
+    parser.add_argument("--highscores-file", action="append", default=None,
+                        help="highscores file to migrate with its games log (repeatable, default: "
+                             "the normal and hard mode files)")
+    parser.add_argument("--db", default="mastermind.db")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="compare backends with N players")
+    args = parser.parse_args()
+
+    if args.migrate:
+        copied = migrate_text_to_sqlite(args.players_file, args.highscores_file or default_highscores_files(),
+                                        args.db)
+        print(f"Migrated {copied[0]} players, {copied[1]} highscores and the game statistics of "
+              f"{copied[2]} players into {args.db}.")
+    if args.benchmark:
+        for kind, operation, rate in benchmark(args.benchmark):
+            print(f"{kind:7s} {operation:22s} {rate:12.1f} ops/s")
+    if not args.migrate and not args.benchmark:
+        parser.print_help()
@@ -0,0 +1,281 @@
+"""
+Buffered terminal output: a diffing screen, the play_game board, and
+password entry with coalesced echo.
+
+Over a slow link every write() and flush() is a round of packets, so output
+is batched: Screen keeps the last frame it drew, and render() emits only the
+rows that changed, as cursor-addressed rewrites joined into a single write
+and a single flush. BoardView draws play_game's board (guess history with
+pegs, message and prompt) through a Screen; PrintView keeps the classic
+print() output for pipes, small terminals and BOARD_RENDERER = False.
+
+read_password reads whatever bytes are waiting (a fast typist or a paste
+over SSH arrives in one chunk) and answers each chunk with one echo write.
+"""
+import io
+import os
+import shutil
+import sys
+from typing import List, Tuple
+
+from codec import CodeSpace
+
+BLACK_PEG = "●"
+WHITE_PEG = "○"
+NO_PEG = "·"
+
+CLEAR_SCREEN = "\033[H\033[2J"
+CLEAR_TO_EOL = "\033[K"
+
+
+def _move(row: int, col: int = 1) -> str:
+    return f"\033[{row};{col}H"
+
+
+class Screen:
+    """
+    The last frame drawn on the terminal; render() sends only the difference.
+    """
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self._frame = None  # type: List[str] or None
+        self.writes = 0
+        self.bytes_written = 0
+
+    def render(self, lines: List[str], cursor: Tuple[int, int] = None) -> None:
+        """
+        Shows lines (row 1 first) with one write, then puts the cursor at
+        (row, col), both 1-based. Unchanged rows are not sent again.
+        """
+        ops = []
+        old = self._frame
+        if old is None:
+            ops.append(CLEAR_SCREEN)
+            old = []
+        for row, line in enumerate(lines, 1):
+            if row > len(old) or old[row - 1] != line:
+                ops.append(f"{_move(row)}{line}{CLEAR_TO_EOL}")
+        for row in range(len(lines) + 1, len(old) + 1):
+            ops.append(f"{_move(row)}{CLEAR_TO_EOL}")
+        if cursor is not None:
+            ops.append(_move(*cursor))
+        self._frame = list(lines)
+        self._write("".join(ops))
+
+    def invalidate(self, row: int) -> None:
+        """
+        Forces row to be redrawn next time, e.g. after the user typed on it.
+        """
+        if self._frame is not None and 0 < row <= len(self._frame):
+            self._frame[row - 1] = None
+
+    def release(self) -> None:
+        """
+        Moves the cursor below the frame so normal printing can continue.
+        """
+        if self._frame is not None:
+            self._write(_move(len(self._frame) + 1))
+            self._frame = None
+
+    def _write(self, data: str) -> None:
+        if not data:
+            return
+        self.out.write(data)
+        self.out.flush()
+        self.writes += 1
+        self.bytes_written += len(data.encode("utf-8"))
+
+
+class PrintView:
+    """
+    play_game output as plain lines, one print() per message.
+    """
+
+    def __init__(self, space: CodeSpace, max_attempts: int):
+        self.space = space
+        self.max_attempts = max_attempts
+
+    def intro(self) -> None:
+        space = self.space
+        print(f"\n=== Mastermind: Guess the {space.code_length}-color code ===")
+        print(f"Colors: {', '.join(space.colors)} (use letters). Code length: {space.code_length}.")
+        print(f"You have {self.max_attempts} attempts. Repeats allowed.")
+        print("Type HINT at any attempt for a suggestion.")
+
+    def ask(self, prompt: str) -> str:
+        return input(prompt)
+
+    def message(self, text: str) -> None:
+        print(text)
+
+    def feedback(self, guess: List[str], black: int, white: int) -> None:
+        print(f"Feedback -> Black pegs (correct color+pos): {black}, White pegs (correct color wrong pos): {white}")
+
+    def finish(self, text: str) -> None:
+        print(text)
+
+
+class BoardView:
+    """
+    play_game output as a redrawn board: a header, one row per attempt with
+    its pegs, a message area and the prompt.
+    """
+
+    def __init__(self, space: CodeSpace, max_attempts: int, screen: Screen = None):
+        self.space = space
+        self.max_attempts = max_attempts
+        self.screen = screen or Screen()
+        self.rows = []  # type: List[Tuple[List[str], int, int]]
+        self._message = []  # type: List[str]
+
+    @staticmethod
+    def fits(max_attempts: int, out=None) -> bool:
+        """
+        True if out is a terminal tall enough for the board (plus room for hint text).
+        """
+        out = out or sys.stdout
+        if not (out.isatty() and sys.stdin.isatty()):
+            return False
+        return shutil.get_terminal_size().lines >= max_attempts + 12
+
+    def _pegs(self, black: int, white: int) -> str:
+        empty = self.space.code_length - black - white
+        return BLACK_PEG * black + WHITE_PEG * white + NO_PEG * empty
+
+    def _frame(self, prompt: str = "") -> List[str]:
+        space = self.space
+        lines = [f"=== Mastermind: Guess the {space.code_length}-color code ===",
+                 f"Colors: {', '.join(space.colors)}    {BLACK_PEG} right color and place, "
+                 f"{WHITE_PEG} right color elsewhere    HINT for a suggestion",
+                 ""]
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt <= len(self.rows):
+                guess, black, white = self.rows[attempt - 1]
+                lines.append(f"{attempt:3d}.  {' '.join(guess)}   {self._pegs(black, white)}")
+            else:
+                lines.append(f"{attempt:3d}.  {' '.join(NO_PEG * space.code_length)}")
+        lines.append("")
+        lines.extend(self._message)
+        lines.append(prompt)
+        return lines
+
+    def intro(self) -> None:
+        self.screen.render(self._frame())
+
+    def ask(self, prompt: str) -> str:
+        lines = self._frame(prompt)
+        row = len(lines)
+        self.screen.render(lines, (row, len(prompt) + 1))
+        try:
+            return input()
+        finally:
+            # the typed text and the newline are on screen now, not in the frame
+            self.screen.invalidate(row)
+            self._message = []
+
+    def message(self, text: str) -> None:
+        self._message = text.splitlines()
+
+    def feedback(self, guess: List[str], black: int, white: int) -> None:
+        self.rows.append((list(guess), black, white))
+        self._message = [f"Black pegs: {black}, white pegs: {white}"]
+
+    def finish(self, text: str) -> None:
+        self._message = text.splitlines()
+        self.screen.render(self._frame())
+        self.screen.release()
+
+
+def make_view(space: CodeSpace, max_attempts: int, board: bool = True):
+    """
+    A BoardView when board is set and the terminal can show it, else a PrintView.
+    """
+    if board and BoardView.fits(max_attempts):
+        return BoardView(space, max_attempts)
+    return PrintView(space, max_attempts)
+
+
+# --- Password entry ---
+def read_password(prompt: str = "Password: ", mask: str = "*", fd: int = None, out=None) -> str:
+    """
+    Reads a password in raw mode, echoing mask per character. All bytes
+    available at once are handled together and echoed with one write.
+    """
+    import termios
+    import tty
+
+    out = out or sys.stdout
+    fd = sys.stdin.fileno() if fd is None else fd
+    out.write(prompt)
+    out.flush()
+    chars = []
+    old_settings = termios.tcgetattr(fd)
+    try:
+        tty.setraw(fd)
+        done = False
+        pending = b""
+        while not done:
+            data = os.read(fd, 1024)
+            if not data:
+                break
+            echo, done, pending = _apply_keys(pending + data, chars, mask)
+            if done:
+                echo += "\r\n"
+            if echo:
+                out.write(echo)
+                out.flush()
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    return "".join(chars)
+
+
+def _apply_keys(data: bytes, chars: List[str], mask: str) -> Tuple[str, bool, bytes]:
+    """
+    Applies a chunk of raw key bytes to chars. Returns (echo text, Enter seen,
+    bytes of an incomplete UTF-8 character to keep for the next chunk).
+    """
+    text = data.decode("utf-8", errors="ignore")
+    # a multi-byte character split across reads is finished by the next chunk
+    pending = data[len(text.encode("utf-8")):]
+    echo = []
+    for ch in text:
+        if ch in "\r\n":
+            return "".join(echo), True, b""
+        if ch in ("\x7f", "\b"):  # backspace
+            if chars:
+                chars.pop()
+                echo.append("\b \b")
+        elif ch == "\x03":  # Ctrl+C in raw mode
+            raise KeyboardInterrupt
+        else:
+            chars.append(ch)
+            echo.append(mask)
+    return "".join(echo), False, pending
+
+
+def compare_writes(turns: int = 10) -> Tuple[Tuple[int, int], int]:
+    """
+    ((writes, bytes) with diffing, bytes redrawing the whole board) for the
+    board updates of a game of turns guesses.
+    """
+    space = CodeSpace(["R", "G", "B", "Y", "W", "O"], 4)
+    screen = Screen(io.StringIO())
+    view = BoardView(space, turns, screen)
+    prompt = f"Attempt 1/{turns} - Enter your guess: "
+    full_bytes = 0
+    for turn in range(turns):
+        frame = view._frame(prompt)
+        screen.render(frame, (len(frame), len(prompt) + 1))
+        screen.invalidate(len(frame))
+        full = Screen(io.StringIO())
+        full.render(frame, (len(frame), len(prompt) + 1))
+        full_bytes += full.bytes_written
+        view.feedback([space.colors[(turn + i) % space.base] for i in range(space.code_length)], turn % 3, 1)
+    return (screen.writes, screen.bytes_written), full_bytes
+
+
+if __name__ == "__main__":
+    (writes, sent), full = compare_writes()
+    print(f"Board for 10 guesses: {writes} writes and {sent} bytes with diffing, "
+          f"{full} bytes redrawing every frame")
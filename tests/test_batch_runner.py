@@ -0,0 +1,78 @@
+"""
+batch_runner: seeded games replay exactly, and a failing bot only fails its own game.
+"""
+import json
+import sys
+
+import pytest
+
+import batch_runner
+
+
+def _results(lines):
+    return [json.loads(line) for line in batch_runner.run_lines(lines, 1).splitlines()]
+
+
+def test_seeded_random_strategy_is_reproducible():
+    lines = [json.dumps({"id": i, "seed": i, "strategy": "random"}) for i in range(20)]
+    first = _results(lines)
+    assert first == _results(lines)
+    assert all(record.get("result") != "error" for record in first)
+
+
+def test_given_guesses():
+    lines = [json.dumps({"id": "a", "secret": "RGBY", "guesses": ["RRGG", "bad", "RGBY"]})]
+    records = _results(lines)
+    assert records[0] == {"id": "a", "turn": 1, "guess": "RRGG", "black": 1, "white": 1}
+    assert records[1]["error"] == "invalid guess"
+    assert records[-1] == {"id": "a", "result": "win", "attempts": 2, "secret": "RGBY"}
+
+
+BOT = r"""
+import sys
+
+import pytest
+invalid = False
+for line in sys.stdin:
+    if line.startswith("OK game"):
+        # a 3-color game gets nothing but invalid guesses
+        invalid = "colors=RGB " in line
+    elif line.startswith(("OK win", "OK lose")):
+        continue
+    print("GUESS ?" if invalid else "GUESS RGBY", flush=True)
+"""
+
+
+def test_bot_is_reset_after_a_failed_game(tmp_path):
+    bot = tmp_path / "bot.py"
+    bot.write_text(BOT)
+    lines = [json.dumps({"id": "broken", "colors": "RGB", "length": 4}),
+             json.dumps({"id": "next", "secret": "RGBY"})]
+    try:
+        records = [json.loads(line) for line in
+                   batch_runner.run_lines(lines, 1, bot=f"{sys.executable} {bot}").splitlines()]
+    finally:
+        batch_runner._reset_bot()
+    next_game = [record for record in records if record["id"] == "next"]
+    assert {"id": "broken", "result": "error", "error": "too many invalid guesses"} in records
+    # a bot left mid-game would have its stale "GUESS ?" read as next's first guess
+    assert next_game == [{"id": "next", "turn": 1, "guess": "RGBY", "black": 4, "white": 0},
+                         {"id": "next", "result": "win", "attempts": 1, "secret": "RGBY"}]
+
+
+def test_dead_bot_is_an_error_result_not_a_crash(tmp_path):
+    bot = tmp_path / "bot.py"
+    bot.write_text("import sys\nsys.exit(0)\n")
+    command = f"{sys.executable} {bot}"
+    process = batch_runner._bot_process(command)
+    process.wait()
+    try:
+        with pytest.raises(batch_runner.GameError):
+            batch_runner._BotGuesser(process, batch_runner._space({}), 10)
+
+        lines = [json.dumps({"id": i, "secret": "RGBY"}) for i in range(3)]
+        records = [json.loads(line) for line in batch_runner.run_lines(lines, 1, bot=command).splitlines()]
+    finally:
+        batch_runner._reset_bot()
+    assert [(record["id"], record["result"]) for record in records] == [(0, "error"), (1, "error"), (2, "error")]
+    assert all(record["error"].startswith("bot exited") for record in records)
@@ -0,0 +1,67 @@
+"""
+batch_scoring must agree with larongutak.score_guess, with and without the feedback
+table, and with the table-free reference larongutak._score_guess_direct.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batch_scoring
+from codec import CodeSpace
+from game_core import larongutak
+
+SPACES = [
+    CodeSpace(["R", "G", "B", "Y", "W", "O"], 4),
+    CodeSpace(["R", "G", "B", "Y", "W"], 3),
+    CodeSpace(["R", "G", "B"], 6),
+    CodeSpace(["R", "G", "B", "Y", "W", "O", "P", "K"], 5),  # too large for a feedback table
+]
+
+
+@pytest.fixture(params=[True, False], ids=["table", "direct"])
+def feedback_table(request, monkeypatch):
+    monkeypatch.setattr(larongutak, "FEEDBACK_TABLE_ENABLED", request.param)
+    monkeypatch.setattr(larongutak, "FEEDBACK_CACHE_FILE", "")
+    return request.param
+
+
+@pytest.mark.parametrize("space", SPACES, ids=lambda space: f"{space.base}x{space.code_length}")
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_score_block_matches_score_guess(space, seed, feedback_table):
+    compared = batch_scoring.check_against_score_guess(trials=20, block=20, seed=seed, space=space)
+    assert compared > 0
+
+
+@pytest.mark.parametrize("space", SPACES[1:3], ids=lambda space: f"{space.base}x{space.code_length}")
+def test_every_pair_matches_the_direct_reference(space):
+    codes = [space.decode(i) for i in range(space.size)]
+    black, white = batch_scoring.score_block(codes, batch_scoring.all_codes_array(space), space=space)
+    for i, guess in enumerate(codes):
+        for j, secret in enumerate(codes):
+            assert (black[i, j], white[i, j]) == larongutak._score_guess_direct(secret, guess)
+
+
+def test_feedback_table_matches_the_direct_reference(monkeypatch):
+    monkeypatch.setattr(larongutak, "FEEDBACK_CACHE_FILE", "")
+    space = SPACES[0]
+    table = larongutak._build_feedback_table(space)
+    for guess in range(0, space.size, 7):
+        for secret in range(space.size):
+            expected = larongutak._score_guess_direct(space.decode(secret), space.decode(guess))
+            assert space.decode_feedback(table[secret * space.size + guess]) == expected
+
+
+@pytest.mark.parametrize("space", SPACES[:3], ids=lambda space: f"{space.base}x{space.code_length}")
+def test_vectorized_feedback_table_matches_pure_build(space):
+    assert larongutak._build_feedback_table(space) == bytes(larongutak._build_feedback_table_pure(space))
+
+
+def test_filter_candidates_keeps_the_consistent_codes():
+    space = SPACES[0]
+    codes = batch_scoring.all_codes_array(space)
+    guess, secret = list("RRGB"), list("RGBY")
+    black, white = larongutak.score_guess(secret, guess, space)
+    kept = batch_scoring.array_to_codes(batch_scoring.filter_candidates(codes, guess, black, white, space), space)
+    assert secret in kept
+    assert all(larongutak.score_guess(code, guess, space) == (black, white) for code in kept)
+    assert len(kept) < space.size
@@ -0,0 +1,80 @@
+"""
+Scripted clients against a private game server with storage in a temporary directory.
+"""
+import asyncio
+import random
+
+import pytest
+
+import game_server
+import password_hash
+from game_core import larongutak
+from game_server import Client, GameServer
+
+PLAYERS = 50
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(larongutak, "STORAGE_BACKEND", "text")
+    monkeypatch.setattr(larongutak, "PLAYERS_FILE", str(tmp_path / "players.txt"))
+    monkeypatch.setattr(larongutak, "HIGHSCORES_FILE", str(tmp_path / "highscores.txt"))
+    monkeypatch.setattr(larongutak, "FEEDBACK_CACHE_FILE", "")
+    monkeypatch.setattr(password_hash, "SCRYPT_LOG2_N", 10)  # a protocol test, not a hash benchmark
+    (tmp_path / "players.txt").write_text("")
+    return tmp_path
+
+
+async def _scripted_player(port: int, number: int, rng: random.Random) -> None:
+    """
+    Registers, logs in and plays one game with random guesses, checking every reply.
+    """
+    client = await Client.connect(game_server.HOST, port)
+    try:
+        name = f"bot{number:05d}"
+        assert (await client.send("GUESS RGBY")).startswith("ERR login first")
+        assert (await client.send(f"REGISTER {name},x Pw#{number}")).startswith("ERR invalid username")
+        assert (await client.send(f"REGISTER {name} secret")).startswith("ERR invalid password")
+        assert await client.send(f"REGISTER {name} Pw#{number}") == f"OK registered {name}"
+        assert await client.send(f"REGISTER {name} Other#1") == "ERR username already taken"
+        assert await client.send(f"LOGIN {name} wrong") == "ERR access denied"
+        assert await client.send(f"LOGIN {name} Pw#{number}") == f"OK welcome {name}"
+        reply = await client.send("PLAY")
+        assert reply.startswith("OK game")
+        colors = reply.split("colors=")[1].split()[0]
+        length = int(reply.split("length=")[1].split()[0])
+        assert (await client.send("GUESS ?")).startswith("ERR invalid guess")
+        while True:
+            reply = await client.send("GUESS " + "".join(rng.choice(colors) for _ in range(length)))
+            if not reply.startswith("OK feedback"):
+                break
+        assert reply.startswith("OK win") or reply.startswith("OK lose"), reply
+        assert (await client.send("STATS")).startswith("OK stats rank=")
+        assert (await client.send("TOP")).startswith("OK top ")
+        assert await client.send("QUIT") == "OK bye"
+    finally:
+        await client.close()
+
+
+async def _play(players: int) -> GameServer:
+    server = GameServer()
+    await server.warm_up()
+    listener = await asyncio.start_server(server.handle, game_server.HOST, 0, limit=game_server.MAX_LINE,
+                                          backlog=players)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        await asyncio.gather(*(_scripted_player(port, i, random.Random(i)) for i in range(players)))
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.executor.shutdown()
+    return server
+
+
+def test_concurrent_players(store, capsys):
+    server = asyncio.run(_play(PLAYERS))
+    assert server.games == PLAYERS
+    players = (store / "players.txt").read_text().splitlines()
+    assert sorted(line.split(",")[0] for line in players) == [f"bot{i:05d}" for i in range(PLAYERS)]
+    # update_leaderboard is called quiet, the server prints nothing per game
+    assert capsys.readouterr().out == ""
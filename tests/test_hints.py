@@ -0,0 +1,33 @@
+"""
+Hints suggest the guess with the most expected information, from the first move on.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import hints
+import solver
+from codec import CodeSpace
+
+SPACE = CodeSpace(["R", "G", "B", "Y", "W", "O"], 4)
+
+
+def _entropies(mask):
+    matrix = solver.feedback_matrix(SPACE)
+    counts = solver.partition_sizes(matrix[:, mask], SPACE)
+    p = counts / float(mask.sum())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+
+@pytest.mark.parametrize("turns", [[], [("RRGG", 1, 1)], [("RRGG", 1, 1), ("BYBW", 0, 2)]])
+def test_best_guess_has_the_most_information(turns):
+    engine = hints.HintEngine(SPACE)
+    for guess, black, white in turns:
+        engine.record(list(guess), black, white)
+
+    guess, bits = engine.best_guess()
+
+    entropies = _entropies(engine.mask)
+    assert bits == pytest.approx(entropies.max())
+    assert entropies[SPACE.encode(guess)] == pytest.approx(entropies.max())
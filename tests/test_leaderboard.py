@@ -0,0 +1,92 @@
+"""
+The highscore log and the rank queries of its in-memory leaderboard.
+"""
+import random
+
+import leaderboard
+import storage
+
+
+def test_save_highscores_is_not_mistaken_for_an_append(tmp_path):
+    path = str(tmp_path / "highscores.txt")
+    backend = storage.TextFileBackend(str(tmp_path / "players.txt"))
+    other_terminal = leaderboard.Leaderboard(path)
+    backend.record_highscore("alice", 5, path)
+    other_terminal.refresh()
+
+    backend.save_highscores({"zed": 1, "alice": 5, "bob": 3}, path)
+
+    expected = {"zed": 1, "alice": 5, "bob": 3}
+    assert backend.load_highscores(path) == expected
+    assert other_terminal.scores() == expected
+    assert backend.top_highscores(5, path) == [("zed", 1), ("bob", 3), ("alice", 5)]
+    assert not (tmp_path / "highscores.txt.tmp").exists()
+
+
+def _board(tmp_path, rows):
+    board = leaderboard.Leaderboard(str(tmp_path / "highscores.txt"))
+    board.record_many(rows)
+    return board
+
+
+def test_tied_scores_share_a_rank(tmp_path):
+    board = _board(tmp_path, [("cid", 4), ("ann", 3), ("bob", 4), ("dan", 4), ("eve", 7)])
+    assert board.rank("ann") == (1, 5)
+    assert board.rank("bob") == board.rank("cid") == board.rank("dan") == (2, 5)
+    assert board.rank("eve") == (5, 5)
+    assert board.rank("nobody") is None
+    # ties are listed by username
+    assert board.around("cid", 1) == [(2, "bob", 4), (3, "cid", 4), (4, "dan", 4)]
+
+
+def test_around_stops_at_the_top_and_bottom(tmp_path):
+    board = _board(tmp_path, [(f"p{i}", i + 1) for i in range(6)])
+    assert board.around("p0", 2) == [(1, "p0", 1), (2, "p1", 2), (3, "p2", 3)]
+    assert board.around("p5", 2) == [(4, "p3", 4), (5, "p4", 5), (6, "p5", 6)]
+    assert board.around("p2", 10) == [(i + 1, f"p{i}", i + 1) for i in range(6)]
+    assert board.around("nobody") == []
+
+
+def test_percentile_bounds(tmp_path):
+    board = _board(tmp_path, [("ann", 1), ("bob", 5), ("cid", 9), ("dan", 9)])
+    assert board.percentile("ann") == 75.0
+    assert board.percentile("bob") == 50.0
+    assert board.percentile("cid") == 0.0
+    alone = _board(tmp_path / "alone", [("ann", 3)])
+    assert alone.percentile("ann") == 0.0
+    assert alone.percentile("nobody") is None
+
+
+def test_new_best_moves_the_player_up(tmp_path):
+    board = _board(tmp_path, [("ann", 3), ("bob", 5), ("cid", 8)])
+    board.record("cid", 2)
+    assert board.rank("cid") == (1, 3)
+    assert board.around("bob", 1) == [(2, "ann", 3), (3, "bob", 5)]
+
+
+def test_score_ranks_grow_past_the_initial_size():
+    ranks = leaderboard.ScoreRanks(size=2)
+    rows = [(0, "a"), (1, "b"), (40, "c"), (5, "d"), (1000, "e"), (5, "f")]
+    for score, user in rows:
+        ranks.insert(score, user)
+    ordered = sorted(rows)
+    assert ranks.players == len(rows)
+    assert [ranks.at(i) for i in range(len(rows))] == ordered
+    assert [ranks.position(score, user) for score, user in ordered] == list(range(len(rows)))
+    assert ranks.count_below(5) == 2 and ranks.count_below(6) == 4 and ranks.count_below(5000) == 6
+
+    ranks.remove(40, "c")
+    assert [ranks.at(i) for i in range(ranks.players)] == [row for row in ordered if row != (40, "c")]
+
+
+def test_text_and_sqlite_standings_agree(tmp_path):
+    rng = random.Random(7)
+    rows = [(f"u{rng.randrange(60)}", rng.randint(1, 10)) for _ in range(300)]
+    path = str(tmp_path / "highscores.txt")
+    text = storage.TextFileBackend(str(tmp_path / "players.txt"))
+    db = storage.SQLiteBackend(str(tmp_path / "mastermind.db"))
+    for user, score in rows:
+        text.record_highscore(user, score, path)
+        db.record_highscore(user, score, path)
+    for user in sorted({user for user, _ in rows}):
+        assert text.player_standing(user, 3, path) == db.player_standing(user, 3, path)
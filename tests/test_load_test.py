@@ -0,0 +1,16 @@
+"""
+A small load test run reports its timings without turning metrics on in the caller.
+"""
+import instrumentation
+import load_test
+
+
+def test_run_keeps_metrics_to_the_workers(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    row = load_test.run(200, 80, processes=2, threads=2, log2_n=4)
+
+    assert instrumentation.ENABLED is False
+    assert sum(row["outcomes"].values()) == 80
+    assert row["outcomes"].get("login.ok", 0) > 0 and row["outcomes"].get("register.added", 0) > 0
+    assert row["login_p50_ms"] > 0 and row["register_p50_ms"] > 0
+    assert row["commit_batch"] >= 1
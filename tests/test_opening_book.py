@@ -0,0 +1,39 @@
+"""
+Opening books written by several builders at once stay loadable.
+"""
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import opening_book
+from codec import CodeSpace
+from game_core import larongutak
+
+
+def test_concurrent_save_book(tmp_path, monkeypatch):
+    monkeypatch.setattr(larongutak, "FEEDBACK_CACHE_FILE", "")
+    space = CodeSpace(["R", "G", "B"], 3)
+    tree = opening_book.build_tree(space)
+    path = str(tmp_path / "book.bin")
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                opening_book.save_book(tree, path, space)
+        except Exception as e:  # collected so the test reports it
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [p.name for p in tmp_path.iterdir()] == ["book.bin"]
+    book = opening_book.OpeningBook(path)
+    assert book.matches_config(space)
+    assert (book.nodes == tree).all()
@@ -0,0 +1,49 @@
+"""
+Tiled partition scoring gives the untiled counts and keeps memory flat on large spaces.
+"""
+import tracemalloc
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import batch_scoring
+import parallel_solver
+import solver
+from codec import CodeSpace
+
+
+def test_tiles_add_up_to_the_full_partition(monkeypatch):
+    space = CodeSpace(["R", "G", "B", "Y", "W"], 4)
+    codes = batch_scoring.all_codes_array(space)
+    candidates = codes[::3]
+    expected = solver.partition_sizes(batch_scoring.feedback_block(codes, candidates, space=space), space)
+    monkeypatch.setattr(parallel_solver, "CANDIDATE_BLOCK", 37)
+    monkeypatch.setattr(parallel_solver, "TILE_PAIRS", 37 * 11)
+
+    assert (parallel_solver.partition_counts(codes, candidates, space) == expected).all()
+
+
+def test_pool_matches_single_process_scores():
+    space = CodeSpace(["R", "G", "B", "Y"], 4)
+    codes = batch_scoring.all_codes_array(space)
+    candidates = np.arange(0, space.size, 5)
+    with parallel_solver.PartitionPool(2, space=space) as pool:
+        for metric in parallel_solver.METRICS:
+            expected = parallel_solver.score_partitions(codes, codes[candidates], metric, space)
+            assert np.allclose(pool.score_all_guesses(candidates, metric), expected)
+
+
+def test_memory_stays_flat_with_every_code_a_candidate():
+    space = CodeSpace("RGBYWOPC", 6)
+    codes = batch_scoring.all_codes_array(space)
+    guesses = codes[:64]
+    tracemalloc.start()
+    try:
+        counts = parallel_solver.partition_counts(guesses, codes, space)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert (counts.sum(axis=1) == space.size).all()
+    # one untiled block of 64 guesses would be 16M pairs: 128 MB of int64 keys alone
+    assert peak < 80 * 2 ** 20
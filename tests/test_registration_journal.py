@@ -0,0 +1,110 @@
+"""
+Journaled registration: one winner per username across threads and processes,
+group commit within a process and the shared fsync.
+"""
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+import registration_journal
+from player_directory import PlayerDirectory
+
+pytestmark = pytest.mark.skipif(registration_journal.fcntl is None, reason="needs fcntl locks")
+
+
+def _replay(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n").split(",", 1) for line in f]
+
+
+def test_threads_racing_for_one_name(tmp_path):
+    path = str(tmp_path / "players.txt")
+    start = threading.Barrier(16)
+    results = []
+
+    def sign_up(i):
+        start.wait()
+        results.append(registration_journal.register_player(path, "ann", f"hash{i}"))
+
+    threads = [threading.Thread(target=sign_up, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [False] * 15 + [True]
+    assert [user for user, _ in _replay(path)] == ["ann"]
+
+
+def test_processes_racing_for_the_same_names(tmp_path):
+    path = str(tmp_path / "players.txt")
+    open(path, "w").close()
+    names = [f"user{i:03d}" for i in range(200)]
+    with multiprocessing.Pool(4) as pool:
+        added = pool.starmap(registration_journal._registrant, [("journal", path, names, 4)] * 4)
+
+    assert sum(added) == len(names)
+    lines = _replay(path)
+    assert sorted(user for user, _ in lines) == names
+    directory = PlayerDirectory(path)
+    assert all(directory.get_password(name) == "encrypted" for name in names)
+    st = os.stat(path)
+    with open(f"{path}.sync") as f:
+        assert f.read().split() == [str(st.st_ino), str(st.st_size)]
+
+
+def test_registrations_queued_during_a_commit_go_out_in_one_batch(tmp_path, monkeypatch):
+    path = str(tmp_path / "players.txt")
+    journal = registration_journal.RegistrationJournal(path)
+    release = threading.Event()
+    batches = []
+    register_many = registration_journal.register_many
+
+    def slow_register_many(path, entries):
+        batches.append([user for user, _ in entries])
+        if len(batches) == 1:
+            release.wait(5)
+        return register_many(path, entries)
+
+    monkeypatch.setattr(registration_journal, "register_many", slow_register_many)
+    results = []
+
+    def sign_up(name):
+        results.append((name, journal.register(name, "encrypted")))
+
+    leader = threading.Thread(target=sign_up, args=("ann",))
+    leader.start()
+    while not batches:
+        time.sleep(0.001)
+    followers = [threading.Thread(target=sign_up, args=(name,)) for name in ("bob", "cid", "ann")]
+    for thread in followers:
+        thread.start()
+    while len(journal._pending) < len(followers):
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert batches[0] == ["ann"] and sorted(batches[1]) == ["ann", "bob", "cid"]
+    assert journal.batches == 2
+    assert sorted(results) == [("ann", False), ("ann", True), ("bob", True), ("cid", True)]
+    assert sorted(user for user, _ in _replay(path)) == ["ann", "bob", "cid"]
+
+
+def test_lines_already_synced_skip_the_fsync(tmp_path, monkeypatch):
+    path = str(tmp_path / "players.txt")
+    fsyncs = []
+    fsync = os.fsync
+    monkeypatch.setattr(registration_journal.os, "fsync", lambda fd: (fsyncs.append(fd), fsync(fd)))
+    assert registration_journal.register_player(path, "ann", "encrypted")
+    assert len(fsyncs) == 1
+
+    # another writer whose lines ended before the noted offset has nothing left to flush
+    st = os.stat(path)
+    registration_journal._sync(path, st.st_ino, st.st_size)
+    assert len(fsyncs) == 1
+    registration_journal._sync(path, st.st_ino + 1, 1)  # a note about a replaced file does not count
+    assert len(fsyncs) == 2
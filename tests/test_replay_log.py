@@ -0,0 +1,44 @@
+"""
+replay_log: round trip, and recovery from records torn in the middle of the log.
+"""
+import replay_log
+from codec import CodeSpace
+
+SPACE = CodeSpace(["R", "G", "B", "Y", "W", "O"], 4)
+
+
+def _record(name: str, won: bool = True) -> bytes:
+    secret = SPACE.encode(list("RGBY"))
+    moves = [(SPACE.encode(list("RRGG")), 1, 1), (secret, 4, 0)]
+    return replay_log.encode_game(name, SPACE, secret, moves, won, timestamp=1700000000)
+
+
+def _read(tmp_path, data: bytes):
+    path = tmp_path / "replays.bin"
+    path.write_bytes(data)
+    with replay_log.ReplayReader(str(path)) as reader:
+        games = list(reader.games())
+        return games, reader.aggregate()
+
+
+def test_round_trip(tmp_path):
+    games, result = _read(tmp_path, _record("ann") + _record("bob", won=False))
+    assert [(game.username, game.won) for game in games] == [("ann", True), ("bob", False)]
+    assert games[0].moves == [(SPACE.encode(list("RRGG")), 1, 1), (SPACE.encode(list("RGBY")), 4, 0)]
+    assert result["games"] == 2 and result["wins"] == 1 and result["skipped_bytes"] == 0
+
+
+def test_torn_record_in_the_middle_is_skipped(tmp_path):
+    torn = _record("torn")[:-7]
+    games, result = _read(tmp_path, _record("ann") + torn + _record("bob") + _record("cid")[:5])
+    assert [game.username for game in games] == ["ann", "bob"]
+    assert result["games"] == 2
+    assert result["skipped_bytes"] == len(torn) + 5
+
+
+def test_garbage_between_records_is_skipped(tmp_path):
+    garbage = bytes([replay_log.MAGIC, 0, 4, 6, 3]) + bytes([replay_log.MAGIC]) * 20
+    games, result = _read(tmp_path, _record("ann") + garbage + _record("bob"))
+    assert [game.username for game in games] == ["ann", "bob"]
+    assert result["skipped_bytes"] == len(garbage)
+
@@ -0,0 +1,51 @@
+"""
+The menu only plays and records scores for a live session of the logged-in player.
+"""
+import pytest
+
+import session_manager
+from game_core import larongutak
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = session_manager.SessionManager(ttl=60)
+    monkeypatch.setattr(session_manager, "_manager", manager)
+    return manager
+
+
+def test_live_session_is_valid_and_refreshed(manager, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_manager.time, "time", lambda: now[0])
+    manager.login("ann")
+    now[0] += 45
+    assert larongutak.session_valid("ann")
+    now[0] += 45  # past the original expiry, but the check pushed it back
+    assert larongutak.session_valid("ann")
+    assert not larongutak.session_valid("bob")
+
+
+def test_expired_or_ended_session_is_refused(manager, monkeypatch, capsys):
+    now = [1000.0]
+    monkeypatch.setattr(session_manager.time, "time", lambda: now[0])
+    manager.login("ann")
+    now[0] += 61
+    assert not larongutak.session_valid("ann")
+
+    manager.login("ann")
+    manager.end()
+    assert not larongutak.session_valid("ann")
+    assert "log in again" in capsys.readouterr().out
+
+
+def test_no_score_is_recorded_once_the_session_ends(manager, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(larongutak, "login_user", lambda: (manager.login("ann"), (True, "ann"))[1])
+    monkeypatch.setattr(larongutak, "play_game", lambda username: (manager.end(), (4, True))[1])
+    monkeypatch.setattr(larongutak, "update_leaderboard", lambda *args, **kwargs: recorded.append(args))
+    choices = iter(["L", "E"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(choices))
+
+    larongutak.main_menu()
+
+    assert recorded == []
@@ -0,0 +1,24 @@
+"""
+Cold start of the game menu: import time budget and lazily loaded subsystems.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import mastermind
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_check_startup_passes():
+    assert mastermind.check_startup()
+
+
+def test_game_import_loads_no_forbidden_module():
+    code = "import json, sys, mastermind; mastermind.load_game(); print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, stdout=subprocess.PIPE, check=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT), text=True)
+    loaded = json.loads(result.stdout.splitlines()[-1])
+    forbidden = [m for m in loaded if m.split(".")[0] in mastermind.STARTUP_FORBIDDEN or m in mastermind.STARTUP_FORBIDDEN]
+    assert forbidden == []
@@ -0,0 +1,28 @@
+"""
+Migrating the text files into SQLite keeps players, both leaderboards and game statistics.
+"""
+import storage
+from game_core import larongutak
+
+
+def test_migration_copies_every_board_and_games_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "players.txt").write_text("ann,old\nbob,pw\nann,new\n")
+    text = storage.TextFileBackend("players.txt")
+    for board in storage.default_highscores_files():
+        text.record_game("ann", 3, True, board)
+        text.record_game("ann", 10, False, board)
+        text.record_highscore("ann", 3, board)
+    text.record_game("bob", 5, True, larongutak.EVIL_HIGHSCORES_FILE)
+    text.record_highscore("bob", 5, larongutak.EVIL_HIGHSCORES_FILE)
+
+    copied = storage.migrate_text_to_sqlite("players.txt", storage.default_highscores_files(), "mastermind.db")
+
+    assert copied == (2, 3, 3)
+    db = storage.SQLiteBackend("mastermind.db")
+    assert db.get_password("ann") == "new"
+    for board in storage.default_highscores_files():
+        assert db.top_highscores(5, board) == text.top_highscores(5, board)
+        assert db.player_stats("ann", board) == text.player_stats("ann", board)
+    assert db.player_stats("bob", larongutak.EVIL_HIGHSCORES_FILE)["games"] == 1
+    assert db.player_stats("bob", larongutak.HIGHSCORES_FILE) is None
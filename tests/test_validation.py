@@ -0,0 +1,25 @@
+"""
+Registration rules, shared by every registration path.
+"""
+import pytest
+
+import UserRegistration_ben
+import validation
+
+
+@pytest.mark.parametrize("username, ok", [("ann", True), ("", False), ("a,b", False), ("a\nb", False)])
+def test_username_rules(username, ok):
+    assert (validation.username_problem(username) is None) == ok
+
+
+@pytest.mark.parametrize("password, ok", [
+    ("Secret#1", True),
+    ("", False),
+    ("Secret#12345", False),  # too long
+    ("secret#1", False),  # no uppercase letter
+    ("Secret1", False),  # no special character
+])
+def test_password_rules_match_terminal_registration(password, ok, capsys):
+    assert (validation.password_problem(password) is None) == ok
+    assert UserRegistration_ben.validate_password(password) == ok
+    assert bool(capsys.readouterr().out) != ok
@@ -0,0 +1,194 @@
+"""
+Collision-free username suggestions.
+
+Suggested names are 3 lowercase letters + 3 digits, 26**3 * 10**3 =
+17,576,000 names. A UsernameSuggester keeps one bit per name (2.2 MB) set
+for every name in players.txt, following the file through player_directory,
+and for every name it has already handed out, so a batch of suggestions is
+free of registered names and of each other.
+
+Names are drawn at random while the space is sparse. When random draws keep
+hitting taken names, the next free name after a random starting point is
+found with a memchr-speed search of a second byte map that flags the bitmap
+bytes with a free bit, which stays fast however full the space is. Once
+fewer than FALLBACK_FREE_FRACTION of the names are free, suggestions move to
+3 letters + 4 digits, checked against the player index directly.
+"""
+import argparse
+import os
+import random
+import string
+import threading
+import time
+from typing import List
+
+from player_directory import get_directory
+
+LETTERS = 3
+DIGITS = 3
+SPACE = 26 ** LETTERS * 10 ** DIGITS  # 17,576,000 names
+RANDOM_TRIES = 8  # random draws per name before scanning the bitmap
+FALLBACK_FREE_FRACTION = 0.01  # below this share of free names, suggest longer names
+FALLBACK_DIGITS = 4
+
+# One suggester per players file path, see get_suggester.
+_suggesters = {}
+
+
+def name_index(name: str) -> int or None:
+    """
+    Position of a 3-letter + 3-digit name in the bitmap, or None for other names.
+    """
+    if len(name) != LETTERS + DIGITS:
+        return None
+    letters, digits = name[:LETTERS], name[LETTERS:]
+    if not (letters.isascii() and letters.islower() and letters.isalpha()
+            and digits.isascii() and digits.isdigit()):
+        return None
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - ord("a")
+    return index * 10 ** DIGITS + int(digits)
+
+
+def index_name(index: int) -> str:
+    index, number = divmod(index, 10 ** DIGITS)
+    letters = []
+    for _ in range(LETTERS):
+        index, letter = divmod(index, 26)
+        letters.append(chr(ord("a") + letter))
+    return "".join(reversed(letters)) + f"{number:0{DIGITS}d}"
+
+
+class UsernameSuggester:
+    """
+    Bitmap of taken (registered or already suggested) 6-character names for one players file.
+    """
+
+    def __init__(self, path: str, rng: random.Random = None):
+        self.path = path
+        self.rng = rng or random.SystemRandom()
+        self.bitmap = bytearray(SPACE // 8)
+        self._has_free = bytearray(b"\1" * len(self.bitmap))  # 0 once all 8 names of a byte are taken
+        self.taken = 0
+        self._reserved_long = set()  # fallback names already handed out
+        self._mark = None  # player_directory.new_usernames position
+        self._lock = threading.Lock()
+
+    def _take(self, index: int) -> bool:
+        byte, bit = divmod(index, 8)
+        if self.bitmap[byte] >> bit & 1:
+            return False
+        self.bitmap[byte] |= 1 << bit
+        if self.bitmap[byte] == 0xFF:
+            self._has_free[byte] = 0
+        self.taken += 1
+        return True
+
+    def refresh(self) -> None:
+        """
+        Marks the names registered since the last refresh (all of them the first time).
+        """
+        if not os.path.exists(self.path):
+            return
+        names, mark = get_directory(self.path).new_usernames(self._mark)
+        if self._mark is not None and mark[0] != self._mark[0]:
+            # the players file was rewritten, start from a clean bitmap
+            self.bitmap = bytearray(len(self.bitmap))
+            self._has_free = bytearray(b"\1" * len(self.bitmap))
+            self.taken = 0
+        self._mark = mark
+        for name in names:
+            index = name_index(name)
+            if index is not None:
+                self._take(index)
+
+    def _scan(self) -> int or None:
+        # first free name at or after a random byte, wrapping around
+        start = self.rng.randrange(len(self.bitmap))
+        byte = self._has_free.find(1, start)
+        if byte < 0:
+            byte = self._has_free.find(1, 0, start)
+        if byte < 0:
+            return None
+        value = self.bitmap[byte]
+        bit = next(bit for bit in range(8) if not value >> bit & 1)
+        return byte * 8 + bit
+
+    def _long_name(self) -> str:
+        directory = get_directory(self.path) if os.path.exists(self.path) else None
+        while True:
+            name = ("".join(self.rng.choice(string.ascii_lowercase) for _ in range(LETTERS))
+                    + "".join(self.rng.choice(string.digits) for _ in range(FALLBACK_DIGITS)))
+            if name not in self._reserved_long and (directory is None or not directory.exists(name)):
+                self._reserved_long.add(name)
+                return name
+
+    def suggest(self, count: int = 1) -> List[str]:
+        """
+        Returns count distinct names that are neither registered nor suggested before.
+        """
+        with self._lock:
+            self.refresh()
+            names = []
+            for _ in range(count):
+                if SPACE - self.taken < SPACE * FALLBACK_FREE_FRACTION:
+                    names.append(self._long_name())
+                    continue
+                for _ in range(RANDOM_TRIES):
+                    index = self.rng.randrange(SPACE)
+                    if self._take(index):
+                        break
+                else:
+                    index = self._scan()
+                    if index is None:
+                        names.append(self._long_name())
+                        continue
+                    self._take(index)
+                names.append(index_name(index))
+            return names
+
+    def free(self) -> int:
+        with self._lock:
+            self.refresh()
+            return SPACE - self.taken
+
+
+def get_suggester(path: str) -> UsernameSuggester:
+    """
+    Returns the shared UsernameSuggester for a players file path.
+    """
+    key = os.path.abspath(path)
+    suggester = _suggesters.get(key)
+    if suggester is None:
+        suggester = _suggesters[key] = UsernameSuggester(path)
+    return suggester
+
+
+def suggest_usernames(path: str, count: int = 1) -> List[str]:
+    """
+    count free usernames for the players file at path.
+    """
+    return get_suggester(path).suggest(count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Username suggestion throughput at a given fill level.")
+    parser.add_argument("--fill", type=float, default=0.9, help="share of the 6-character space already taken")
+    parser.add_argument("--count", type=int, default=10000, help="names to suggest")
+    args = parser.parse_args()
+
+    suggester = UsernameSuggester(os.devnull + ".missing", random.Random(0))
+    # fill the bitmap directly, as if that many players were registered
+    full_bytes = int(len(suggester.bitmap) * args.fill)
+    suggester.bitmap[:full_bytes] = b"\xff" * full_bytes
+    suggester._has_free[:full_bytes] = bytes(full_bytes)
+    suggester.taken = full_bytes * 8
+    print(f"{suggester.taken} of {SPACE} names taken")
+
+    start = time.perf_counter()
+    names = suggester.suggest(args.count)
+    elapsed = time.perf_counter() - start
+    assert len(set(names)) == len(names)
+    print(f"{args.count} names in {elapsed:.3f} s ({args.count / elapsed:.0f}/s), "
+          f"{sum(len(n) > LETTERS + DIGITS for n in names)} from the fallback, e.g. {names[:3]}")
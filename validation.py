@@ -0,0 +1,39 @@
+"""
+Username and password rules for registration.
+
+The one place the rules live: terminal registration (larongutak and
+UserRegistration_ben), the game server's REGISTER, bulk_io imports and the
+load test all ask these functions. Each returns why a value is refused, or
+None if it is fine, and the caller decides how to show the reason.
+"""
+import re
+
+MAX_PASSWORD_LENGTH = 10
+
+
+def username_problem(username: str) -> str or None:
+    """
+    Why username cannot be registered, or None if it can. Usernames are
+    stored lowercase, and a comma or line break would corrupt players.txt.
+    """
+    if username == "":
+        return "username is empty"
+    if "," in username or any(ch in username for ch in "\r\n\0"):
+        return "username contains a comma or line break"
+    return None
+
+
+def password_problem(password: str) -> str or None:
+    """
+    Why password is not acceptable, or None: at most MAX_PASSWORD_LENGTH
+    characters, at least one uppercase letter and one special character.
+    """
+    if password == "":
+        return "password is empty"
+    if len(password) > MAX_PASSWORD_LENGTH:
+        return f"password too long, maximum length is {MAX_PASSWORD_LENGTH} characters"
+    if not re.search(r"[A-Z]", password):
+        return "password must contain at least one uppercase letter"
+    if not re.search(r"[^A-Za-z0-9]", password):
+        return "password must contain at least one special character"
+    return None